@@ -0,0 +1,85 @@
+"""Generate documentation for many projects in parallel
+
+Every *.json file in the config directory describes one project. Besides
+the content overrides accepted by doc_content.build_sections() ("title",
+"subtitle", "metadata", "backend_tech", "frontend_tech", "devops_tech",
+"code", "screenshots", "java_source_root", "snippets", "listings",
+"transcripts") a config may set "output" (defaults to the config name
+with a .docx extension, next to the config), "formats" and
+"reproducible" (byte-identical .docx output, see docx_package). Relative paths are
+resolved against the config file's directory.
+
+    python batch_generate.py configs/ --workers 8
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from doc_build import CACHE_DIR, create_project_documentation
+from doc_content import load_config
+
+
+def generate_project(config_path, cache_dir, formats):
+    """Generate one project's documentation; returns the elapsed seconds"""
+    start = time.perf_counter()
+    config = load_config(config_path)
+    create_project_documentation(config["output"], cache_dir, config.get("formats", formats),
+                                 config, parallel=False)
+    return time.perf_counter() - start
+
+
+def run_batch(config_paths, workers=None, cache_dir=CACHE_DIR, formats=("docx",)):
+    """Generate every project on a process pool
+
+    Returns (config_path, error, seconds) per project in completion order;
+    error is None on success.
+    """
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(generate_project, path, cache_dir, formats): path
+                   for path in config_paths}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                results.append((path, None, future.result()))
+            except Exception as e:
+                results.append((path, f"{type(e).__name__}: {e}", None))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate documentation for many projects in parallel")
+    parser.add_argument("config_dir", help="directory of per-project *.json configs")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="fragment cache shared by all projects")
+    parser.add_argument("--formats", default="docx",
+                        help="comma-separated formats for configs that do not set them")
+    args = parser.parse_args(argv)
+
+    config_paths = sorted(glob.glob(os.path.join(args.config_dir, "*.json")))
+    if not config_paths:
+        print(f"No project configs found in {args.config_dir}", file=sys.stderr)
+        return 2
+
+    start = time.perf_counter()
+    results = run_batch(config_paths, args.workers, args.cache_dir, tuple(args.formats.split(",")))
+
+    failed = 0
+    for path, error, seconds in sorted(results):
+        name = os.path.basename(path)
+        if error is None:
+            print(f"OK      {name} ({seconds:.2f}s)")
+        else:
+            failed += 1
+            print(f"FAILED  {name}: {error}")
+    print(f"{len(results) - failed} succeeded, {failed} failed "
+          f"in {time.perf_counter() - start:.2f}s with {args.workers} workers")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""Benchmark of the response catalog's index against the linear scan
+
+Builds synthetic catalogs of 10, 1,000 and 100,000 patterns (a quarter
+exact, the rest contains patterns of two to four words, one pattern per
+entry) and answers the same messages with linear_match(), the chain of
+checks ChatService runs, and with the compiled ResponseIndex, after a
+round trip through its data file. Records the compile time, data file
+size, load time and mean time per message of each; every answer of the
+index is checked against the linear scan. Half the messages hit a random
+pattern, the other half go to Gemini, which is where a scan does the
+most work.
+
+    python benchmarks/bench_catalog.py
+    python benchmarks/bench_catalog.py --patterns 10 1000 --messages 500
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from response_catalog import compile_catalog, linear_match, read_index, write_index  # noqa: E402
+
+PATTERN_COUNTS = [10, 1000, 100000]
+MESSAGES = 2000
+# The linear scan is timed for at most this long per case
+SCAN_SECONDS = 10.0
+
+WORDS = ("devops maven spring boot java docker gemini api chat bot build deploy test cache "
+         "server client token model prompt stream queue index thread pool config log metric "
+         "trace alert cloud cluster node pod image volume secret route proxy gateway").split()
+
+
+def synthetic_catalog(count, seed=0):
+    rng = random.Random(seed)
+    entries = []
+    for number in range(count):
+        words = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 4)))
+        kind = "exact" if number % 4 == 0 else "contains"
+        entries.append({"id": f"entry-{number}", "description": "", kind: [f"{words} {number}"],
+                        "response": f"Response {number}"})
+    return entries
+
+
+def synthetic_messages(entries, count, seed=1):
+    rng = random.Random(seed)
+    messages = []
+    for number in range(count):
+        if number % 2:
+            entry = rng.choice(entries)
+            pattern = (entry.get("exact") or entry["contains"])[0]
+            messages.append(pattern if "exact" in entry else f"so, {pattern} please?")
+        else:
+            words = " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 12)))
+            messages.append(f"what about {words}?")
+    return messages
+
+
+def per_message(match, messages, budget):
+    """Mean seconds per message, on as many messages as fit in budget"""
+    start = time.perf_counter()
+    done = 0
+    for message in messages:
+        match(message)
+        done += 1
+        if time.perf_counter() - start > budget:
+            break
+    return (time.perf_counter() - start) / done, done
+
+
+def run_case(count, messages_count, work_dir):
+    entries = synthetic_catalog(count)
+    messages = synthetic_messages(entries, messages_count)
+
+    start = time.perf_counter()
+    index = compile_catalog(entries)
+    compile_s = time.perf_counter() - start
+    path = os.path.join(work_dir, f"catalog-{count}.bin")
+    write_index(index, path)
+    start = time.perf_counter()
+    index = read_index(path)
+    load_s = time.perf_counter() - start
+
+    scan_s, scanned = per_message(lambda message: linear_match(entries, message), messages,
+                                  SCAN_SECONDS)
+    index_s, _ = per_message(index.match, messages, float("inf"))
+    for message in messages[:scanned]:
+        if index.match(message) != linear_match(entries, message):
+            raise AssertionError(f"index and linear scan disagree on {message!r}")
+    return {"patterns": count, "states": index.states, "compile_s": compile_s,
+            "file_bytes": os.path.getsize(path), "load_s": load_s,
+            "scan_us": scan_s * 1e6, "index_us": index_s * 1e6, "checked": scanned}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the response catalog index")
+    parser.add_argument("--patterns", type=int, nargs="+", default=PATTERN_COUNTS)
+    parser.add_argument("--messages", type=int, default=MESSAGES)
+    args = parser.parse_args(argv)
+
+    print(f"{'patterns':>9} {'states':>10} {'compile':>9} {'file':>10} {'load':>8} "
+          f"{'scan/msg':>11} {'index/msg':>11} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as work_dir:
+        for count in args.patterns:
+            result = run_case(count, args.messages, work_dir)
+            print(f"{result['patterns']:>9,} {result['states']:>10,} "
+                  f"{result['compile_s']:>8.2f}s {result['file_bytes'] / 1024:>8.0f}KB "
+                  f"{result['load_s'] * 1000:>6.1f}ms {result['scan_us']:>9.1f}us "
+                  f"{result['index_us']:>9.1f}us {result['scan_us'] / result['index_us']:>7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,381 @@
+"""Benchmarks for document generation at synthetic scale
+
+Builds synthetic documents of 10 to 10,000 sections with varying numbers
+of code blocks, bullet items and images, and records wall time, peak RSS,
+package save time and output size per case. The docx cases render
+sections on a worker process per CPU, docx-serial in one process; the
+edit and update cases rebuild after one section changed. The save-*
+cases time only the save of one document, with python-docx's doc.save()
+and with the package writer of docx_package; table-* builds one table
+from a generator of rows. Each case runs in a fresh process so peak RSS
+is its own (worker processes excluded). Results are compared against a
+stored JSON baseline; a case slower than the baseline by more than the
+tolerance fails the run. Fixture images are generated, so no network or
+real screenshots are needed.
+
+    python benchmarks/bench_generation.py                  compare with baseline
+    python benchmarks/bench_generation.py --cases code     only matching cases
+    python benchmarks/bench_generation.py --update-baseline
+"""
+import argparse
+import fnmatch
+import json
+import os
+import random
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+FIXTURE_DIR = os.path.join(ROOT, ".doc_cache", "bench_fixtures")
+TOLERANCE = 0.25
+
+# name, kind, sections (or calls, or runs), code blocks, bullet items and images per section
+CASES = [
+    ("docx-10", "docx", 10, 2, 5, 1),
+    ("docx-100", "docx", 100, 2, 5, 1),
+    ("docx-1000", "docx", 1000, 2, 5, 1),
+    ("docx-10000", "docx", 10000, 2, 5, 0),
+    ("docx-cached-1000", "docx-cached", 1000, 2, 5, 1),
+    # docx-1000 with every section rendered in this process
+    ("docx-serial-1000", "docx-serial", 1000, 2, 5, 1),
+    # Rebuild of an image-heavy manual after one code block changed: written
+    # whole, and patched in place (update option)
+    ("docx-edit-image-heavy-100", "docx-edit", 100, 1, 0, 5),
+    ("docx-update-image-heavy-100", "docx-update", 100, 1, 0, 5),
+    ("docx-code-heavy-100", "docx", 100, 20, 0, 0),
+    ("docx-bullet-heavy-100", "docx", 100, 0, 200, 0),
+    ("docx-image-heavy-100", "docx", 100, 0, 0, 5),
+    ("docx-stream-10000", "docx-stream", 10000, 2, 5, 0),
+    ("save-docx-1000", "save-docx", 1000, 2, 5, 1),
+    ("save-package-1000", "save-package", 1000, 2, 5, 1),
+    ("save-docx-image-heavy-20", "save-docx", 20, 0, 0, 2),
+    ("save-package-image-heavy-20", "save-package", 20, 0, 0, 2),
+    ("heading-1000", "heading", 1000, 0, 0, 0),
+    ("heading-10000", "heading", 10000, 0, 0, 0),
+    ("code-1000", "code", 1000, 0, 0, 0),
+    ("code-10000", "code", 10000, 0, 0, 0),
+    # One numbered listing of this many lines
+    ("listing-5000", "listing", 5000, 0, 0, 0),
+    # One four-column table of this many rows, from a generator
+    ("table-50000", "table", 50000, 0, 0, 0),
+    # Cold start: median of 10 fresh interpreters
+    ("import-doc_build", "import", 10, 0, 0, 0),
+    ("import-generate_documentation", "import", 10, 0, 0, 0),
+    ("cli-check-up-to-date", "cli-check", 10, 0, 0, 0),
+]
+
+# Fixture screenshots: (width, height) in pixels
+FIXTURE_SIZES = [(1920, 1080), (1280, 800), (800, 600)]
+# The save-* and edit cases use this many distinct screenshots with noisy content,
+# which like real ones do not deflate much further
+SCREENSHOT_COUNT = 40
+SCREENSHOT_SIZE = (1280, 800)
+
+EDIT_KINDS = ("docx-edit", "docx-update")
+
+CODE = """@PostMapping("/api/chat{i}")
+@ResponseBody
+public ResponseEntity<ChatResponse> chat{i}(@RequestBody ChatRequest request) {{
+    if (request.getMessage() == null || request.getMessage().isBlank()) {{
+        return ResponseEntity.badRequest().build();  // empty message
+    }}
+    ChatResponse response = chatService.getChatResponse(request.getMessage());
+    return ResponseEntity.ok(response);
+}}"""
+
+
+def write_png(path, width, height, noise_seed=None):
+    """Write an RGB gradient PNG without needing an imaging library
+
+    With noise_seed every fourth row is random, seeded for repeatable files.
+    """
+    noise = random.Random(noise_seed) if noise_seed is not None else None
+    row = bytearray(3 * width)
+    row[0::3] = bytes(x * 255 // width for x in range(width))
+    row[2::3] = bytes((x * 7) & 0xFF for x in range(width))
+    rows = []
+    for y in range(height):
+        row[1::3] = bytes([y * 255 // height]) * width
+        data = noise.randbytes(3 * width) if noise and y % 4 == 0 else bytes(row)
+        rows.append(b"\0" + data)  # filter type: none
+
+    def chunk(tag, data):
+        return (struct.pack(">I", len(data)) + tag + data
+                + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF))
+
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        f.write(chunk(b"IDAT", zlib.compress(b"".join(rows), 6)))
+        f.write(chunk(b"IEND", b""))
+
+
+def fixture_images(directory=FIXTURE_DIR):
+    """Generate the fixture screenshots, once"""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for width, height in FIXTURE_SIZES:
+        path = os.path.join(directory, f"fixture-{width}x{height}.png")
+        if not os.path.exists(path):
+            write_png(path, width, height)
+        paths.append(path)
+    return paths
+
+
+def screenshot_fixtures(directory=FIXTURE_DIR):
+    """Generate the distinct noisy screenshots of the save-* cases, once"""
+    os.makedirs(directory, exist_ok=True)
+    width, height = SCREENSHOT_SIZE
+    paths = []
+    for i in range(SCREENSHOT_COUNT):
+        path = os.path.join(directory, f"screenshot-{i}-{width}x{height}.png")
+        if not os.path.exists(path):
+            write_png(path, width, height, noise_seed=i)
+        paths.append(path)
+    return paths
+
+
+def synthetic_sections(count, code_blocks, bullets, images, image_paths):
+    """Sections shaped like the real documentation's"""
+    from doc_model import BulletList, CodeBlock, Heading, Image, PageBreak, Section, text
+    from doc_content import HEADING_COLOR, SUBHEADING_COLOR
+
+    sections = []
+    for i in range(count):
+        blocks = [Heading(f"{i + 1}. Endpoint {i}", 1, HEADING_COLOR),
+                  text(f"Endpoint {i} answers chat messages. " * 4),
+                  Heading(f"{i + 1}.1 Parameters", 2, SUBHEADING_COLOR)]
+        if bullets:
+            blocks.append(BulletList(tuple(f"• parameter_{i}_{j}: description of the parameter"
+                                           for j in range(bullets))))
+        for j in range(code_blocks):
+            blocks.append(CodeBlock(CODE.format(i=f"{i}_{j}"), f"Endpoint{i}.java", "java"))
+        for j in range(images):
+            blocks.append(Image(image_paths[(i + j) % len(image_paths)], 5))
+        blocks.append(PageBreak())
+        sections.append(Section(f"section_{i}", tuple(blocks)))
+    return sections
+
+
+def edited(section):
+    """section with a line added to its code blocks"""
+    from dataclasses import replace
+    from doc_model import CodeBlock
+    return replace(section, blocks=tuple(
+        replace(block, code=block.code + "\n// edited") if isinstance(block, CodeBlock) else block
+        for block in section.blocks))
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    try:
+        import resource
+    except ImportError:
+        # Windows: PeakWorkingSetSize from GetProcessMemoryInfo
+        import ctypes
+        from ctypes import wintypes
+
+        class Counters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+                (name, ctypes.c_size_t) for name in (
+                    "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage",
+                    "QuotaPagedPoolUsage", "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage",
+                    "PagefileUsage", "PeakPagefileUsage")]
+        counters = Counters(cb=ctypes.sizeof(Counters))
+        ctypes.windll.psapi.GetProcessMemoryInfo(ctypes.windll.kernel32.GetCurrentProcess(),
+                                                 ctypes.byref(counters), counters.cb)
+        return counters.PeakWorkingSetSize / 2**20
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def run_command_case(case, work_dir):
+    """Median wall time of a command in fresh interpreters
+
+    Peak RSS is not recorded: a child's high-water mark includes the
+    parent's pages from before it execs.
+    """
+    name, kind, runs = case[:3]
+    output = os.path.join(work_dir, f"{name}.docx")
+    if kind == "import":
+        command = [sys.executable, "-c", f"import {name.split('-', 1)[1]}"]
+    else:
+        cli = [sys.executable, os.path.join(ROOT, "doc_build.py")]
+        subprocess.run(cli + ["generate", "--force", "--output", output], cwd=ROOT,
+                       check=True, capture_output=True)
+        command = cli + ["check", "--output", output]
+
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, check=True, capture_output=True)
+        times.append(time.perf_counter() - start)
+    return {"wall_s": round(sorted(times)[len(times) // 2], 3), "save_s": 0.0, "peak_rss_mb": 0.0,
+            "output_bytes": os.path.getsize(output) if os.path.exists(output) else 0}
+
+
+def run_case(case, work_dir):
+    """Run one case in this process and return its measurements"""
+    name, kind, count, code_blocks, bullets, images = case
+    if kind in ("import", "cli-check"):
+        return run_command_case(case, work_dir)
+    from docx import Document
+    from docx.document import Document as DocumentClass
+    import generate_documentation as gen
+    from cache_keys import write_atomic
+
+    # Time every doc.save(), package write and package update made while the case runs
+    save_seconds = [0.0]
+
+    def timed(save):
+        def timed_save(*args):
+            start = time.perf_counter()
+            result = save(*args)
+            save_seconds[0] += time.perf_counter() - start
+            return result
+        return timed_save
+    DocumentClass.save = timed(DocumentClass.save)
+    gen.save_docx = timed(gen.save_docx)
+    gen.update_docx = timed(gen.update_docx)
+
+    output = os.path.join(work_dir, f"{name}.docx")
+    options = gen.default_options(os.path.join(work_dir, f"cache-{name}"),
+                                  section_workers=1 if kind == "docx-serial" else None,
+                                  update=kind == "docx-update")
+    image_paths = []
+    if images:
+        image_paths = (screenshot_fixtures() if kind.startswith("save-") or kind in EDIT_KINDS
+                       else fixture_images())
+
+    start = time.perf_counter()
+    if kind == "heading":
+        doc = Document()
+        for i in range(count):
+            gen.add_heading_with_color(doc, f"Heading {i}", 1 + i % 2)
+        doc.save(output)
+    elif kind == "code":
+        doc = Document()
+        for i in range(count):
+            gen.add_code_block(doc, CODE.format(i=i), f"Example{i}.java", syntax="java")
+        doc.save(output)
+    elif kind == "listing":
+        code = "\n".join("\n".join(CODE.format(i=i) for i in range(count)).split("\n")[:count])
+        doc = Document()
+        gen.add_code_block(doc, code, "Listing.java", syntax="java", line_numbers=True)
+        doc.save(output)
+    elif kind == "table":
+        doc = Document()
+        rows = ((f"Query {i}", f"{i * 7 % 1000:,}", f"{i % 97 / 10:.1f}", f"{i % 13 * 1.5:.1f}")
+                for i in range(count))
+        gen.add_table(doc, ("Query", "Requests", "p50 (ms)", "p99 (ms)"), rows)
+        doc.save(output)
+    elif kind in ("save-docx", "save-package"):
+        doc = Document()
+        for section in synthetic_sections(count, code_blocks, bullets, images, image_paths):
+            for block in section.blocks:
+                gen.render_block(doc, block, options)
+        start = time.perf_counter()
+        if kind == "save-docx":
+            doc.save(output)
+        else:
+            write_atomic(output, gen.save_docx(doc, options))
+    else:
+        sections = synthetic_sections(count, code_blocks, bullets, images, image_paths)
+        if kind == "docx-stream":
+            from ooxml_stream import render_docx_streaming
+            render_docx_streaming(sections, output, options)
+        else:
+            if kind == "docx-cached" or kind in EDIT_KINDS:
+                # Warm the fragment cache, then measure the rebuild from it
+                gen.render_docx(sections, output, options)
+                if kind in EDIT_KINDS:
+                    sections[0] = edited(sections[0])
+                save_seconds[0] = 0.0
+                start = time.perf_counter()
+            gen.render_docx(sections, output, options)
+    wall = time.perf_counter() - start
+
+    return {"wall_s": round(wall, 3), "save_s": round(save_seconds[0], 3),
+            "peak_rss_mb": round(peak_rss_mb(), 1), "output_bytes": os.path.getsize(output)}
+
+
+def run_isolated(case, work_dir):
+    """Run a case in a fresh interpreter so its peak RSS is its own"""
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), "--run-case", case[0],
+                             "--work-dir", work_dir],
+                            capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError(f"{case[0]} failed:\n{result.stderr}")
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def compare(name, result, baseline, tolerance):
+    """Report line for a case, and whether it regressed"""
+    line = (f"{name:<30} {result['wall_s']:>8.3f}s  save {result['save_s']:>6.2f}s  "
+            f"{result['peak_rss_mb']:>7.1f} MB  {result['output_bytes']:>11,} B")
+    if baseline is None:
+        return line + "  (no baseline)", False
+    ratio = result["wall_s"] / max(baseline["wall_s"], 0.001)
+    regressed = result["wall_s"] > baseline["wall_s"] * (1 + tolerance) and result["wall_s"] > 0.02
+    return line + f"  {ratio:>5.2f}x baseline" + ("  REGRESSION" if regressed else ""), regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark document generation at synthetic scale")
+    parser.add_argument("--cases", default="*",
+                        help="case name, or glob or substring of the case names to run")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline JSON file")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="store this run's results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="allowed wall time increase over the baseline (default: 0.25)")
+    parser.add_argument("--run-case", help=argparse.SUPPRESS)
+    parser.add_argument("--work-dir", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_case:
+        case = next(case for case in CASES if case[0] == args.run_case)
+        print(json.dumps(run_case(case, args.work_dir)))
+        return 0
+
+    cases = [case for case in CASES if case[0] == args.cases]
+    if not cases:
+        pattern = args.cases if any(c in args.cases for c in "*?[") else f"*{args.cases}*"
+        cases = [case for case in CASES if fnmatch.fnmatch(case[0], pattern)]
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["cases"]
+
+    results, regressions = {}, 0
+    with tempfile.TemporaryDirectory(prefix="doc-bench-") as work_dir:
+        for case in cases:
+            results[case[0]] = run_isolated(case, work_dir)
+            line, regressed = compare(case[0], results[case[0]], baseline.get(case[0]),
+                                      args.tolerance)
+            regressions += regressed
+            print(line, flush=True)
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "platform": sys.platform,
+                       "cases": {**baseline, **results}}, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+    if regressions:
+        print(f"{regressions} case(s) slower than the baseline by more than {args.tolerance:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
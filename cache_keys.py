@@ -0,0 +1,150 @@
+"""Cache keys and output manifests
+
+Everything needed to decide whether an output is up to date: section keys
+hashed from the document model, the screenshots and the renderer sources,
+and per-output manifests of the keys an output was built from. This module
+only uses the standard library, so an up-to-date check never has to import
+python-docx.
+"""
+import hashlib
+import importlib.util
+import json
+import os
+
+# Bump when the fragment format or the way sections are assembled changes
+CACHE_VERSION = 3
+
+# (path, mtime, size) -> digest, so a screenshot used by many sections is hashed once
+_digests = {}
+
+
+def file_stat(path):
+    """[mtime in ns, size] of a file, or None if it does not exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def file_digest(path):
+    """SHA-256 of a file's bytes, or None if it does not exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    if key not in _digests:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        _digests[key] = digest.hexdigest()
+    return _digests[key]
+
+
+def source_digest(modules):
+    """Hash of the source files of modules, found without importing them"""
+    digest = hashlib.sha256()
+    for module in modules:
+        digest.update(f"{module}={file_digest(importlib.util.find_spec(module).origin)}\n".encode())
+    return digest.hexdigest()
+
+
+def section_key(name, content, images=(), code_digest="", style=None):
+    """Hash a section's inputs: its text and code, screenshots and styling
+
+    content is the section's JSON-serializable model holding its text and
+    code snippets, code_digest covers the rendering code and style the
+    parameters that decide how they are formatted, and the image digests
+    cover the embedded screenshots.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"v{CACHE_VERSION}:{name}\n".encode())
+    digest.update(json.dumps(content, sort_keys=True).encode())
+    digest.update(code_digest.encode())
+    digest.update(json.dumps(style, sort_keys=True).encode())
+    for path in images:
+        digest.update(f"{path}={file_digest(path)}\n".encode())
+    return digest.hexdigest()
+
+
+def write_atomic(path, data):
+    """Write data to path through a temporary file, creating its directory"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class OutputManifests:
+    """Per-output records of the keys each output was built from"""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.manifest_dir = os.path.join(cache_dir, "manifests")
+
+    def _manifest_path(self, output_path):
+        # One manifest per output, so concurrent builds never share a file
+        name = hashlib.sha256(os.path.abspath(output_path).encode()).hexdigest()
+        return os.path.join(self.manifest_dir, f"{name}.json")
+
+    def is_up_to_date(self, output_path, keys):
+        """True if output_path was built from exactly these section keys
+
+        An output with the mtime and size recorded when it was written is
+        taken to be unchanged; only one that differs is hashed, so a check
+        does not read every output in full.
+        """
+        path = self._manifest_path(output_path)
+        if not os.path.exists(path):
+            return False
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest["sections"] != keys:
+            return False
+        stat = file_stat(output_path)
+        if stat is not None and stat == manifest.get("output_stat"):
+            return True
+        if manifest["output_sha256"] != file_digest(output_path):
+            return False
+        # Same bytes with a new mtime, e.g. copied back: skip the hash next time
+        manifest["output_stat"] = stat
+        write_atomic(path, json.dumps(manifest, indent=2).encode("utf-8"))
+        return True
+
+    def _parts_path(self, output_path):
+        return self._manifest_path(output_path)[:-len(".json")] + ".parts.json"
+
+    def part_digests(self, output_path):
+        """{part name: digest} recorded for the package at output_path
+
+        None when nothing was recorded or the file's mtime or size differ
+        from when it was, e.g. after it was saved from Word.
+        """
+        try:
+            with open(self._parts_path(output_path), encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if record.get("output_stat") != file_stat(output_path):
+            return None
+        return record["parts"]
+
+    def write_part_digests(self, output_path, digests):
+        """Record the digests of the parts just written to the package at output_path"""
+        record = {"output_stat": file_stat(output_path), "parts": digests}
+        write_atomic(self._parts_path(output_path), json.dumps(record).encode("utf-8"))
+
+    def write_manifest(self, output_path, keys):
+        """Record which section keys produced output_path"""
+        os.makedirs(self.manifest_dir, exist_ok=True)
+        manifest = {
+            "output": os.path.abspath(output_path),
+            "sections": keys,
+            "output_sha256": file_digest(output_path),
+            "output_stat": file_stat(output_path),
+        }
+        write_atomic(self._manifest_path(output_path),
+                     json.dumps(manifest, indent=2).encode("utf-8"))
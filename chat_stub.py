@@ -0,0 +1,117 @@
+"""Local stand-in for the chatbot's POST /api/chat endpoint
+
+Speaks the same JSON contract as ChatController: {"message": ...} in,
+{"response": ...} out, 400 with "Please provide a valid message." for an
+empty message. Queries ChatService answers from its hardcoded list, the
+response catalog (see response_catalog), are answered immediately;
+anything else is sent to an in-process Gemini stub (see gemini_stub),
+which replays recordings and otherwise simulates the round trip. A failed
+Gemini call is answered the way ChatService reports it, "Error: ...".
+HTTP/1.1 keep-alive is supported (see http_server), so load tests
+measure pooled connections the way a real client would use them.
+
+    python chat_stub.py --port 8085 --passthrough-latency 0.2
+    python chat_stub.py --gemini-recordings gemini_recordings.jsonl.gz --gemini-error-rate 0.02
+"""
+import argparse
+import asyncio
+import json
+
+import http_server
+from gemini_stub import (DEFAULT_MODEL, GeminiStub, Latency, RecordingStore, chat_request,
+                         response_text)
+from response_catalog import load_index
+
+DEFAULT_PORT = 8085
+# Simulated Gemini round trip for queries without a hardcoded response (seconds)
+PASSTHROUGH_LATENCY = 0.2
+PASSTHROUGH_JITTER = 0.25  # +/- fraction of the latency
+
+# The compiled response catalog, mirroring ChatService.getHardcodedResponse
+_index = load_index()
+
+
+def hardcoded_response(message):
+    """The stub's hardcoded answer to message, or None if it is passed through"""
+    return _index.response(message)
+
+
+def gemini_stub(passthrough_latency=PASSTHROUGH_LATENCY, recordings=None, error_rate=0.0,
+                seed=None):
+    """The Gemini stub pass-through queries go to: recordings replayed, anything
+    else simulated, both after passthrough_latency +/- PASSTHROUGH_JITTER"""
+    latency = Latency(f"jitter:{passthrough_latency},{PASSTHROUGH_JITTER}")
+    return GeminiStub(RecordingStore(recordings), latency, error_rate, seed=seed)
+
+
+async def chat_response(message, gemini):
+    response = hardcoded_response(message)
+    if response is None:
+        status, payload = await gemini.generate(DEFAULT_MODEL, chat_request(message))
+        if status == 200:
+            response = response_text(payload)
+        else:
+            response = f"Error: {status} {payload.get('error', {}).get('status', '')}".rstrip()
+    return response
+
+
+async def _handle(request, gemini):
+    """(status, payload) for one request"""
+    method, path, headers, body = request
+    if path.split("?", 1)[0] != "/api/chat":
+        return 404, {"error": "Not Found"}
+    if method != "POST":
+        return 405, {"error": "Method Not Allowed"}
+    try:
+        message = json.loads(body or b"null")["message"]
+    except (ValueError, TypeError, KeyError):
+        message = None
+    if not isinstance(message, str) or not message.strip():
+        return 400, {"response": "Please provide a valid message."}
+    return 200, {"response": await chat_response(message, gemini)}
+
+
+def serve(host="127.0.0.1", port=DEFAULT_PORT, passthrough_latency=PASSTHROUGH_LATENCY,
+          gemini=None):
+    """Coroutine returning a started asyncio server; port 0 picks a free port
+
+    gemini answers pass-through queries, by default gemini_stub(passthrough_latency).
+    """
+    gemini = gemini or gemini_stub(passthrough_latency)
+
+    async def handle(request):
+        return http_server.json_response(*await _handle(request, gemini))
+
+    return http_server.serve(handle, host, port)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a stub of the chatbot's POST /api/chat")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--passthrough-latency", type=float, default=PASSTHROUGH_LATENCY,
+                        help="simulated Gemini latency in seconds (default: %(default)s)")
+    parser.add_argument("--gemini-recordings",
+                        help="replay Gemini responses recorded by gemini_stub.py")
+    parser.add_argument("--gemini-error-rate", type=float, default=0.0,
+                        help="share of Gemini calls failed with 429/503/500 (default: %(default)s)")
+    parser.add_argument("--seed", type=int, help="seed Gemini latency and errors")
+    args = parser.parse_args(argv)
+    gemini = gemini_stub(args.passthrough_latency, args.gemini_recordings,
+                         args.gemini_error_rate, args.seed)
+
+    async def run():
+        server = await serve(args.host, args.port, args.passthrough_latency, gemini)
+        print(f"Stub chat API listening on http://{args.host}:{server.sockets[0].getsockname()[1]}"
+              "/api/chat")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
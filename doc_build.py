@@ -0,0 +1,222 @@
+"""Command line entry point: decide what is stale, render only that
+
+    python doc_build.py check [--output PATH] [--config JSON] [--formats docx,html]
+                              [--reproducible]
+    python doc_build.py generate [--output PATH] [--config JSON] [--formats ...] [--force]
+                                 [--reproducible | --update] [--watch | --profile REPORT]
+
+check exits with 0 when every output is up to date and 1 otherwise.
+Whether an output is stale is decided from hashes of its inputs alone:
+nothing imported at the top level here needs python-docx, which, like
+the renderers, is only imported once something has to be rendered.
+"""
+import argparse
+import functools
+import os
+import sys
+from dataclasses import asdict
+
+import doc_content
+from cache_keys import OutputManifests, section_key, source_digest
+from docx_package import DEFLATE_LEVEL, build_date
+from doc_model import DEFAULT_THEME, to_json
+from image_pipeline import DEFAULT_DPI, JPEG_QUALITY
+from renderers import extension, render_formats, renderer_digest
+
+OUTPUT_PATH = r"c:\Users\perfe\Desktop\devops\Spring_Boot_Chatbot_Documentation.docx"
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".doc_cache")
+
+# Screenshots are resampled to their display width at this DPI; set
+# IMAGE_FORMAT to "jpeg" to also convert them to JPEG
+IMAGE_DPI = DEFAULT_DPI
+IMAGE_FORMAT = None
+
+# zlib level of the XML parts of .docx outputs; media is stored uncompressed
+DOCX_DEFLATE_LEVEL = DEFLATE_LEVEL
+
+# Modules whose source is part of every section's cache key
+RENDER_MODULES = ["generate_documentation", "doc_styles", "doc_template", "syntax_highlight",
+                  "image_pipeline", "fragment_cache", "docx_package"]
+
+
+def default_options(cache_dir=CACHE_DIR, reproducible=False, section_workers=None, update=False):
+    """Rendering options shared by every output format
+
+    reproducible makes .docx outputs byte-identical for identical inputs
+    (see docx_package). section_workers caps the processes the .docx
+    renderer renders sections in (default: one per CPU; 1 renders serially).
+    update patches an existing .docx in place, writing only the parts that
+    changed (see docx_package.update_package); it is ignored when
+    reproducible is set.
+    """
+    return {"cache_dir": cache_dir, "image_dpi": IMAGE_DPI, "image_format": IMAGE_FORMAT,
+            "deflate_level": DOCX_DEFLATE_LEVEL, "reproducible": reproducible,
+            "section_workers": section_workers, "update": update}
+
+
+def is_reproducible(config=None, reproducible=None):
+    """Whether to build reproducibly: explicitly, per config, or when SOURCE_DATE_EPOCH is set"""
+    if reproducible is not None:
+        return reproducible
+    return bool((config or {}).get("reproducible", "SOURCE_DATE_EPOCH" in os.environ))
+
+
+def section_keys(sections, options):
+    """Fragment cache key of every section"""
+    style = {"image_dpi": options["image_dpi"], "image_format": options["image_format"],
+             "jpeg_quality": JPEG_QUALITY, "theme": asdict(DEFAULT_THEME)}
+    code_digest = source_digest(RENDER_MODULES)
+    return [section_key(section.name, to_json(section), section.images, code_digest, style)
+            for section in sections]
+
+
+def output_paths(output_path, formats):
+    """Map each format to an output path sharing output_path's stem
+
+    .docx formats other than "docx", such as "docx-stream", write to
+    output_path too unless "docx" is also requested; then they get a
+    suffix (stem-stream.docx) so no two renderers write the same file.
+    """
+    stem = os.path.splitext(output_path)[0]
+    paths = {}
+    for fmt in formats:
+        if extension(fmt) != "docx":
+            paths[fmt] = f"{stem}.{extension(fmt)}"
+        elif fmt == "docx" or "docx" not in formats:
+            paths[fmt] = output_path
+        else:
+            paths[fmt] = f"{stem}-{fmt.split('-')[-1]}.docx"
+    return paths
+
+
+def output_keys(keys, fmt, options):
+    """Manifest keys of one output: its section keys plus how it is written"""
+    keys = keys + [renderer_digest(fmt), f"deflate:{options['deflate_level']}"]
+    if options["reproducible"]:
+        keys.append(f"reproducible:{build_date()}")
+    return keys
+
+
+def stale_outputs(sections, output_path, formats, options):
+    """{fmt: path} of the outputs not built from the current inputs"""
+    manifests = OutputManifests(options["cache_dir"])
+    keys = section_keys(sections, options)
+    return {fmt: path for fmt, path in output_paths(output_path, formats).items()
+            if not manifests.is_up_to_date(path, output_keys(keys, fmt, options))}
+
+
+def create_project_documentation(output_path=OUTPUT_PATH, cache_dir=CACHE_DIR, formats=("docx",),
+                                 config=None, parallel=True, force=False, reproducible=None,
+                                 update=False):
+    """Create comprehensive Word document for the Spring Boot Chatbot project
+
+    The content is parsed once into a document model and rendered to every
+    requested format ("docx", "html", "md", or "docx-stream" for the
+    streaming backend meant for very large documents), in parallel worker
+    processes when there is more than one and parallel is set, which also
+    lets the .docx renderer render sections in worker processes. Sections
+    are cached under a hash of their inputs, so later runs only re-render
+    what changed, and outputs whose inputs are unchanged are skipped
+    entirely unless force is set. config overrides project-specific content, see
+    build_sections(). reproducible (default: the config's "reproducible",
+    else whether SOURCE_DATE_EPOCH is set) writes byte-reproducible .docx
+    files; otherwise update patches an existing .docx in place.
+    """
+    sections = doc_content.build_sections(config, cache_dir)
+    options = default_options(cache_dir, is_reproducible(config, reproducible),
+                              None if parallel else 1, update)
+    stale = (output_paths(output_path, formats) if force
+             else stale_outputs(sections, output_path, formats, options))
+    if not stale:
+        print(f"Documentation is up to date: {output_path}")
+        return output_path
+
+    if len(stale) > 1:
+        # Build lazy sections once here instead of in every renderer's process
+        for section in sections:
+            section.blocks
+    results = render_formats(sections, stale, options, max_workers=None if parallel else 1)
+    manifests = OutputManifests(cache_dir)
+    keys = section_keys(sections, options)
+    for fmt, path in stale.items():
+        manifests.write_manifest(path, output_keys(keys, fmt, options))
+        print(f"Documentation created successfully: {path}")
+        if results[fmt]:
+            print(f"Rendered sections: {', '.join(results[fmt])}")
+    return output_path
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or (argv[0].startswith("-") and argv[0] not in ("-h", "--help")):
+        # `python generate_documentation.py [options]` generates, as it always has
+        argv.insert(0, "generate")
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--output", help=f"output path (default: the config's, or {OUTPUT_PATH})")
+    common.add_argument("--config", help="project config JSON overriding the content "
+                                         "(see batch_generate)")
+    common.add_argument("--formats", help="comma-separated output formats (default: docx)")
+    common.add_argument("--reproducible", action="store_true", default=None,
+                        help="write byte-identical .docx files for identical inputs "
+                             "(on by default when SOURCE_DATE_EPOCH is set)")
+
+    parser = argparse.ArgumentParser(description="Generate the Spring Boot Chatbot documentation")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("check", parents=[common],
+                        help="exit 0 if every output is up to date, 1 if any is stale")
+    generate = commands.add_parser("generate", parents=[common],
+                                   help="render the outputs that are stale")
+    generate.add_argument("--force", action="store_true", help="render even if up to date")
+    generate.add_argument("--update", action="store_true",
+                          help="patch an existing .docx in place, writing only the parts that "
+                               "changed (ignored with --reproducible)")
+    generate.add_argument("--watch", action="store_true",
+                          help="regenerate whenever the content, config, screenshots or "
+                               "Java sources change")
+    generate.add_argument("--profile", metavar="REPORT",
+                          help="time each section and helper; writes REPORT (JSON) and a .txt summary")
+    args = parser.parse_args(argv)
+
+    config = doc_content.load_config(args.config) if args.config else None
+    output_path = args.output or (config["output"] if config else OUTPUT_PATH)
+    formats = (tuple(args.formats.split(",")) if args.formats
+               else tuple((config or {}).get("formats", ("docx",))))
+
+    if args.command == "check":
+        sections = doc_content.build_sections(config, CACHE_DIR)
+        options = default_options(reproducible=is_reproducible(config, args.reproducible))
+        stale = stale_outputs(sections, output_path, formats, options)
+        for fmt, path in output_paths(output_path, formats).items():
+            print(f"{'Stale' if fmt in stale else 'Up to date'}: {path}")
+        return 1 if stale else 0
+
+    if args.watch and args.profile:
+        parser.error("--profile cannot be combined with --watch")
+    if args.watch:
+        from doc_watch import watch_documentation
+        create = functools.partial(create_project_documentation, reproducible=args.reproducible,
+                                   update=args.update)
+        watch_documentation(create, output_path, CACHE_DIR, formats,
+                            args.config)
+    elif args.profile:
+        from doc_profile import Profiler
+        # The profiler wraps doc_build's functions, which are not the ones
+        # __main__ calls when this file is run as a script
+        from doc_build import create_project_documentation as create
+        profiler = Profiler()
+        profiler.start()
+        # Profile in this process; worker processes would not be instrumented
+        create(output_path, CACHE_DIR, formats, config, parallel=False, force=args.force,
+               reproducible=args.reproducible, update=args.update)
+        profiler.stop()
+        profiler.write_report(args.profile)
+        print(profiler.summary())
+    else:
+        create_project_documentation(output_path, CACHE_DIR, formats, config, force=args.force,
+                                     reproducible=args.reproducible, update=args.update)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,906 @@
+"""Content of the Spring Boot Chatbot documentation as a document model
+
+Each build_* function returns one section of the document; build_sections()
+parses the whole content once into the model that every renderer consumes.
+This module does not depend on python-docx.
+"""
+import json
+import os
+from datetime import date
+
+from cache_keys import file_stat
+from doc_model import (DEFAULT_THEME, BulletList, ChatTranscript, CodeBlock, Heading, Image,
+                       LazySection, PageBreak, Paragraph, Run, Section, Table, blank,
+                       code_listing, text)
+from java_snippets import java_snippet
+from response_catalog import CATALOG_PATH, catalog_table, entry_examples, load_catalog
+from syntax_highlight import code_language
+from transcripts import (MAX_TURNS, TURNS_PER_PAGE, TranscriptFilter, read_transcripts,
+                         transcript_pages)
+
+HEADING_COLOR = DEFAULT_THEME.primary
+SUBHEADING_COLOR = DEFAULT_THEME.secondary
+MUTED_COLOR = DEFAULT_THEME.muted
+
+SCREENSHOTS = [
+    r"C:\Users\perfe\.gemini\antigravity\brain\cf9f5b8e-ded6-4744-93b9-01c32dbf4741\initial_page_1765960804340.png",
+    r"C:\Users\perfe\.gemini\antigravity\brain\cf9f5b8e-ded6-4744-93b9-01c32dbf4741\hello_response_1765960825723.png",
+    r"C:\Users\perfe\.gemini\antigravity\brain\cf9f5b8e-ded6-4744-93b9-01c32dbf4741\devops_response_1765960846652.png",
+    r"c:\Users\perfe\Desktop\devops\Screenshot 2025-12-15 124938.png",
+]
+
+# Java sources the code listings are extracted from; the inline copies
+# below are used when the tree is not checked out next to this script
+JAVA_SOURCE_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "src", "main", "java", "com", "example", "chatbot")
+SNIPPETS = {
+    "main_app": "ChatbotApplication.java",
+    "controller": "ChatController",
+    "service": ["ChatService#getChatResponse", "ChatService#getHardcodedResponse"],
+    "model": ["ChatRequest", "ChatResponse"],
+}
+
+# Column widths in inches of the two-column tables: name, description
+TWO_COLUMN_WIDTHS = (2.25, 4.25)
+
+# Written by load_test; section 11 shows it as a table
+PERFORMANCE_RESULTS = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                   "load_test_results.json")
+
+def test_queries(catalog_path=CATALOG_PATH):
+    """Every documented test query in the response catalog; load_test sends them"""
+    return [query for entry in load_catalog(catalog_path) for query in entry_examples(entry)]
+
+def code_snippet(config, key, fallback):
+    """Code listing for key: a "code" override, else the Java sources, else fallback"""
+    if key in config["code"]:
+        return config["code"][key]
+    reference = config["snippets"].get(key)
+    if not reference:
+        return fallback
+    return java_snippet(config["java_source_root"], reference, fallback,
+                        cache_dir=config.get("cache_dir"))
+
+def build_front_matter(config):
+    """Title page and table of contents"""
+    blocks = []
+    # ===== TITLE PAGE =====
+    blocks.append(Heading(config["title"], 0, HEADING_COLOR, 28, "center"))
+    
+    blocks.append(Paragraph(
+        (Run(config["subtitle"], size=16, color=MUTED_COLOR),),
+        "center"))
+    
+    blocks.append(blank())
+    blocks.append(blank())
+    
+    # Project metadata
+    metadata_text = """
+Project Type: Full-Stack Web Application
+Technology Stack: Spring Boot, Java 17, Maven
+API Integration: Google Gemini Pro
+Frontend: HTML5, CSS3, JavaScript
+Deployment: Run with Maven or packaged JAR
+    """
+    metadata_text = config.get("metadata", metadata_text)
+    blocks.append(Paragraph((Run(metadata_text, size=11),), "center"))
+    
+    blocks.append(PageBreak())
+    
+    # ===== TABLE OF CONTENTS =====
+    blocks.append(Heading('Table of Contents', 1, HEADING_COLOR))
+    toc_items = [
+        "1. Project Overview",
+        "2. Technology Stack",
+        "3. Project Architecture",
+        "4. Key Features",
+        "5. Project Structure",
+        "6. Source Code Explanation",
+        "   6.1 Main Application Class",
+        "   6.2 Controller Layer",
+        "   6.3 Service Layer",
+        "   6.4 Model Classes",
+        "   6.5 Frontend (HTML/CSS/JavaScript)",
+        
+        "8. Application Screenshots",
+        "9. Setup and Installation",
+        "10. Testing the Application",
+        "11. Performance Testing",
+        "12. Conclusion"
+    ]
+    blocks.append(BulletList(tuple(toc_items)))
+    
+    blocks.append(PageBreak())
+    return Section("front_matter", tuple(blocks))
+
+def build_overview(config):
+    blocks = []
+    # ===== 1. PROJECT OVERVIEW =====
+    blocks.append(Heading('1. Project Overview', 1, HEADING_COLOR))
+    
+    blocks.append(text(
+        "This project is a modern, full-stack web-based chatbot application built using Spring Boot framework. "
+        "It demonstrates the integration of a backend REST API with Google's Gemini Pro AI model to create an "
+        "intelligent conversational assistant."
+    ))
+    
+    blocks.append(text(
+        "The application showcases several important software development concepts:"
+    ))
+    
+    features_list = [
+        "RESTful API design and implementation",
+        "Integration with third-party APIs (Google Gemini)",
+        "Layered architecture (Controller → Service → Model)",
+        "Responsive web interface with modern UI/UX",
+        "Runnable as a packaged JAR or via Maven",
+        "Maven-based project management",
+        "Hardcoded fallback responses for offline testing"
+    ]
+    
+    blocks.append(BulletList(tuple(features_list)))
+    return Section("overview", tuple(blocks))
+
+def technology_table(items):
+    """Table of "Name - purpose" technology list items"""
+    rows = tuple(tuple(part.strip() for part in item.partition(" - ")[::2]) for item in items)
+    return Table(("Technology", "Purpose"), rows, TWO_COLUMN_WIDTHS)
+
+def build_technology_stack(config):
+    blocks = []
+    # ===== 2. TECHNOLOGY STACK =====
+    blocks.append(Heading('2. Technology Stack', 1, HEADING_COLOR))
+    
+    blocks.append(Heading('Backend Technologies', 2, SUBHEADING_COLOR))
+    backend_tech = [
+        "Java 17 - Programming language",
+        "Spring Boot 3.2.0 - Application framework",
+        "Spring Web - RESTful web services",
+        "Spring WebFlux - Reactive HTTP client for API calls",
+        "Thymeleaf - Server-side template engine",
+        "Maven - Build automation and dependency management"
+    ]
+    backend_tech = config.get("backend_tech", backend_tech)
+    blocks.append(technology_table(backend_tech))
+    
+    blocks.append(Heading('Frontend Technologies', 2, SUBHEADING_COLOR))
+    frontend_tech = [
+        "HTML5 - Structure and markup",
+        "CSS3 - Styling with modern design patterns",
+        "JavaScript (ES6+) - Client-side interactivity",
+        "Font Awesome - Icon library",
+        "Google Fonts (Outfit) - Typography"
+    ]
+    frontend_tech = config.get("frontend_tech", frontend_tech)
+    blocks.append(technology_table(frontend_tech))
+    
+    blocks.append(Heading('DevOps & Deployment', 2, SUBHEADING_COLOR))
+    devops_tech = [
+        "Maven - Build and lifecycle management",
+        "CI/CD (recommended) - Automated builds and tests",
+        "Health checks - Application monitoring",
+        "Artifact packaging - JAR distribution"
+    ]
+    devops_tech = config.get("devops_tech", devops_tech)
+    blocks.append(technology_table(devops_tech))
+    
+    blocks.append(PageBreak())
+    return Section("technology_stack", tuple(blocks))
+
+def build_architecture(config):
+    blocks = []
+    # ===== 3. PROJECT ARCHITECTURE =====
+    blocks.append(Heading('3. Project Architecture', 1, HEADING_COLOR))
+    
+    blocks.append(text(
+        "The application follows a layered architecture pattern, separating concerns into distinct layers:"
+    ))
+    
+    blocks.append(Heading('Architecture Layers', 2, SUBHEADING_COLOR))
+    
+    architecture_desc = """
+1. Presentation Layer (Frontend)
+   - HTML/CSS/JavaScript interface
+   - Handles user interactions
+   - Sends AJAX requests to backend API
+   - Displays chat messages dynamically
+
+2. Controller Layer
+   - ChatController.java
+   - Handles HTTP requests (GET, POST)
+   - Routes requests to appropriate services
+   - Returns JSON responses
+
+3. Service Layer
+   - ChatService.java
+   - Contains business logic
+   - Manages API integration with Gemini
+   - Provides hardcoded responses for testing
+   - Handles error scenarios
+
+4. Model Layer
+   - ChatRequest.java - Request data structure
+   - ChatResponse.java - Response data structure
+   - POJOs (Plain Old Java Objects)
+
+5. External Integration
+   - Google Gemini Pro API
+   - WebClient for reactive HTTP calls
+   - JSON request/response handling
+    """
+    blocks.append(text(architecture_desc))
+    
+    blocks.append(PageBreak())
+    return Section("architecture", tuple(blocks))
+
+def build_key_features(config):
+    blocks = []
+    # ===== 4. KEY FEATURES =====
+    blocks.append(Heading('4. Key Features', 1, HEADING_COLOR))
+    
+    features = {
+        "🤖 AI-Powered Responses": "Integration with Google Gemini Pro for intelligent conversations",
+        "💬 Real-time Chat Interface": "Modern, responsive chat UI with message bubbles and avatars",
+        "🎨 Theme Toggle": "Dark/Light mode support with persistent preferences",
+        "📝 Hardcoded Responses": "Fallback responses for common queries (DevOps, Maven, Spring Boot)",
+        "🔄 Loading Indicators": "Visual feedback during API calls with typing animation",
+        "🗑️ Clear Chat": "Ability to clear conversation history",
+        "⌨️ Keyboard Shortcuts": "Ctrl+K (focus input), Ctrl+L (clear chat), Ctrl+Shift+T (toggle theme)",
+        "📦 Packaging": "Runnable as a packaged JAR and suitable for CI/CD pipelines",
+        "❤️ Health Checks": "Container health monitoring for production deployments",
+        "📱 Responsive Design": "Works seamlessly on desktop and mobile devices"
+    }
+    
+    blocks.append(Table(("Feature", "Description"), tuple(features.items()), TWO_COLUMN_WIDTHS))
+    
+    blocks.append(PageBreak())
+    return Section("key_features", tuple(blocks))
+
+def build_project_structure(config):
+    blocks = []
+    # ===== 5. PROJECT STRUCTURE =====
+    blocks.append(Heading('5. Project Structure', 1, HEADING_COLOR))
+    
+    project_structure = """
+chatbot/
+├── src/
+│   ├── main/
+│   │   ├── java/com/example/chatbot/
+│   │   │   ├── ChatbotApplication.java      # Main Spring Boot application
+│   │   │   ├── controller/
+│   │   │   │   └── ChatController.java      # REST API endpoints
+│   │   │   ├── service/
+│   │   │   │   └── ChatService.java         # Business logic & API integration
+│   │   │   └── model/
+│   │   │       ├── ChatRequest.java         # Request model
+│   │   │       └── ChatResponse.java        # Response model
+│   │   └── resources/
+│   │       ├── application.properties       # Configuration
+│   │       ├── templates/
+│   │       │   └── index.html              # Main HTML page
+│   │       └── static/
+│   │           └── style.css               # Stylesheet
+│   └── test/                               # Unit tests
+└── pom.xml                                 # Maven dependencies
+    """
+    blocks.append(CodeBlock(project_structure, "Project Directory Structure"))
+    
+    blocks.append(PageBreak())
+    return Section("project_structure", tuple(blocks))
+
+def build_source_code(config):
+    blocks = []
+    # ===== 6. SOURCE CODE EXPLANATION =====
+    blocks.append(Heading('6. Source Code Explanation', 1, HEADING_COLOR))
+    
+    # 6.1 Main Application
+    blocks.append(Heading('6.1 Main Application Class', 2, SUBHEADING_COLOR))
+    blocks.append(text(
+        "The ChatbotApplication.java is the entry point of the Spring Boot application. "
+        "It uses the @SpringBootApplication annotation which combines @Configuration, "
+        "@EnableAutoConfiguration, and @ComponentScan."
+    ))
+    
+    main_app_code = """package com.example.chatbot;
+
+import org.springframework.boot.SpringApplication;
+import org.springframework.boot.autoconfigure.SpringBootApplication;
+
+@SpringBootApplication
+public class ChatbotApplication {
+    public static void main(String[] args) {
+        SpringApplication.run(ChatbotApplication.class, args);
+    }
+}"""
+    main_app_code = code_snippet(config, "main_app", main_app_code)
+    blocks.append(CodeBlock(main_app_code, "ChatbotApplication.java", "java"))
+    
+    # 6.2 Controller Layer
+    blocks.append(Heading('6.2 Controller Layer', 2, SUBHEADING_COLOR))
+    blocks.append(text(
+        "The ChatController handles HTTP requests. It has two main endpoints:"
+    ))
+    blocks.append(BulletList((
+        "• GET / - Serves the main HTML page",
+        "• POST /api/chat - Handles chat messages and returns JSON responses",
+    )))
+    
+    controller_code = """@Controller
+public class ChatController {
+    private final ChatService chatService;
+
+    @Autowired
+    public ChatController(ChatService chatService) {
+        this.chatService = chatService;
+    }
+
+    @GetMapping("/")
+    public String index() {
+        return "index";  // Returns index.html template
+    }
+
+    @PostMapping("/api/chat")
+    @ResponseBody
+    public ResponseEntity<ChatResponse> chat(@RequestBody ChatRequest request) {
+        if (request == null || request.getMessage() == null || 
+            request.getMessage().trim().isEmpty()) {
+            return ResponseEntity.badRequest()
+                .body(new ChatResponse("Please provide a valid message."));
+        }
+
+        ChatResponse response = chatService.getChatResponse(request.getMessage());
+        return ResponseEntity.ok(response);
+    }
+}"""
+    controller_code = code_snippet(config, "controller", controller_code)
+    blocks.append(CodeBlock(controller_code, "ChatController.java (Key Methods)", "java"))
+    
+    blocks.append(PageBreak())
+    
+    # 6.3 Service Layer
+    blocks.append(Heading('6.3 Service Layer', 2, SUBHEADING_COLOR))
+    blocks.append(text(
+        "The ChatService contains the core business logic. It first checks for hardcoded responses "
+        "for common queries (like 'hello', 'what is devops?'), and if no match is found, it calls "
+        "the Gemini API using Spring WebFlux's WebClient."
+    ))
+    
+    service_code = """@Service
+public class ChatService {
+    @Value("${gemini.api.key}")
+    private String apiKey;
+
+    @Value("${gemini.api.url}")
+    private String apiUrl;
+
+    private final WebClient webClient;
+
+    public ChatResponse getChatResponse(String message) {
+        try {
+            // Check for hardcoded responses first
+            String response = getHardcodedResponse(message);
+            if (response != null) {
+                return new ChatResponse(response);
+            }
+
+            // Prepare Gemini API request
+            Map<String, Object> requestBody = new HashMap<>();
+            // ... build request structure ...
+
+            // Make API call
+            String fullUrl = apiUrl + "?key=" + apiKey;
+            Map<String, Object> apiResponse = webClient.post()
+                .uri(fullUrl)
+                .bodyValue(requestBody)
+                .retrieve()
+                .bodyToMono(Map.class)
+                .block();
+
+            String responseText = extractResponseText(apiResponse);
+            return new ChatResponse(responseText);
+
+        } catch (Exception e) {
+            return new ChatResponse("Error: " + e.getMessage());
+        }
+    }
+
+    private String getHardcodedResponse(String message) {
+        String lowerMessage = message.toLowerCase().trim();
+        
+        if (lowerMessage.equals("hello") || lowerMessage.equals("hi")) {
+            return "Hello! 👋 Welcome to the Web-Based Chatbot.";
+        }
+        
+        if (lowerMessage.contains("what is devops")) {
+            return "DevOps is a set of practices that combines software " +
+                   "development (Dev) and IT operations (Ops)...";
+        }
+        
+        // ... more hardcoded responses ...
+        return null;  // No match found
+    }
+}"""
+    service_code = code_snippet(config, "service", service_code)
+    blocks.append(CodeBlock(service_code, "ChatService.java (Simplified)", "java"))
+    
+    blocks.append(PageBreak())
+    
+    # 6.4 Model Classes
+    blocks.append(Heading('6.4 Model Classes', 2, SUBHEADING_COLOR))
+    blocks.append(text("Simple POJOs (Plain Old Java Objects) for request and response data:"))
+    
+    model_code = """// ChatRequest.java
+public class ChatRequest {
+    private String message;
+
+    public String getMessage() { return message; }
+    public void setMessage(String message) { this.message = message; }
+}
+
+// ChatResponse.java
+public class ChatResponse {
+    private String response;
+
+    public ChatResponse(String response) {
+        this.response = response;
+    }
+
+    public String getResponse() { return response; }
+    public void setResponse(String response) { this.response = response; }
+}"""
+    model_code = code_snippet(config, "model", model_code)
+    blocks.append(CodeBlock(model_code, "Model Classes", "java"))
+    
+    # 6.5 Frontend
+    blocks.append(Heading('6.5 Frontend (HTML/CSS/JavaScript)', 2, SUBHEADING_COLOR))
+    blocks.append(text(
+        "The frontend consists of a modern, responsive chat interface with:"
+    ))
+    frontend_features = [
+        "Sidebar navigation with logo and user profile",
+        "Chat message area with scrollable message history",
+        "Input field with send button",
+        "Theme toggle (dark/light mode)",
+        "Clear chat functionality",
+        "Loading animations and typing indicators",
+        "Keyboard shortcuts for better UX"
+    ]
+    blocks.append(BulletList(tuple(frontend_features)))
+    
+    frontend_code = """// JavaScript - Sending a chat message
+chatForm.addEventListener('submit', async (e) => {
+    e.preventDefault();
+    
+    const message = messageInput.value.trim();
+    if (!message) return;
+
+    // Add user message to UI
+    addMessage(message, 'user');
+    messageInput.value = '';
+    
+    // Show loading indicator
+    const loadingId = addLoadingBubble();
+
+    try {
+        // Send POST request to backend
+        const response = await fetch('/api/chat', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ message: message })
+        });
+
+        const data = await response.json();
+        
+        // Remove loading and show bot response
+        document.getElementById(loadingId)?.remove();
+        addMessage(data.response, 'bot');
+    } catch (error) {
+        document.getElementById(loadingId)?.remove();
+        addMessage('Sorry, something went wrong.', 'bot', true);
+    }
+});"""
+    frontend_code = code_snippet(config, "frontend", frontend_code)
+    blocks.append(CodeBlock(frontend_code, "JavaScript - Chat Functionality", "javascript"))
+    
+    blocks.append(PageBreak())
+    
+    # Docker/containerization content removed — project runs via Maven/JAR
+    blocks.append(PageBreak())
+    return Section("source_code", tuple(blocks))
+
+def build_screenshots(config):
+    blocks = []
+    # ===== 8. APPLICATION SCREENSHOTS =====
+    blocks.append(Heading('8. Application Screenshots', 1, HEADING_COLOR))
+    
+    blocks.append(text(
+        "Below are screenshots demonstrating the application in action:"
+    ))
+    
+    # Screenshot 1: Initial Page
+    blocks.append(Heading('8.1 Initial Landing Page', 2, SUBHEADING_COLOR))
+    blocks.append(text(
+        "The chatbot interface when first loaded, showing the welcome message and modern UI design:"
+    ))
+    
+    blocks.append(Image(config["screenshots"][0]))
+    
+    blocks.append(PageBreak())
+    
+    # Screenshot 2: Hello Response
+    blocks.append(Heading('8.2 Greeting Interaction', 2, SUBHEADING_COLOR))
+    blocks.append(text(
+        "User sends 'hello' and receives a friendly hardcoded response from the chatbot:"
+    ))
+    
+    blocks.append(Image(config["screenshots"][1]))
+    
+    blocks.append(PageBreak())
+    
+    # Screenshot 3: DevOps Question
+    blocks.append(Heading('8.3 Technical Question Response', 2, SUBHEADING_COLOR))
+    blocks.append(text(
+        "User asks 'what is devops?' and receives a detailed, informative response:"
+    ))
+    
+    blocks.append(Image(config["screenshots"][2]))
+    
+    # Screenshot 4: Existing screenshot from project
+    blocks.append(PageBreak())
+    blocks.append(Heading('8.4 Additional Application View', 2, SUBHEADING_COLOR))
+    blocks.append(text(
+        "Another view of the application interface:"
+    ))
+    
+    blocks.append(Image(config["screenshots"][3]))
+    
+    blocks.append(PageBreak())
+    return Section("screenshots", tuple(blocks))
+
+def build_setup(config):
+    blocks = []
+    # ===== 9. SETUP AND INSTALLATION =====
+    blocks.append(Heading('9. Setup and Installation', 1, HEADING_COLOR))
+    
+    blocks.append(Heading('9.1 Prerequisites', 2, SUBHEADING_COLOR))
+    prerequisites = [
+        "Java 17 or higher",
+        "Maven 3.6+",
+        "Google Gemini API key (optional, for live API integration)"
+    ]
+    blocks.append(BulletList(tuple(prerequisites)))
+    
+    blocks.append(Heading('9.2 Running with Maven', 2, SUBHEADING_COLOR))
+    maven_steps = """
+1. Clone or download the project
+2. Navigate to project directory
+3. Configure API key in src/main/resources/application.properties:
+   gemini.api.key=your_api_key_here
+4. Run the application:
+   mvn spring-boot:run
+5. Open browser and navigate to:
+   http://localhost:8085
+    """
+    blocks.append(text(maven_steps))
+    
+    # Docker run instructions removed; use Maven or JAR run methods above
+    blocks.append(PageBreak())
+    return Section("setup", tuple(blocks))
+
+def build_testing(config):
+    blocks = []
+    # ===== 10. TESTING THE APPLICATION =====
+    blocks.append(Heading('10. Testing the Application', 1, HEADING_COLOR))
+    
+    blocks.append(text(
+        "The application includes hardcoded responses for testing without a valid API key. "
+        "Try these test queries:"
+    ))
+    
+    header, rows = catalog_table(load_catalog(config["response_catalog"]))
+    blocks.append(Table(header, rows, (2.0, 1.5, 3.0)))
+    
+    blocks.append(blank())
+    blocks.append(text(
+        "The responses are kept in one catalog, response_catalog.json. "
+        "\"python response_catalog.py compile\" builds it into a single Aho-Corasick "
+        "automaton over every pattern, saved as response_catalog.bin, so a message is "
+        "matched in one pass however long the list grows, and regenerates the test "
+        "queries run.bat prints; this table is generated from the same file."
+    ))
+    
+    blocks.append(blank())
+    blocks.append(text(
+        "For queries not in the hardcoded list, the application will attempt to call the "
+        "Gemini API (if a valid API key is configured) or return a helpful error message."
+    ))
+    blocks.append(text(
+        "To run these queries offline, point gemini.api.url at gemini_stub.py "
+        "(http://localhost:8087/v1beta/models/gemini-pro:generateContent). It answers "
+        "generateContent calls from recorded responses, keyed by a hash of the request, "
+        "with configurable latency and error rates; run it once with --upstream and a key "
+        "to record the answers of the real API."
+    ))
+    
+    blocks.append(PageBreak())
+    return Section("testing", tuple(blocks))
+
+def build_performance(config):
+    blocks = []
+    # ===== 11. PERFORMANCE TESTING =====
+    blocks.append(Heading('11. Performance Testing', 1, HEADING_COLOR))
+    
+    blocks.append(text(
+        "load_test.py sends the test queries above, mixed with queries that have no hardcoded "
+        "response, to POST /api/chat from many concurrent clients over pooled keep-alive "
+        "connections. Hardcoded hits are answered by ChatService directly, while pass-through "
+        "queries wait for the Gemini API, so the two are reported separately."
+    ))
+    
+    path = config["performance_results"]
+    if not os.path.exists(path):
+        blocks.append(text(
+            "No results have been recorded yet. Run python load_test.py --stub to measure "
+            "against the bundled stub server, or pass --url to test a running application."
+        ))
+        blocks.append(PageBreak())
+        return Section("performance", tuple(blocks))
+    
+    with open(path, encoding="utf-8") as f:
+        results = json.load(f)
+    run = results["run"]
+    blocks.append(text(
+        f"Target: {run['target']}\n"
+        f"Concurrency: {run['concurrency']} clients, ramped up over {run['ramp_s']:g} s\n"
+        f"Duration: {run['duration_s']:.1f} s"
+    ))
+    
+    rows = []
+    for category, stats in results["results"].items():
+        rows.append((category, f"{stats['requests']:,}", f"{stats['errors']:,}",
+                     f"{stats['throughput_rps']:.1f}", f"{stats['p50_ms']:.1f}",
+                     f"{stats['p95_ms']:.1f}", f"{stats['p99_ms']:.1f}"))
+    blocks.append(Table(("Queries", "Requests", "Errors", "Throughput (req/s)",
+                         "p50 (ms)", "p95 (ms)", "p99 (ms)"), tuple(rows)))
+    
+    blocks.append(PageBreak())
+    return Section("performance", tuple(blocks))
+
+def build_conclusion(config):
+    blocks = []
+    # ===== 12. CONCLUSION =====
+    blocks.append(Heading('12. Conclusion', 1, HEADING_COLOR))
+    
+    conclusion_text = """
+This Spring Boot Chatbot application demonstrates a complete full-stack development workflow,
+from backend API design to frontend user interface, with modern build and packaging practices.
+
+Key Learning Outcomes:
+• Understanding of Spring Boot framework and layered architecture
+• REST API design and implementation
+• Integration with third-party APIs (Google Gemini)
+• Modern web UI development with responsive design
+• Artifact packaging and CI/CD readiness
+• Maven project structure and dependency management
+
+The application serves as an excellent foundation for building more complex chatbot systems
+and can be extended with features like:
+• User authentication and session management
+• Chat history persistence with database integration
+• File upload and processing capabilities
+• Multi-language support
+• Advanced AI features and custom training
+• Real-time notifications with WebSockets
+
+This project showcases industry-standard practices and provides a solid understanding of
+modern web application development and deployment.
+    """
+    blocks.append(text(conclusion_text))
+    
+    # Add footer
+    blocks.append(blank())
+    blocks.append(blank())
+    blocks.append(text('─' * 80, "center"))
+    
+    blocks.append(Paragraph(
+        (Run(f'{config["title"]} Documentation', italic=True, size=10, color=MUTED_COLOR),),
+        "center"))
+    return Section("conclusion", tuple(blocks))
+
+def build_listings(config):
+    blocks = []
+    # ===== APPENDIX: SOURCE LISTINGS =====
+    if config["listings"]:
+        blocks.append(PageBreak())
+        blocks.append(Heading('Appendix: Source Listings', 1, HEADING_COLOR))
+    for listing in config["listings"]:
+        path = listing["path"]
+        label = listing.get("label") or os.path.basename(path)
+        blocks.append(Heading(label, 2, SUBHEADING_COLOR))
+        try:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                code = f.read().rstrip("\n")
+        except OSError as e:
+            blocks.append(text(f"[Listing could not be read: {e}]"))
+            continue
+        language = listing.get("language") or code_language(CodeBlock("", os.path.basename(path)))
+        lines = tuple(listing["lines"]) if listing.get("lines") else None
+        blocks.extend(code_listing(code, label, language, lines, listing.get("line_numbers", True)))
+    return Section("listings", tuple(blocks))
+
+def build_transcripts(config):
+    """The transcripts appendix, built from the logs only when it is rendered
+
+    It is cached under the filters and the size and mtime of the logs and
+    the response catalog, so checking whether it is up to date does not
+    read the logs.
+    """
+    transcripts = config["transcripts"]
+    if not transcripts["logs"]:
+        return Section("transcripts", ())
+    inputs = [[path, file_stat(path)]
+              for path in [*transcripts["logs"], config["response_catalog"]]]
+    return LazySection("transcripts", "doc_content:transcript_blocks",
+                       (transcripts, config["response_catalog"], inputs))
+
+def transcript_blocks(transcripts, catalog_path, inputs=()):
+    """Blocks of the transcripts appendix; inputs only identify the content"""
+    blocks = []
+    # ===== APPENDIX: CHAT TRANSCRIPTS =====
+    blocks.append(PageBreak())
+    blocks.append(Heading('Appendix: Chat Transcripts', 1, HEADING_COLOR))
+    
+    transcript_filter = TranscriptFilter(
+        *(date.fromisoformat(transcripts[key]) if transcripts.get(key) else None
+          for key in ("since", "until")),
+        transcripts.get("conversations"), transcripts.get("keyword"))
+    max_turns = transcripts.get("max_turns", MAX_TURNS)
+    conversations, stats, skipped = read_transcripts(
+        transcripts["logs"], transcript_filter, max_turns, catalog_path)
+    
+    filters = [f"{name} {transcripts[key]}" for name, key in
+               (("from", "since"), ("until", "until"), ("mentioning", "keyword"))
+               if transcripts.get(key)]
+    if transcripts.get("conversations"):
+        filters.append(f"conversations {', '.join(transcripts['conversations'])}")
+    blocks.append(text(
+        f"Conversations recorded in {', '.join(os.path.basename(p) for p in transcripts['logs'])}"
+        + (f", {'; '.join(filters)}" if filters else "") + ". A bot answer counts as hardcoded "
+        "when it comes from the response catalog and as a model answer otherwise."
+    ))
+    header, rows = stats.table(skipped)
+    blocks.append(Table(header, rows, TWO_COLUMN_WIDTHS))
+    
+    shown = sum(len(turns) for turns in conversations.values())
+    total = stats.user_turns + stats.bot_turns
+    if shown < total:
+        blocks.append(text(
+            f"The first {shown:,} of {total:,} turns are shown; the statistics cover all of "
+            "them. Filter by date, conversation or keyword to see others."
+        ))
+    
+    blocks.append(PageBreak())
+    for piece in transcript_pages(conversations, transcripts.get("turns_per_page", TURNS_PER_PAGE)):
+        if piece is None:
+            blocks.append(PageBreak())
+            continue
+        conversation, part, turns = piece
+        title = f"Conversation {conversation}" if conversation else "Conversation without an ID"
+        blocks.append(Heading(title if part == 1 else f"{title} (continued)", 2, SUBHEADING_COLOR))
+        blocks.append(ChatTranscript(turns))
+    return blocks
+
+# Section builders in document order
+SECTION_BUILDERS = [
+    build_front_matter,
+    build_overview,
+    build_technology_stack,
+    build_architecture,
+    build_key_features,
+    build_project_structure,
+    build_source_code,
+    build_screenshots,
+    build_setup,
+    build_testing,
+    build_performance,
+    build_conclusion,
+    build_listings,
+    build_transcripts,
+]
+
+def transcript_config(transcripts):
+    """The "transcripts" config as an object with a list of log paths"""
+    transcripts = transcripts or {}
+    if not isinstance(transcripts, dict):
+        transcripts = {"logs": transcripts}
+    logs = transcripts.get("logs") or []
+    return {**transcripts, "logs": [logs] if isinstance(logs, str) else list(logs)}
+
+def project_config(config=None):
+    """Fill in a project config with the defaults for anything it leaves out"""
+    config = dict(config or {})
+    config.setdefault("title", 'Spring Boot Chatbot Application')
+    config.setdefault("subtitle", 'Web-Based AI Assistant with Gemini API Integration')
+    config["code"] = dict(config.get("code") or {})
+    config.setdefault("java_source_root", JAVA_SOURCE_ROOT)
+    config["snippets"] = {**SNIPPETS, **(config.get("snippets") or {})}
+    config.setdefault("performance_results", PERFORMANCE_RESULTS)
+    config.setdefault("response_catalog", CATALOG_PATH)
+    config["listings"] = [listing if isinstance(listing, dict) else {"path": listing}
+                          for listing in config.get("listings") or []]
+    config["transcripts"] = transcript_config(config.get("transcripts"))
+    screenshots = list(config.get("screenshots") or [])
+    config["screenshots"] = screenshots + SCREENSHOTS[len(screenshots):]
+    return config
+
+def resolve_paths(config, base_dir):
+    """Resolve the relative paths of a project config against base_dir, in place"""
+    if "screenshots" in config:
+        config["screenshots"] = [os.path.join(base_dir, p) for p in config["screenshots"]]
+    for key in ("java_source_root", "performance_results", "response_catalog"):
+        if key in config:
+            config[key] = os.path.join(base_dir, config[key])
+    if "listings" in config:
+        config["listings"] = [
+            {**listing, "path": os.path.join(base_dir, listing["path"])}
+            if isinstance(listing, dict) else os.path.join(base_dir, listing)
+            for listing in config["listings"]]
+    if "transcripts" in config:
+        transcripts = transcript_config(config["transcripts"])
+        transcripts["logs"] = [os.path.join(base_dir, log) for log in transcripts["logs"]]
+        config["transcripts"] = transcripts
+    return config
+
+def config_paths(config):
+    """The files and directories a project config names as inputs"""
+    paths = [config[key] for key in ("java_source_root", "performance_results",
+                                     "response_catalog") if key in config]
+    paths.extend(config.get("screenshots") or [])
+    paths.extend(listing["path"] if isinstance(listing, dict) else listing
+                 for listing in config.get("listings") or [])
+    paths.extend(transcript_config(config.get("transcripts"))["logs"])
+    return paths
+
+def load_config(path):
+    """Read a project config JSON and resolve its paths
+
+    "output" defaults to the config name with a .docx extension; relative
+    paths are resolved against the config file's directory.
+    """
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    base_dir = os.path.dirname(os.path.abspath(path))
+    default_output = os.path.splitext(os.path.basename(path))[0] + ".docx"
+    config["output"] = os.path.join(base_dir, config.get("output", default_output))
+    return resolve_paths(config, base_dir)
+
+def build_sections(config=None, cache_dir=None):
+    """Parse the documentation content into a list of sections
+
+    config overrides the project-specific content: "title", "subtitle",
+    "metadata", the "backend_tech", "frontend_tech" and "devops_tech"
+    lists of "Name - purpose" items shown as tables, "code" snippets
+    keyed by main_app, controller, service, model and frontend, and
+    "screenshots" paths. Listings not overridden are extracted from
+    "java_source_root" using the "snippets" references (see
+    java_snippets), falling back to the built-in copies; their index is
+    kept in cache_dir.
+    "performance_results" is the load_test results JSON shown in section 11
+    and "response_catalog" the catalog of hardcoded responses section 10
+    tabulates (see response_catalog).
+    "listings" adds an appendix with whole source files or line ranges of
+    them: paths, or objects with a "path" and optional "label",
+    "language", "lines" ([first, last]) and "line_numbers" (default true).
+    "transcripts" adds an appendix of chat transcripts from JSONL
+    conversation logs (see transcripts): log paths, or an object with
+    "logs" and optional "since" and "until" (YYYY-MM-DD), "conversations"
+    (IDs), "keyword", "max_turns" and "turns_per_page".
+    Sections without blocks, such as the appendices without listings or
+    logs, are left out.
+    """
+    config = project_config(config)
+    config["cache_dir"] = cache_dir
+    sections = [builder(config) for builder in SECTION_BUILDERS]
+    # Lazy sections are kept unbuilt; only rendering them reads their inputs
+    return [section for section in sections
+            if isinstance(section, LazySection) or section.blocks]
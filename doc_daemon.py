@@ -0,0 +1,291 @@
+"""Generation daemon: documents rendered by warm, long-lived workers
+
+Every `doc_build.py generate` pays for a fresh interpreter, importing
+python-docx and lxml and loading the base template before any section is
+rendered. The daemon pays for that once per worker process: workers are
+started and warmed up front and then serve one document after another,
+keeping their imports, the base template, the hashed screenshots and
+anything else the renderers cache in memory.
+
+The API is HTTP on a local port or a Unix socket:
+
+    POST /generate   {"config": {...} or "path/to/config.json",
+                      "output": "path.docx", "force": false, "reproducible": false}
+    GET  /status     workers, queue depth and request counts
+
+With "output" the document is written there and the response is JSON
+with the path and render time; without it the finished .docx is sent
+back as the response body. The daemon only reads and writes inside its
+root directory (--root, default: the directory it was started in): a
+config path, the files and directories a config names and "output" are
+resolved against it, symbolic links included, and a request naming
+anything outside it is refused with 403. Otherwise a client could have
+the daemon overwrite any file, or read one back in a listing of the
+streamed document.
+Requests beyond the busy workers wait in a queue of at most queue_size;
+when it is full the daemon answers 503 with Retry-After instead of
+accepting work it cannot start soon.
+
+Workers are replaced after MAX_DOCUMENTS_PER_WORKER documents on
+Python 3.11 and later; older versions keep them for the daemon's life.
+
+    python doc_daemon.py --port 8086 --workers 4 --root docs
+    python doc_daemon.py --socket /tmp/doc_daemon.sock
+    python doc_daemon.py --request config.json --output manual.docx
+"""
+import argparse
+import asyncio
+import hashlib
+import http.client
+import json
+import os
+import socket
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import http_server
+from doc_build import CACHE_DIR
+from doc_content import config_paths, load_config, resolve_paths
+
+DEFAULT_PORT = 8086
+QUEUE_SIZE = 16
+# Seconds a client rejected with 503 is asked to wait
+RETRY_AFTER = 1
+# Workers are replaced after this many documents, bounding what they accumulate
+MAX_DOCUMENTS_PER_WORKER = 500
+MAX_REQUEST_BYTES = 1 << 20
+DOCX_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+def warm_worker(cache_dir):
+    """Worker initializer: do every fixed cost of a build before the first request"""
+    import generate_documentation
+    generate_documentation.base_document(cache_dir)
+
+
+def generate(config, output_path, cache_dir, force=False, reproducible=None):
+    """Render one document in a worker; returns the seconds it took"""
+    from doc_build import create_project_documentation
+
+    start = time.perf_counter()
+    create_project_documentation(output_path, cache_dir, ("docx",), config, parallel=False,
+                                 force=force, reproducible=reproducible)
+    return time.perf_counter() - start
+
+
+class Daemon:
+    """Admits generate requests into a bounded queue in front of the worker pool"""
+
+    def __init__(self, workers=None, queue_size=QUEUE_SIZE, cache_dir=CACHE_DIR,
+                 root=None):
+        self.workers = workers or os.cpu_count()
+        self.queue_size = queue_size
+        self.cache_dir = cache_dir
+        self.output_dir = os.path.join(cache_dir, "daemon")
+        # Every path a request names must resolve to one inside this directory
+        self.root = os.path.realpath(root or os.getcwd())
+        self.pending = 0  # requests admitted and not finished, running or queued
+        self.counts = {"completed": 0, "failed": 0, "rejected": 0}
+        self.pool = None
+
+    def start(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        # max_tasks_per_child is new in Python 3.11
+        recycle = ({"max_tasks_per_child": MAX_DOCUMENTS_PER_WORKER}
+                   if sys.version_info >= (3, 11) else {})
+        self.pool = ProcessPoolExecutor(self.workers, initializer=warm_worker,
+                                        initargs=(self.cache_dir,), **recycle)
+        # Start every worker now, so no request waits for imports
+        for future in [self.pool.submit(time.sleep, 0) for _ in range(self.workers)]:
+            future.result()
+
+    def stop(self):
+        self.pool.shutdown(cancel_futures=True)
+
+    def status(self):
+        return {"workers": self.workers, "queue_size": self.queue_size,
+                "running": min(self.pending, self.workers),
+                "queued": max(self.pending - self.workers, 0), **self.counts}
+
+    def streamed_output(self, config):
+        """Output path of a document sent back to the client: one per config, so
+        repeated requests for an unchanged config are up to date"""
+        name = hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()
+        return os.path.join(self.output_dir, f"{name}.docx")
+
+    def confined(self, path):
+        """path resolved against root; raises PermissionError if it is outside root"""
+        resolved = os.path.realpath(os.path.join(self.root, path))
+        if os.path.commonpath([resolved, self.root]) != self.root:
+            raise PermissionError(f"{path} is outside {self.root}")
+        return resolved
+
+    def project_config(self, config):
+        """A request's config with its paths resolved, each confined to root
+
+        A config given by path is read here, so workers get the checked
+        config itself; relative paths in a config object are resolved
+        against root.
+        """
+        if isinstance(config, str):
+            config = load_config(self.confined(config))
+        else:
+            config = resolve_paths(dict(config), self.root)
+        for path in config_paths(config):
+            self.confined(path)
+        return config
+
+    async def generate(self, request):
+        """(status, JSON payload or path of the .docx to send back)"""
+        config = request.get("config")
+        if not isinstance(config, (str, dict)):
+            return 400, {"error": "config must be a config object or the path of one"}
+        output = request.get("output")
+        if output is not None and not isinstance(output, str):
+            return 400, {"error": "output must be a path"}
+        try:
+            config = self.project_config(config)
+            output_path = self.confined(output) if output else self.streamed_output(config)
+        except PermissionError as e:
+            return 403, {"error": str(e)}
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            return 400, {"error": f"invalid config: {type(e).__name__}: {e}"}
+        if self.pending >= self.workers + self.queue_size:
+            self.counts["rejected"] += 1
+            return 503, {"error": "queue is full", "retry_after": RETRY_AFTER}
+        self.pending += 1
+        try:
+            seconds = await asyncio.get_running_loop().run_in_executor(
+                self.pool, generate, config, output_path, self.cache_dir,
+                bool(request.get("force")), request.get("reproducible"))
+        except Exception as e:
+            self.counts["failed"] += 1
+            return 500, {"error": f"{type(e).__name__}: {e}"}
+        finally:
+            self.pending -= 1
+        self.counts["completed"] += 1
+        if output:
+            return 200, {"output": output_path, "seconds": round(seconds, 3)}
+        return 200, output_path
+
+    async def handle(self, method, path, body):
+        path = path.split("?", 1)[0]
+        if path == "/status":
+            return (200, self.status()) if method == "GET" else (405, {"error": "use GET"})
+        if path != "/generate":
+            return 404, {"error": "Not Found"}
+        if method != "POST":
+            return 405, {"error": "use POST"}
+        try:
+            request = json.loads(body)
+        except ValueError:
+            return 400, {"error": "request body must be JSON"}
+        if not isinstance(request, dict):
+            return 400, {"error": "request body must be a JSON object"}
+        return await self.generate(request)
+
+
+def serve(daemon, host="127.0.0.1", port=DEFAULT_PORT, unix_socket=None):
+    """Coroutine returning a started asyncio server; port 0 picks a free port"""
+    async def handle(request):
+        method, path, headers, body = request
+        status, payload = await daemon.handle(method, path, body)
+        if isinstance(payload, str):
+            return status, {"Content-Type": DOCX_TYPE}, http_server.FileBody(payload)
+        retry = {"Retry-After": RETRY_AFTER} if status == 503 else None
+        return http_server.json_response(status, payload, headers=retry)
+
+    return http_server.serve(handle, host, port, unix_socket, MAX_REQUEST_BYTES)
+
+
+class _UnixConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout):
+        super().__init__("localhost", timeout=timeout)
+        self.unix_socket = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_socket)
+
+
+def request_document(config, output=None, host="127.0.0.1", port=DEFAULT_PORT,
+                     unix_socket=None, force=False, timeout=600):
+    """Have a running daemon generate a document
+
+    config is a config object or the path of a config JSON, resolved by
+    the daemon. The document is written to output by the daemon when
+    given; otherwise its bytes are returned. Both the config and output,
+    and every file the config names, must be inside the daemon's root.
+    """
+    connection = (_UnixConnection(unix_socket, timeout) if unix_socket
+                  else http.client.HTTPConnection(host, port, timeout=timeout))
+    if isinstance(config, str):
+        config = os.path.abspath(config)
+    body = {"config": config, "force": force}
+    if output:
+        body["output"] = os.path.abspath(output)
+    try:
+        connection.request("POST", "/generate", json.dumps(body),
+                           {"Content-Type": "application/json"})
+        response = connection.getresponse()
+        data = response.read()
+    finally:
+        connection.close()
+    if response.status != 200:
+        raise RuntimeError(f"daemon answered {response.status}: {data.decode('utf-8', 'replace')}")
+    return json.loads(data)["output"] if output else data
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve documentation builds from warm workers")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--socket", help="listen on this Unix socket instead of a TCP port")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE,
+                        help="requests waiting for a worker before 503 (default: %(default)s)")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--root", help="directory every config, input and output a request "
+                                       "names must be in (default: the current directory)")
+    parser.add_argument("--request", metavar="CONFIG",
+                        help="send this config to a running daemon instead of serving")
+    parser.add_argument("--output", help="with --request: where the document is written")
+    parser.add_argument("--force", action="store_true", help="with --request: render even if "
+                                                             "the output is up to date")
+    args = parser.parse_args(argv)
+
+    if args.request:
+        start = time.perf_counter()
+        result = request_document(args.request, args.output, args.host, args.port, args.socket,
+                                  args.force)
+        if not args.output:
+            sys.stdout.buffer.write(result)
+            return 0
+        print(f"Documentation created by the daemon: {result} "
+              f"({time.perf_counter() - start:.2f}s)")
+        return 0
+
+    daemon = Daemon(args.workers, args.queue_size, args.cache_dir, args.root)
+    daemon.start()
+
+    async def run():
+        server = await serve(daemon, args.host, args.port, args.socket)
+        where = args.socket or f"http://{args.host}:{server.sockets[0].getsockname()[1]}"
+        print(f"Documentation daemon with {daemon.workers} warm workers listening on {where}")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
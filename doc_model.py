@@ -0,0 +1,233 @@
+"""In-memory document model shared by the DOCX, HTML and Markdown renderers
+
+Content is described once as a list of sections made of the blocks below;
+each renderer walks the same model. Blocks are plain frozen dataclasses so
+the model can be hashed for the fragment cache and pickled to worker
+processes.
+"""
+import importlib
+import re
+from dataclasses import asdict, dataclass, field
+from functools import cached_property
+
+# code_listing() splits listings into blocks of at most this many lines
+LISTING_CHUNK_LINES = 500
+
+# Name shown above each role's turns of a ChatTranscript
+CHAT_SPEAKERS = {"user": "You", "bot": "Chatbot"}
+
+# Characters XML 1.0 does not allow: C0 controls other than tab and line
+# breaks, lone surrogates, U+FFFE and U+FFFF
+_NOT_XML = re.compile("[^\t\n\r\x20-\ud7ff\ue000-\ufffd\U00010000-\U0010ffff]")
+
+
+@dataclass(frozen=True)
+class Theme:
+    """Palette and code block formatting shared by every renderer"""
+    primary: tuple = (0, 102, 204)
+    secondary: tuple = (0, 153, 76)
+    muted: tuple = (100, 100, 100)
+    code_font: str = "Courier New"
+    code_size: float = 9
+    code_fill: str = "F0F0F0"
+    # Chat bubbles of transcripts: user turns and bot turns
+    user_fill: str = "DDEBF7"
+    bot_fill: str = "E2F0D9"
+    # Syntax highlighting: (token class, color, bold, italic)
+    syntax: tuple = (
+        ("keyword", (127, 0, 85), True, False),
+        ("type", (127, 0, 85), False, False),
+        ("string", (42, 0, 255), False, False),
+        ("number", (9, 134, 88), False, False),
+        ("comment", (63, 127, 95), False, True),
+        ("annotation", (100, 100, 100), False, False),
+        ("tag", (63, 127, 127), False, False),
+        ("attribute", (127, 0, 127), False, False),
+    )
+
+    def color_name(self, color):
+        """Palette name of a color, or its hex value if it is not in the palette"""
+        for name in ("primary", "secondary", "muted"):
+            if tuple(color) == getattr(self, name):
+                return name.capitalize()
+        return "%02X%02X%02X" % tuple(color)
+
+    def syntax_format(self, token):
+        """(color, bold, italic) of a syntax token class"""
+        for name, color, bold, italic in self.syntax:
+            if name == token:
+                return color, bold, italic
+        raise KeyError(f"no syntax format for token '{token}'")
+
+
+DEFAULT_THEME = Theme()
+
+
+@dataclass(frozen=True)
+class Run:
+    text: str
+    bold: bool = False
+    italic: bool = False
+    size: float = None  # points
+    color: tuple = None  # (r, g, b)
+
+
+@dataclass(frozen=True)
+class Heading:
+    text: str
+    level: int = 1
+    color: tuple = None
+    size: float = None
+    align: str = None  # None or "center"
+
+
+@dataclass(frozen=True)
+class Paragraph:
+    runs: tuple = ()
+    align: str = None
+
+    @property
+    def text(self):
+        return "".join(run.text for run in self.runs)
+
+    @property
+    def plain(self):
+        """True if the paragraph is a single unformatted run"""
+        return len(self.runs) == 1 and self.runs[0] == Run(self.runs[0].text)
+
+
+@dataclass(frozen=True)
+class BulletList:
+    items: tuple
+
+
+@dataclass(frozen=True)
+class DefinitionList:
+    items: tuple  # ((term, description), ...)
+
+
+@dataclass(frozen=True)
+class CodeBlock:
+    code: str
+    label: str = ""
+    language: str = ""  # see syntax_highlight.LANGUAGES; guessed from the label if empty
+    line_numbers: bool = False
+    first_line: int = 1  # number of the first line, for excerpts
+
+
+@dataclass(frozen=True)
+class Table:
+    header: tuple  # column titles
+    rows: tuple  # ((cell, ...), ...), all text
+    widths: tuple = ()  # column widths in inches, default: even
+
+
+@dataclass(frozen=True)
+class ChatTranscript:
+    turns: tuple  # ((role, text, note), ...), role "user" or "bot"; note such as the time
+
+
+@dataclass(frozen=True)
+class Image:
+    path: str
+    width_inches: float = 6
+
+
+@dataclass(frozen=True)
+class PageBreak:
+    pass
+
+
+@dataclass(frozen=True)
+class Section:
+    name: str
+    blocks: tuple = field(default_factory=tuple)
+
+    @property
+    def images(self):
+        return [block.path for block in self.blocks if isinstance(block, Image)]
+
+
+@dataclass(frozen=True)
+class LazySection:
+    """A section whose blocks are only built when it is rendered
+
+    For content that is slow to produce, such as transcripts parsed from
+    large logs. build names the "module:function" returning the blocks
+    and args its JSON-serializable arguments; the section is cached under
+    them instead of its blocks, so args must change whenever the content
+    would, for instance by including the size and mtime of input files.
+    The blocks must not hold images.
+    """
+    name: str
+    build: str
+    args: tuple = ()
+
+    @cached_property
+    def blocks(self):
+        module, function = self.build.split(":")
+        return tuple(getattr(importlib.import_module(module), function)(*self.args))
+
+    @property
+    def images(self):
+        return []
+
+
+def text(value, align=None):
+    """Paragraph holding a single unformatted run"""
+    return Paragraph((Run(value),), align)
+
+
+def blank():
+    """Empty paragraph"""
+    return Paragraph()
+
+
+def xml_text(value):
+    """value without the characters XML 1.0 does not allow
+
+    Text from outside the repository, such as conversation logs, may hold
+    them; lxml refuses them and UTF-8 cannot encode lone surrogates.
+    """
+    return _NOT_XML.sub("", value)
+
+
+def code_listing(code, label="", language="", lines=None, line_numbers=True,
+                 chunk_lines=LISTING_CHUNK_LINES):
+    """Code blocks for a long listing, such as a whole source file
+
+    lines is an optional (first, last) range of 1-based line numbers, last
+    included. Listings longer than chunk_lines are split into several
+    blocks, at a blank line near the end of each chunk when there is one so
+    methods are not cut in two; the blank line itself is left out. Each
+    block's label gives its lines.
+    """
+    source = code.split("\n")
+    first, last = lines or (1, len(source))
+    first, last = max(first, 1), min(last, len(source))
+    blocks = []
+    start = first
+    while start <= last:
+        end = min(start + chunk_lines - 1, last)
+        next_start = end + 1
+        if end < last:
+            for blank_line in range(end, end - chunk_lines // 10, -1):
+                if not source[blank_line - 1].strip():
+                    end, next_start = blank_line - 1, blank_line + 1
+                    break
+        ranged = lines is not None or start > 1 or end < last
+        blocks.append(CodeBlock("\n".join(source[start - 1:end]),
+                                f"{label} (lines {start}-{end})" if ranged else label,
+                                language, line_numbers, start))
+        start = next_start
+    return tuple(blocks)
+
+
+def to_json(section):
+    """JSON-serializable form of a section, used for cache keys"""
+    if isinstance(section, LazySection):
+        return {"name": section.name, "build": section.build, "args": list(section.args)}
+    return {
+        "name": section.name,
+        "blocks": [[type(block).__name__, asdict(block)] for block in section.blocks],
+    }
@@ -0,0 +1,209 @@
+"""Opt-in profiling of a documentation build
+
+A Profiler wraps the generator's helpers, the python-docx calls they
+make (add_paragraph, add_picture) and the package save and write while it
+is running, and times each section of render_docx(). It records wall time, call counts,
+tracemalloc allocation peaks and the number of XML elements each section
+adds, and writes a JSON report plus a sorted text summary.
+
+A helper is wrapped wherever it is bound: in its module and in every
+module that imported it by name, including __main__ when doc_build.py is
+run as a script, so calls such as the section key hashing before and
+after rendering are all counted. Nothing is wrapped while no profiler is
+running; the per-section hook is then a shared no-op context manager.
+
+    profiler = Profiler()
+    profiler.start()
+    create_project_documentation(parallel=False)
+    profiler.stop()
+    profiler.write_report("profile.json")
+"""
+import contextlib
+import functools
+import importlib
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+# Functions wrapped while profiling, as "module:function" or "module:Class.method"
+HELPERS = [
+    "doc_content:build_sections",
+    "doc_build:section_keys",
+    "generate_documentation:render_section",
+    "generate_documentation:base_document",
+    "generate_documentation:add_heading_with_color",
+    "generate_documentation:add_code_block",
+    "generate_documentation:add_code_listing",
+    "generate_documentation:add_table",
+    "generate_documentation:add_chat_transcript",
+    "generate_documentation:add_screenshot",
+    "generate_documentation:add_formatted_paragraph",
+    "generate_documentation:add_styled_paragraph",
+    "generate_documentation:prepare_image",
+    "fragment_cache:FragmentCache.load",
+    "fragment_cache:FragmentCache.store",
+    "fragment_cache:FragmentCache.append",
+    "fragment_cache:FragmentCache.finish",
+    "docx.document:Document.add_paragraph",
+    "docx.document:Document.add_picture",
+    "generate_documentation:save_docx",
+    "generate_documentation:update_docx",
+    "generate_documentation:write_atomic",
+]
+
+_active = None
+_NO_PROFILE = contextlib.nullcontext()
+
+
+def section(name, doc):
+    """Context manager around one section of render_docx(); a no-op unless profiling"""
+    if _active is None:
+        return _NO_PROFILE
+    return _active.section(name, doc)
+
+
+def _resolve(target):
+    module_name, _, path = target.partition(":")
+    owner = importlib.import_module(module_name)
+    *classes, attr = path.split(".")
+    for name in classes:
+        owner = getattr(owner, name)
+    return owner, attr
+
+
+def _modules_binding(attr, func):
+    """Modules holding func under attr, such as those that imported it by name"""
+    return [module for module in list(sys.modules.values())
+            if getattr(module, "__dict__", {}).get(attr) is func]
+
+
+class Profiler:
+    """Collects per-section and per-helper timings while running"""
+
+    def __init__(self, helpers=HELPERS):
+        self.helpers = helpers
+        self.sections = []
+        self.calls = {}  # helper -> {"calls", "seconds", "peak_bytes"}
+        self.total_seconds = 0.0
+        self.peak_bytes = 0
+        self._frames = []  # [traced bytes at entry, peak seen in nested calls]
+        self._section = None
+        self._patched = []
+        self._started = None
+
+    def start(self):
+        global _active
+        if _active is not None:
+            raise RuntimeError("a profiler is already running")
+        tracemalloc.start()
+        for target in self.helpers:
+            owner, attr = _resolve(target)
+            original = getattr(owner, attr)
+            wrapper = self._wrap(target.split(":")[1], original)
+            holders = [owner] + [module for module in _modules_binding(attr, original)
+                                 if module is not owner]
+            for holder in holders:
+                setattr(holder, attr, wrapper)
+            self._patched.append((holders, attr, original, wrapper))
+        _active = self
+        self._started = time.perf_counter()
+
+    def stop(self):
+        global _active
+        self.total_seconds = time.perf_counter() - self._started
+        self.peak_bytes = tracemalloc.get_traced_memory()[1]
+        for holders, attr, original, wrapper in reversed(self._patched):
+            # Modules imported while profiling took the wrapper by name
+            for holder in holders + _modules_binding(attr, wrapper):
+                setattr(holder, attr, original)
+        self._patched = []
+        tracemalloc.stop()
+        _active = None
+
+    def _enter(self):
+        current, peak = tracemalloc.get_traced_memory()
+        if self._frames:
+            # reset_peak() below would lose the enclosing call's peak so far
+            self._frames[-1][1] = max(self._frames[-1][1], peak)
+        self.peak_bytes = max(self.peak_bytes, peak)
+        tracemalloc.reset_peak()
+        self._frames.append([current, 0])
+
+    def _exit(self):
+        """Peak bytes allocated above the level at entry"""
+        start, nested_peak = self._frames.pop()
+        peak = max(tracemalloc.get_traced_memory()[1], nested_peak)
+        if self._frames:
+            self._frames[-1][1] = max(self._frames[-1][1], peak)
+        self.peak_bytes = max(self.peak_bytes, peak)
+        return max(peak - start, 0)
+
+    def _wrap(self, name, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            self._enter()
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                seconds = time.perf_counter() - start
+                peak = self._exit()
+                stats = self.calls.setdefault(name, {"calls": 0, "seconds": 0.0, "peak_bytes": 0})
+                stats["calls"] += 1
+                stats["seconds"] += seconds
+                stats["peak_bytes"] = max(stats["peak_bytes"], peak)
+                if self._section is not None:
+                    self._section["calls"][name] = self._section["calls"].get(name, 0) + 1
+        return wrapper
+
+    @contextlib.contextmanager
+    def section(self, name, doc):
+        body = doc.element.body
+        before = len(body)
+        record = {"name": name, "calls": {}}
+        self._section = record
+        self._enter()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record["seconds"] = time.perf_counter() - start
+            record["peak_bytes"] = self._exit()
+            # New elements sit between the old content and the trailing sectPr
+            record["xml_elements"] = sum(1 for element in body[before - 1:len(body) - 1]
+                                         for _ in element.iter())
+            record["cached"] = "render_section" not in record["calls"]
+            self._section = None
+            self.sections.append(record)
+
+    def report(self):
+        helpers = {name: dict(stats, mean_ms=stats["seconds"] * 1000 / stats["calls"])
+                   for name, stats in self.calls.items()}
+        return {"total_seconds": self.total_seconds, "peak_bytes": self.peak_bytes,
+                "sections": self.sections, "helpers": helpers}
+
+    def summary(self):
+        """Text summary, slowest sections and helpers first"""
+        lines = [f"Total {self.total_seconds:.3f}s, traced peak {self.peak_bytes / 2**20:.1f} MB",
+                 "", "Sections (slowest first)"]
+        for record in sorted(self.sections, key=lambda r: r["seconds"], reverse=True):
+            lines.append(f"  {record['name']:<28} {record['seconds']:>8.3f}s  "
+                         f"{'cached' if record['cached'] else 'rendered':<8}  "
+                         f"peak {record['peak_bytes'] / 2**20:>6.1f} MB  "
+                         f"{record['xml_elements']:>8,} elements")
+        lines += ["", "Helpers (inclusive of nested calls, slowest first)"]
+        for name, stats in sorted(self.calls.items(), key=lambda item: item[1]["seconds"],
+                                  reverse=True):
+            lines.append(f"  {name:<32} {stats['calls']:>7,} calls  {stats['seconds']:>8.3f}s  "
+                         f"{stats['seconds'] * 1000 / stats['calls']:>8.2f} ms/call  "
+                         f"peak {stats['peak_bytes'] / 2**20:>6.1f} MB")
+        return "\n".join(lines)
+
+    def write_report(self, path):
+        """Write the JSON report to path and the text summary next to it"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+        with open(os.path.splitext(path)[0] + ".txt", "w", encoding="utf-8") as f:
+            f.write(self.summary() + "\n")
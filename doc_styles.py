@@ -0,0 +1,356 @@
+"""Style registry: named styles defined once in styles.xml
+
+Code blocks, listing lines, code labels, line numbers, syntax tokens,
+chat bubbles and colored headings reference a style ID instead of repeating fonts, colors
+and shading on every run and paragraph. Styles are created on first use
+from the theme's palette.
+
+Style IDs are written directly with add_styled_paragraph() and
+add_styled_run(): python-docx's style= argument rescans every style in
+styles.xml to find the default on each call, which dominates generation
+time for long documents.
+"""
+import re
+import weakref
+from itertools import chain
+from xml.sax.saxutils import escape, quoteattr
+
+from docx.enum.style import WD_STYLE_TYPE
+from docx.oxml import OxmlElement, parse_xml
+from docx.oxml.ns import nsdecls, qn
+from docx.shared import Emu, Inches, Pt, RGBColor
+
+from doc_model import DEFAULT_THEME, xml_text
+
+CODE_BLOCK = "CodeBlock"
+CODE_LISTING = "CodeListing"
+CODE_LABEL = "CodeLabel"
+CODE_LINE_NUMBER = "CodeLineNumber"
+CHAT_NOTE = "ChatNote"
+# Chat bubbles are indented this far from the side they do not start at
+BUBBLE_INDENT = Inches(1.25)
+
+# add_styled_paragraphs() parses this many paragraphs at a time, and
+# add_table_from_rows() this many rows
+PARAGRAPH_BATCH = 500
+
+# python-docx turns each of these into a <w:tab/> or <w:br/> in run text
+_RUN_BREAKS = re.compile(r"([\t\r\n])")
+
+# Resolved style objects per document; looking a style up by name in
+# styles.xml is a linear scan, so each name is resolved once per document
+_registry = weakref.WeakKeyDictionary()
+
+
+def _get_or_add_style(doc, name, style_type, define):
+    styles = _registry.setdefault(doc.part, {})
+    if name not in styles:
+        try:
+            styles[name] = doc.styles[name]
+        except KeyError:
+            if style_type is None:
+                raise
+            styles[name] = doc.styles.add_style(name, style_type)
+            define(styles[name])
+    return styles[name]
+
+
+def named_style(doc, name):
+    """Resolve an existing style such as 'List Bullet' once per document"""
+    def undefined(style):
+        raise KeyError(f"no style with name '{name}'")
+    return _get_or_add_style(doc, name, None, undefined)
+
+
+def add_styled_paragraph(doc, text="", style=None):
+    """Add a paragraph that references style by ID"""
+    paragraph = doc.add_paragraph(text)
+    if style is not None:
+        paragraph._p.style = style.style_id
+    return paragraph
+
+
+def add_styled_run(paragraph, text, style=None):
+    """Add a run that references a character style by ID"""
+    run = paragraph.add_run(text)
+    if style is not None:
+        run._r.style = style.style_id
+    return run
+
+
+def _runs_xml(xml, spans, properties=""):
+    """Append the XML of one run per (text, style) span to the list xml
+
+    Runs without a style get the run properties XML properties, if any.
+    Characters XML does not allow, such as form feeds in code, are dropped.
+    """
+    for text, style in spans:
+        text = xml_text(text)
+        xml.append("<w:r>")
+        if style is not None:
+            xml.append(f"<w:rPr><w:rStyle w:val={quoteattr(style.style_id)}/></w:rPr>")
+        elif properties:
+            xml.append(f"<w:rPr>{properties}</w:rPr>")
+        for part in _RUN_BREAKS.split(text):
+            if part == "\t":
+                xml.append("<w:tab/>")
+            elif part in ("\r", "\n"):
+                xml.append("<w:br/>")
+            elif part:
+                space = ' xml:space="preserve"' if part != part.strip() else ""
+                xml.append(f"<w:t{space}>{escape(part)}</w:t>")
+        xml.append("</w:r>")
+
+
+def add_styled_runs(paragraph, spans):
+    """Add one run per (text, style) span in a single step
+
+    Produces the same XML as add_styled_run() for each span, but builds it
+    as a string and parses it once: python-docx's run text setter adds
+    every character through the element API, which is too slow for the
+    many short runs of highlighted code.
+    """
+    xml = []
+    _runs_xml(xml, spans)
+    paragraph._p.extend(parse_xml(f'<w:p {nsdecls("w")}>{"".join(xml)}</w:p>'))
+
+
+def add_styled_paragraphs(doc, paragraphs, style):
+    """Add a paragraph in style per list of (text, style) spans
+
+    The XML is built as with add_styled_runs() and parsed PARAGRAPH_BATCH
+    paragraphs at a time, so thousands of lines of a listing cost a few
+    parses of bounded size. Returns the number of paragraphs added.
+    """
+    return add_paragraphs(doc, ((style, spans) for spans in paragraphs))
+
+
+def add_paragraphs(doc, paragraphs):
+    """Add a paragraph per (style, spans) pair, batched as add_styled_paragraphs()"""
+    body = doc.element.body
+    sectPr = body.sectPr
+    count = 0
+    xml = []
+    for style, spans in paragraphs:
+        xml.append(f"<w:p><w:pPr><w:pStyle w:val={quoteattr(style.style_id)}/></w:pPr>")
+        _runs_xml(xml, spans)
+        xml.append("</w:p>")
+        count += 1
+        if count % PARAGRAPH_BATCH == 0:
+            _insert_body_xml(body, sectPr, xml)
+            xml = []
+    _insert_body_xml(body, sectPr, xml)
+    return count
+
+
+def _insert_body_xml(body, sectPr, xml):
+    if not xml:
+        return
+    for element in list(parse_xml(f'<w:body {nsdecls("w")}>{"".join(xml)}</w:body>')):
+        if sectPr is not None:
+            sectPr.addprevious(element)
+        else:
+            body.append(element)
+
+
+def _row_xml(xml, values, twips, header=False):
+    xml.append("<w:tr>")
+    if header:
+        # Header rows repeat at the top of every page the table spans
+        xml.append("<w:trPr><w:tblHeader/></w:trPr>")
+    for value, width in zip(values, twips):
+        xml.append(f'<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{width}"/></w:tcPr>')
+        text = "" if value is None else str(value)
+        if text:
+            xml.append("<w:p>")
+            _runs_xml(xml, ((text, None),), "<w:b/>" if header else "")
+            xml.append("</w:p>")
+        else:
+            xml.append("<w:p/>")
+        xml.append("</w:tc>")
+    xml.append("</w:tr>")
+
+
+def _extend_table(tbl, xml):
+    if xml:
+        tbl.extend(parse_xml(f'<w:tbl {nsdecls("w")}>{"".join(xml)}</w:tbl>'))
+
+
+def add_table_from_rows(doc, rows, header=None, widths=None, style=None):
+    """Add a table with a row per item of rows, built as XML in one pass
+
+    python-docx adds every cell through the element API, and looking a
+    cell up with table.cell() walks the rows before it, so filling a
+    table cell by cell gets quadratically slower as it grows. Here rows,
+    any iterable of sequences including a generator, is consumed once and
+    its XML parsed PARAGRAPH_BATCH rows at a time, so a table costs time
+    and memory linear in its rows. header is a bold row repeated on every
+    page; widths are column widths in inches (default: the space between
+    the margins split evenly) and style a table style such as
+    named_style(doc, "Table Grid"). Returns the number of rows after the
+    header.
+    """
+    rows = iter(rows)
+    if header is None:
+        first = next(rows, None)
+        if first is None:
+            return 0
+        rows = chain((first,), rows)
+    columns = len(header if header is not None else first)
+    if widths:
+        twips = [Inches(width).twips for width in widths]
+    else:
+        section = doc.sections[-1]
+        space = section.page_width - section.left_margin - section.right_margin
+        twips = [Emu(space // columns).twips] * columns
+
+    xml = [f'<w:tbl {nsdecls("w")}><w:tblPr>']
+    if style is not None:
+        xml.append(f"<w:tblStyle w:val={quoteattr(style.style_id)}/>")
+    xml.append('<w:tblW w:type="auto" w:w="0"/><w:tblLook w:firstColumn="1" w:firstRow="1" '
+               'w:lastColumn="0" w:lastRow="0" w:noHBand="0" w:noVBand="1" w:val="04A0"/>'
+               "</w:tblPr><w:tblGrid>")
+    xml.extend(f'<w:gridCol w:w="{width}"/>' for width in twips)
+    xml.append("</w:tblGrid>")
+    if header is not None:
+        _row_xml(xml, header, twips, header=True)
+    xml.append("</w:tbl>")
+    tbl = parse_xml("".join(xml))
+    body = doc.element.body
+    if body.sectPr is not None:
+        body.sectPr.addprevious(tbl)
+    else:
+        body.append(tbl)
+
+    count = 0
+    xml = []
+    for values in rows:
+        _row_xml(xml, values, twips)
+        count += 1
+        if count % PARAGRAPH_BATCH == 0:
+            _extend_table(tbl, xml)
+            xml = []
+    _extend_table(tbl, xml)
+    return count
+
+
+def code_block_style(doc, theme=DEFAULT_THEME):
+    """Monospace paragraph style with a gray background"""
+    def define(style):
+        style.base_style = doc.styles['Normal']
+        style.quick_style = True
+        style.font.name = theme.code_font
+        style.font.size = Pt(theme.code_size)
+        shading = OxmlElement('w:shd')
+        shading.set(qn('w:val'), 'clear')
+        shading.set(qn('w:color'), 'auto')
+        shading.set(qn('w:fill'), theme.code_fill)
+        style.element.get_or_add_pPr().append(shading)
+    return _get_or_add_style(doc, CODE_BLOCK, WD_STYLE_TYPE.PARAGRAPH, define)
+
+
+def code_listing_style(doc, theme=DEFAULT_THEME):
+    """Code block style for one line of a listing: no spacing, no widow control
+
+    Each line of a long listing is its own paragraph so Word can lay it out
+    and break pages between lines.
+    """
+    def define(style):
+        style.base_style = code_block_style(doc, theme)
+        style.quick_style = True
+        style.paragraph_format.space_before = Pt(0)
+        style.paragraph_format.space_after = Pt(0)
+        style.paragraph_format.line_spacing = 1.0
+        style.paragraph_format.widow_control = False
+    return _get_or_add_style(doc, CODE_LISTING, WD_STYLE_TYPE.PARAGRAPH, define)
+
+
+def code_line_number_style(doc, theme=DEFAULT_THEME):
+    """Muted character style for the line numbers of a listing"""
+    def define(style):
+        style.font.color.rgb = RGBColor(*theme.muted)
+    return _get_or_add_style(doc, CODE_LINE_NUMBER, WD_STYLE_TYPE.CHARACTER, define)
+
+
+def code_label_style(doc, theme=DEFAULT_THEME):
+    """Small italic muted character style for the label above a code block"""
+    def define(style):
+        style.quick_style = True
+        style.font.size = Pt(theme.code_size)
+        style.font.color.rgb = RGBColor(*theme.muted)
+        style.font.italic = True
+        # Labels use the body font rather than the code block's monospace font
+        fonts = style.element.get_or_add_rPr().get_or_add_rFonts()
+        for attr in ('w:asciiTheme', 'w:hAnsiTheme'):
+            fonts.set(qn(attr), 'minorHAnsi')
+    return _get_or_add_style(doc, CODE_LABEL, WD_STYLE_TYPE.CHARACTER, define)
+
+
+def code_token_style(doc, token, theme=DEFAULT_THEME):
+    """Character style for a syntax token class, such as Code Keyword"""
+    color, bold, italic = theme.syntax_format(token)
+
+    def define(style):
+        style.font.color.rgb = RGBColor(*color)
+        if bold:
+            style.font.bold = True
+        if italic:
+            style.font.italic = True
+    return _get_or_add_style(doc, f"Code {token.capitalize()}", WD_STYLE_TYPE.CHARACTER, define)
+
+
+def chat_bubble_style(doc, role, theme=DEFAULT_THEME):
+    """Shaded paragraph style for a transcript turn, ChatUser or ChatBot
+
+    User turns are indented from the left and bot turns from the right,
+    like the bubbles of the chat page.
+    """
+    user = role == "user"
+
+    def define(style):
+        style.base_style = doc.styles['Normal']
+        style.quick_style = True
+        style.paragraph_format.space_before = Pt(2)
+        style.paragraph_format.space_after = Pt(6)
+        if user:
+            style.paragraph_format.left_indent = BUBBLE_INDENT
+        else:
+            style.paragraph_format.right_indent = BUBBLE_INDENT
+        shading = OxmlElement('w:shd')
+        shading.set(qn('w:val'), 'clear')
+        shading.set(qn('w:color'), 'auto')
+        shading.set(qn('w:fill'), theme.user_fill if user else theme.bot_fill)
+        style.element.get_or_add_pPr().append(shading)
+    return _get_or_add_style(doc, "ChatUser" if user else "ChatBot", WD_STYLE_TYPE.PARAGRAPH,
+                             define)
+
+
+def chat_note_style(doc, theme=DEFAULT_THEME):
+    """Small bold muted character style for the speaker line of a chat bubble"""
+    def define(style):
+        style.quick_style = True
+        style.font.size = Pt(8)
+        style.font.bold = True
+        style.font.color.rgb = RGBColor(*theme.muted)
+    return _get_or_add_style(doc, CHAT_NOTE, WD_STYLE_TYPE.CHARACTER, define)
+
+
+def heading_style(doc, level, color, size=None, theme=DEFAULT_THEME):
+    """Heading style of the given level in a palette color
+
+    Level 0 is based on Title, others on "Heading <level>", so outline
+    levels and the navigation pane keep working.
+    """
+    base_name = 'Title' if level == 0 else f'Heading {level}'
+    name = f"{base_name} {theme.color_name(color)}"
+    if size:
+        name += f" {size:g}pt"
+
+    def define(style):
+        style.base_style = doc.styles[base_name]
+        style.next_paragraph_style = doc.styles['Normal']
+        style.quick_style = True
+        style.font.color.rgb = RGBColor(*color)
+        if size:
+            style.font.size = Pt(size)
+    return _get_or_add_style(doc, name, WD_STYLE_TYPE.PARAGRAPH, define)
@@ -0,0 +1,115 @@
+"""Base template every generated document starts from
+
+python-docx's Document() parses its whole default template, 164 style
+definitions and a Word 2010 copy of them, for every document, including
+the throwaway one each rendered section gets. The base template is built
+once instead: 1 inch margins, only the built-in styles the renderers use,
+the custom heading and code styles of the theme registered up front, and
+without the parts generated documents do not need (the Word 2010 styles,
+the thumbnail and the bibliography custom XML). It is stored as a .docx
+under the cache directory, keyed by everything it is built from, and
+every document is a clone of its bytes.
+"""
+import hashlib
+import os
+from io import BytesIO
+
+import docx
+from docx import Document
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.oxml.ns import qn
+from docx.shared import Inches
+
+from cache_keys import file_digest, source_digest, write_atomic
+from doc_model import DEFAULT_THEME
+from doc_styles import code_block_style, code_label_style, code_token_style, heading_style
+
+MARGIN_INCHES = 1
+
+# Built-in styles looked up by name (see doc_styles.named_style); any other
+# built-in style that none of these is based on is left out
+BASE_STYLES = ["Normal", "Title", *(f"Heading {level}" for level in range(1, 10)),
+               "List Bullet", "Table Grid"]
+
+# Headings created up front: (level, theme color, size)
+HEADING_STYLES = [(0, "primary", 28), (1, "primary", None), (2, "secondary", None)]
+
+STYLES_WITH_EFFECTS = "http://schemas.microsoft.com/office/2007/relationships/stylesWithEffects"
+_DROPPED_PARTS = {STYLES_WITH_EFFECTS, RT.CUSTOM_XML, RT.THUMBNAIL}
+
+_DEFAULT_TEMPLATE = os.path.join(os.path.dirname(docx.__file__), "templates", "default.docx")
+
+_templates = {}  # template key -> .docx bytes
+
+
+def template_key(theme=DEFAULT_THEME):
+    """Hash of the template's inputs: python-docx's template, this code and the theme"""
+    digest = hashlib.sha256()
+    digest.update(f"{docx.__version__}:{file_digest(_DEFAULT_TEMPLATE)}\n".encode())
+    digest.update(source_digest(["doc_template", "doc_styles"]).encode())
+    digest.update(repr((theme, MARGIN_INCHES, BASE_STYLES, HEADING_STYLES)).encode())
+    return digest.hexdigest()
+
+
+def _trim_styles(doc):
+    """Drop the built-in styles that BASE_STYLES do not need"""
+    styles = doc.styles.element
+    by_id = {style.get(qn("w:styleId")): style for style in styles.iterchildren(qn("w:style"))}
+    # python-docx stores built-in names the way Word does, e.g. "heading 1"
+    wanted = {name.lower() for name in BASE_STYLES}
+    pending = [style for style in by_id.values()
+               if (style.name_val or "").lower() in wanted or style.get(qn("w:default")) == "1"]
+    keep = set()
+    while pending:
+        style = pending.pop()
+        if style.styleId in keep:
+            continue
+        keep.add(style.styleId)
+        for tag in ("w:basedOn", "w:next", "w:link"):
+            related = style.find(qn(tag))
+            if related is not None and related.get(qn("w:val")) in by_id:
+                pending.append(by_id[related.get(qn("w:val"))])
+    for style_id, style in by_id.items():
+        if style_id not in keep:
+            styles.remove(style)
+
+
+def build_template(theme=DEFAULT_THEME):
+    """Build the base template document"""
+    doc = Document()
+    for section in doc.sections:
+        section.top_margin = Inches(MARGIN_INCHES)
+        section.bottom_margin = Inches(MARGIN_INCHES)
+        section.left_margin = Inches(MARGIN_INCHES)
+        section.right_margin = Inches(MARGIN_INCHES)
+
+    for rels in (doc.part.rels, doc.part.package.rels):
+        for rId, rel in list(rels.items()):
+            if rel.reltype in _DROPPED_PARTS:
+                del rels[rId]
+    _trim_styles(doc)
+
+    for level, color, size in HEADING_STYLES:
+        heading_style(doc, level, getattr(theme, color), size, theme)
+    code_block_style(doc, theme)
+    code_label_style(doc, theme)
+    for token, *_ in theme.syntax:
+        code_token_style(doc, token, theme)
+    return doc
+
+
+def base_document(cache_dir, theme=DEFAULT_THEME):
+    """A new document cloned from the base template, building the template if needed"""
+    key = template_key(theme)
+    if key not in _templates:
+        path = os.path.join(cache_dir, "templates", f"{key}.docx")
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                _templates[key] = f.read()
+        else:
+            buffer = BytesIO()
+            build_template(theme).save(buffer)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            write_atomic(path, buffer.getvalue())
+            _templates[key] = buffer.getvalue()
+    return Document(BytesIO(_templates[key]))
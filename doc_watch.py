@@ -0,0 +1,105 @@
+"""Watch mode: regenerate the documentation whenever its inputs change
+
+The inputs are the content module (doc_content.py), the project config if
+there is one, the screenshots, the response catalog, the conversation
+logs and the Java sources the code listings are extracted from. They are
+polled by mtime and size; a burst of changes, such as an editor saving
+several files, triggers one rebuild once the files have been quiet for
+DEBOUNCE seconds. Rebuilds go through the fragment cache, so only the
+sections whose inputs changed are rendered.
+"""
+import importlib
+import os
+import time
+import traceback
+
+import doc_content
+
+POLL_INTERVAL = 0.1
+DEBOUNCE = 0.15
+
+
+def input_paths(config_path=None):
+    """Files the documentation is generated from"""
+    config = doc_content.load_config(config_path) if config_path else None
+    config = doc_content.project_config(config)
+    paths = [doc_content.__file__] + config["screenshots"]
+    paths.extend([config["performance_results"], config["response_catalog"]])
+    paths.extend(listing["path"] for listing in config["listings"])
+    paths.extend(config["transcripts"]["logs"])
+    if config_path:
+        paths.append(config_path)
+    for dirpath, dirnames, filenames in os.walk(config["java_source_root"]):
+        paths.extend(os.path.join(dirpath, name) for name in filenames if name.endswith(".java"))
+    return paths
+
+
+def file_state(paths):
+    """(mtime, size) of each path, None for files that don't exist"""
+    state = {}
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            state[path] = None
+        else:
+            state[path] = (stat.st_mtime_ns, stat.st_size)
+    return state
+
+
+def wait_for_change(inputs, state, poll_interval=POLL_INTERVAL, debounce=DEBOUNCE):
+    """Block until the files from inputs() differ from state and settle
+
+    Returns the new state and the paths that changed.
+    """
+    current = state
+    while current == state:
+        time.sleep(poll_interval)
+        current = file_state(inputs())
+    while True:
+        time.sleep(debounce)
+        latest = file_state(inputs())
+        if latest == current:
+            break
+        current = latest
+    changed = sorted(path for path in state.keys() | current.keys()
+                     if state.get(path) != current.get(path))
+    return current, changed
+
+
+def watch_documentation(create, output_path, cache_dir, formats, config_path=None):
+    """Generate the documentation now and again after every change
+
+    create is generate_documentation.create_project_documentation. The
+    content module is reloaded before each rebuild so edits to it take
+    effect; a failing build is reported and the watch carries on.
+    Stops on Ctrl+C.
+    """
+    def build():
+        start = time.perf_counter()
+        try:
+            importlib.reload(doc_content)
+            config = doc_content.load_config(config_path) if config_path else None
+            # Render in this warm process rather than starting workers per rebuild
+            create(output_path, cache_dir, formats, config, parallel=False)
+        except Exception:
+            traceback.print_exc()
+        print(f"Built in {time.perf_counter() - start:.2f}s; watching for changes (Ctrl+C to stop)")
+
+    def inputs():
+        try:
+            return input_paths(config_path)
+        except Exception:
+            # Keep watching the config and content while they can't be read
+            return [doc_content.__file__] + ([config_path] if config_path else [])
+
+    try:
+        # Snapshot before building, so edits saved during the build trigger a rebuild
+        state = file_state(inputs())
+        build()
+        while True:
+            state, changed = wait_for_change(inputs, state)
+            print(f"Changed: {', '.join(os.path.basename(path) for path in changed)}")
+            build()
+    except KeyboardInterrupt:
+        pass
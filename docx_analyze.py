@@ -0,0 +1,365 @@
+"""Bloat report for a generated .docx
+
+Reports the compressed and uncompressed size of every part of the
+package, each image's pixel size against the size it is displayed at
+(flagging screenshots embedded at more than OVERSAMPLED_DPI, and images
+nothing displays), media stored more than once, and the paragraphs, runs
+and direct formatting of each section, a section starting at every
+Heading 1. Direct formatting is every property set on a run or paragraph
+itself rather than through its style.
+
+The package is streamed: sizes come from the zip's central directory,
+media is hashed in chunks and the document XML is parsed incrementally,
+each top-level body element dropped once it has been counted, so memory
+stays flat however large the document is.
+
+    python docx_analyze.py                                  the default output
+    python docx_analyze.py manual.docx --json bloat.json   report for CI as well
+    python docx_analyze.py manual.docx --budget budget.json
+
+A budget is a JSON object of report totals and their maximum, such as
+{"compressed_bytes": 5000000, "oversampled_media": 0}; the command exits
+with 1 when any total exceeds its budget.
+"""
+import argparse
+import hashlib
+import json
+import posixpath
+import struct
+import sys
+import zipfile
+from xml.etree.ElementTree import iterparse
+
+from cache_keys import write_atomic
+from image_pipeline import DEFAULT_DPI
+
+# Images displayed at more than this many pixels per inch are flagged
+OVERSAMPLED_DPI = DEFAULT_DPI * 1.5
+CHUNK_SIZE = 1 << 20
+# Parts listed in the summary, largest first
+SUMMARY_PARTS = 10
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+WP = "{http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing}"
+A = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+R = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PR = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+EMU_PER_INCH = 914400
+
+# Paragraph properties that are not direct formatting
+_PARAGRAPH_STRUCTURE = {W + "pStyle", W + "rPr", W + "sectPr", W + "pPrChange"}
+_RUN_STRUCTURE = {W + "rStyle", W + "rPrChange"}
+_IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".bmp", ".tif", ".tiff", ".emf", ".wmf"}
+_DRAWINGS = (WP + "inline", WP + "anchor")
+_FRONT_MATTER = "(before the first heading)"
+
+
+def image_size(head):
+    """(width, height) in pixels from the start of a PNG, GIF or JPEG file, or None"""
+    if head[:8] == b"\x89PNG\r\n\x1a\n" and len(head) >= 24:
+        return struct.unpack(">II", head[16:24])
+    if head[:6] in (b"GIF87a", b"GIF89a") and len(head) >= 10:
+        return struct.unpack("<HH", head[6:10])
+    if head[:2] == b"\xff\xd8":
+        i = 2
+        while i + 9 <= len(head):
+            if head[i] != 0xFF:
+                return None
+            marker = head[i + 1]
+            if marker == 0xFF:
+                i += 1
+                continue
+            # Start of frame markers, other than DHT, JPG and DAC
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                height, width = struct.unpack(">HH", head[i + 5:i + 9])
+                return width, height
+            if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+                i += 2
+                continue
+            i += 2 + struct.unpack(">H", head[i + 2:i + 4])[0]
+    return None
+
+
+def _relationships(zf, names, part):
+    """{rId: part name} of the internal relationships of part"""
+    directory, name = posixpath.split(part)
+    rels = posixpath.join(directory, "_rels", name + ".rels")
+    if rels not in names:
+        return {}
+    targets = {}
+    with zf.open(rels) as f:
+        for _, element in iterparse(f):
+            if element.tag == PR + "Relationship" and element.get("TargetMode") != "External":
+                target = element.get("Target")
+                targets[element.get("Id")] = (target.lstrip("/") if target.startswith("/") else
+                                              posixpath.normpath(posixpath.join(directory, target)))
+    return targets
+
+
+def _main_part(zf, names):
+    for target in _relationships(zf, names, "").values():
+        if target in names and target.endswith(".xml") and target.startswith("word/"):
+            return target
+    return "word/document.xml"
+
+
+def _heading_styles(zf, names):
+    """Style ids of Heading 1 and the styles based on it, where sections start"""
+    based_on = {}
+    headings = set()
+    if "word/styles.xml" in names:
+        with zf.open("word/styles.xml") as f:
+            for _, element in iterparse(f):
+                if element.tag == W + "style":
+                    style_id = element.get(W + "styleId")
+                    name = element.find(W + "name")
+                    parent = element.find(W + "basedOn")
+                    if name is not None and name.get(W + "val", "").lower() == "heading 1":
+                        headings.add(style_id)
+                    if parent is not None:
+                        based_on[style_id] = parent.get(W + "val")
+                    element.clear()
+    headings = headings or {"Heading1"}
+    for style_id in list(based_on):
+        seen = set()
+        parent = style_id
+        while parent is not None and parent not in seen and parent not in headings:
+            seen.add(parent)
+            parent = based_on.get(parent)
+        if parent in headings:
+            headings.add(style_id)
+    return headings
+
+
+def _direct_properties(properties, structure):
+    return 0 if properties is None else sum(1 for child in properties if child.tag not in structure)
+
+
+def _drawing(drawing, targets, placements):
+    """Record the display width of the image an inline or anchored drawing shows"""
+    extent = drawing.find(WP + "extent")
+    blip = next(drawing.iter(A + "blip"), None)
+    target = targets.get(blip.get(R + "embed")) if blip is not None else None
+    if extent is None or target is None:
+        return 0
+    placement = placements.setdefault(target, {"displayed": 0, "display_inches": 0.0})
+    placement["displayed"] += 1
+    placement["display_inches"] = max(placement["display_inches"],
+                                      int(extent.get("cx", 0)) / EMU_PER_INCH)
+    return 1
+
+
+def _new_section(heading):
+    return {"heading": heading, "paragraphs": 0, "runs": 0, "formatted_runs": 0,
+            "direct_properties": 0, "tables": 0, "images": 0, "characters": 0,
+            "xml_elements": 0}
+
+
+def _scan_document(zf, part, targets, heading_styles, placements):
+    """Per-section counts of the main document part, parsed incrementally"""
+    sections = [_new_section(_FRONT_MATTER)]
+    body = None
+    depth = 0
+    with zf.open(part) as f:
+        for event, element in iterparse(f, ("start", "end")):
+            if event == "start":
+                depth += 1
+                if depth == 2 and element.tag == W + "body":
+                    body = element
+                continue
+            depth -= 1
+            if depth != 2 or body is None:
+                continue
+            # A top-level element of the body is complete: count it and drop it
+            if element.tag == W + "p":
+                style = element.find(f"{W}pPr/{W}pStyle")
+                if style is not None and style.get(W + "val") in heading_styles:
+                    heading = "".join(t.text or "" for t in element.iter(W + "t"))
+                    sections.append(_new_section(heading))
+            section = sections[-1]
+            for node in element.iter():
+                tag = node.tag
+                section["xml_elements"] += 1
+                if tag == W + "r":
+                    direct = _direct_properties(node.find(W + "rPr"), _RUN_STRUCTURE)
+                    section["runs"] += 1
+                    section["formatted_runs"] += direct > 0
+                    section["direct_properties"] += direct
+                elif tag == W + "t":
+                    section["characters"] += len(node.text or "")
+                elif tag == W + "p":
+                    section["paragraphs"] += 1
+                    section["direct_properties"] += _direct_properties(node.find(W + "pPr"),
+                                                                       _PARAGRAPH_STRUCTURE)
+                elif tag == W + "tbl":
+                    section["tables"] += 1
+                elif tag in _DRAWINGS:
+                    section["images"] += _drawing(node, targets, placements)
+            body.remove(element)
+    if not any(sections[0][key] for key in ("paragraphs", "tables")):
+        sections.pop(0)
+    return sections
+
+
+def _scan_drawings(zf, part, targets, placements):
+    """Record the images drawn in a header, footer or other part"""
+    depth = 0
+    with zf.open(part) as f:
+        for event, element in iterparse(f, ("start", "end")):
+            if event == "start":
+                depth += 1
+                continue
+            depth -= 1
+            if depth == 1:
+                for tag in _DRAWINGS:
+                    for drawing in element.iter(tag):
+                        _drawing(drawing, targets, placements)
+                element.clear()
+
+
+def _media(zf, info, placement, dpi_limit):
+    digest = hashlib.sha256()
+    head = b""
+    with zf.open(info) as f:
+        while chunk := f.read(CHUNK_SIZE):
+            head = head or chunk
+            digest.update(chunk)
+    size = image_size(head)
+    media = {"part": info.filename, "bytes": info.file_size, "compressed_bytes": info.compress_size,
+             "sha256": digest.hexdigest(), "pixels": list(size) if size else None,
+             "displayed": placement["displayed"] if placement else 0,
+             "display_inches": round(placement["display_inches"], 3) if placement else None,
+             "dpi": None, "oversampled": False}
+    if size and placement and placement["display_inches"]:
+        dpi = size[0] / placement["display_inches"]
+        media["dpi"] = round(dpi)
+        media["oversampled"] = dpi > dpi_limit
+    return media
+
+
+def analyze(path, dpi_limit=OVERSAMPLED_DPI):
+    """Bloat report of the .docx at path, as a JSON-serializable dict"""
+    with zipfile.ZipFile(path) as zf:
+        infos = zf.infolist()
+        names = {info.filename for info in infos}
+        main = _main_part(zf, names)
+        heading_styles = _heading_styles(zf, names)
+        placements = {}
+        sections = _scan_document(zf, main, _relationships(zf, names, main), heading_styles,
+                                  placements)
+        for info in infos:
+            directory, name = posixpath.split(info.filename)
+            if directory.endswith("_rels") and name.endswith(".rels"):
+                owner = posixpath.join(posixpath.dirname(directory), name[:-len(".rels")])
+                if owner != main and owner.endswith(".xml") and owner in names:
+                    targets = _relationships(zf, names, owner)
+                    if any(posixpath.splitext(t)[1].lower() in _IMAGE_EXTENSIONS
+                           for t in targets.values()):
+                        _scan_drawings(zf, owner, targets, placements)
+        # Images of the document, not the package thumbnail in docProps
+        media = [_media(zf, info, placements.get(info.filename), dpi_limit) for info in infos
+                 if info.filename.startswith(posixpath.dirname(main) + "/")
+                 and posixpath.splitext(info.filename)[1].lower() in _IMAGE_EXTENSIONS]
+
+    parts = sorted(({"part": info.filename, "bytes": info.file_size,
+                     "compressed_bytes": info.compress_size,
+                     "stored": info.compress_type == zipfile.ZIP_STORED} for info in infos),
+                   key=lambda part: part["compressed_bytes"], reverse=True)
+    by_digest = {}
+    for item in media:
+        by_digest.setdefault(item["sha256"], []).append(item)
+    # Every copy after the first is wasted
+    duplicates = [{"sha256": digest, "parts": [item["part"] for item in group],
+                   "wasted_bytes": sum(item["compressed_bytes"] for item in group[1:])}
+                  for digest, group in by_digest.items() if len(group) > 1]
+    totals = {
+        "parts": len(parts),
+        "bytes": sum(part["bytes"] for part in parts),
+        "compressed_bytes": sum(part["compressed_bytes"] for part in parts),
+        "media": len(media),
+        "media_bytes": sum(item["compressed_bytes"] for item in media),
+        "oversampled_media": sum(item["oversampled"] for item in media),
+        "unreferenced_media": sum(not item["displayed"] for item in media),
+        "duplicate_media_bytes": sum(group["wasted_bytes"] for group in duplicates),
+    }
+    for key in ("paragraphs", "runs", "formatted_runs", "direct_properties", "tables", "images"):
+        totals[key] = sum(section[key] for section in sections)
+    return {"path": path, "main_part": main, "oversampled_dpi": dpi_limit, "totals": totals,
+            "parts": parts, "media": media, "duplicate_media": duplicates, "sections": sections}
+
+
+def over_budget(report, budget):
+    """Messages for every report total over its budget"""
+    return [f"{key} is {report['totals'].get(key, 0):,}, budget {limit:,}"
+            for key, limit in budget.items() if report["totals"].get(key, 0) > limit]
+
+
+def _mb(size):
+    return f"{size / 2**20:.2f} MB"
+
+
+def summary(report):
+    """Text summary: totals, largest parts, flagged media and the sections"""
+    totals = report["totals"]
+    lines = [f"{report['path']}: {_mb(totals['compressed_bytes'])} in {totals['parts']} parts "
+             f"({_mb(totals['bytes'])} uncompressed)",
+             f"Media: {totals['media']} images, {_mb(totals['media_bytes'])}; "
+             f"{totals['oversampled_media']} oversampled, {totals['unreferenced_media']} "
+             f"unreferenced, {_mb(totals['duplicate_media_bytes'])} duplicated",
+             f"Content: {totals['paragraphs']:,} paragraphs, {totals['runs']:,} runs, "
+             f"{totals['formatted_runs']:,} with direct formatting, "
+             f"{totals['direct_properties']:,} direct properties",
+             "", "Largest parts (compressed)"]
+    for part in report["parts"][:SUMMARY_PARTS]:
+        ratio = part["compressed_bytes"] / part["bytes"] if part["bytes"] else 1
+        lines.append(f"  {part['part']:<40} {_mb(part['compressed_bytes']):>10}  "
+                     f"{_mb(part['bytes']):>10} raw  {ratio:>4.0%}"
+                     f"{'  stored' if part['stored'] else ''}")
+    flagged = [item for item in report["media"] if item["oversampled"] or not item["displayed"]]
+    if flagged:
+        lines += ["", f"Flagged media (oversampled above {report['oversampled_dpi']:.0f} DPI "
+                      "or not displayed)"]
+        for item in flagged:
+            shown = (f"{item['pixels'][0]}px wide at {item['display_inches']:.2f} in = "
+                     f"{item['dpi']} DPI" if item["dpi"] else "not displayed")
+            lines.append(f"  {item['part']:<40} {_mb(item['compressed_bytes']):>10}  {shown}")
+    for group in report["duplicate_media"]:
+        lines.append(f"  duplicate: {', '.join(group['parts'])} "
+                     f"({_mb(group['wasted_bytes'])} wasted)")
+    lines += ["", "Sections"]
+    for section in report["sections"]:
+        lines.append(f"  {section['heading'][:40]:<40} {section['paragraphs']:>7,} paragraphs "
+                     f"{section['runs']:>8,} runs {section['formatted_runs']:>8,} formatted "
+                     f"{section['direct_properties']:>8,} props {section['images']:>4} images")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    from doc_build import OUTPUT_PATH
+
+    parser = argparse.ArgumentParser(description="Report what makes a generated .docx large")
+    parser.add_argument("path", nargs="?", default=OUTPUT_PATH,
+                        help="the .docx to analyze (default: %(default)s)")
+    parser.add_argument("--json", metavar="REPORT", help="also write the report as JSON")
+    parser.add_argument("--budget", metavar="JSON",
+                        help="JSON object of report totals and their maximum; exit with 1 "
+                             "when one is exceeded")
+    parser.add_argument("--dpi", type=float, default=OVERSAMPLED_DPI,
+                        help="flag images displayed above this DPI (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    report = analyze(args.path, args.dpi)
+    print(summary(report))
+    if args.json:
+        write_atomic(args.json, json.dumps(report, indent=2).encode("utf-8"))
+    if args.budget:
+        with open(args.budget, encoding="utf-8") as f:
+            exceeded = over_budget(report, json.load(f))
+        if exceeded:
+            print("\nOver budget:\n  " + "\n  ".join(exceeded))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,487 @@
+"""Writing .docx packages: fast and byte-reproducible
+
+write_package() assembles the zip from a document's parts (docx_parts())
+instead of Document.save(), which deflates every part one after another
+at a single level. Media that is already compressed (PNG, JPEG, GIF) is
+stored as it is when deflating would not shrink it, XML parts are
+deflated at a configurable level, and large parts are compressed on a
+thread pool, since zlib releases the GIL while it works.
+
+A saved package normally differs from one build to the next even when the
+content does not: zip entries carry the time of the save, and core
+properties and relationship ids depend on how the document was put
+together. reproducible_parts() normalizes the parts so that the package's
+bytes only depend on its content:
+
+- every zip entry gets the same timestamp and attributes,
+- parts are stored in a fixed order ([Content_Types].xml, the package
+  relationships, then by name),
+- the created and modified dates in docProps/core.xml are set to the
+  build date and the revision to 1,
+- relationship ids are renumbered in order of first use in their source
+  part, followed by unreferenced relationships sorted by type and target.
+
+The build date is SOURCE_DATE_EPOCH when it is set, as in other
+reproducible builds; otherwise the modified date is set to the created
+date. Compression is still zlib's, so identical bytes also need the same
+zlib version.
+
+update_package() patches an existing package instead of writing a new
+one. It tells the unchanged entries from the part digests recorded when
+the package was written (part_digests()), so it reads only the central
+directory and decompresses nothing. Unchanged entries stay where they
+are, without being recompressed, and only the changed parts and a new
+central directory are written. Only the standard library is used.
+"""
+import hashlib
+import os
+import re
+import shutil
+import struct
+import time
+import zipfile
+import zlib
+from datetime import datetime, timezone
+from io import BytesIO
+
+from cache_keys import write_atomic
+
+CONTENT_TYPES = "[Content_Types].xml"
+PACKAGE_RELS = "_rels/.rels"
+CORE_PROPERTIES_TYPE = ("http://schemas.openxmlformats.org/package/2006/relationships/"
+                        "metadata/core-properties")
+RELATIONSHIPS_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+OFFICE_RELATIONSHIPS_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+# Earliest time a zip entry can record
+ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+
+DEFLATE_LEVEL = 6
+# Parts in these formats are usually compressed already; they are stored as
+# they are unless deflating a sample of them saves at least STORE_SAVING
+COMPRESSED_EXTENSIONS = {"png", "jpg", "jpeg", "gif"}
+STORE_SAMPLE_BYTES = 64 * 1024
+STORE_SAVING = 0.05
+# Parts at least this big are deflated on the thread pool
+PARALLEL_MIN_BYTES = 64 * 1024
+# update_package() compacts a package once the entries it no longer
+# references take up more than this share of the file
+MAX_DEAD_SHARE = 0.25
+# Linux ioctl making a file share another's blocks (FICLONE)
+_FICLONE = 0x40049409
+
+_RELATIONSHIP = re.compile(rb"<Relationship\s([^>]*?)/?>")
+_ATTRIBUTE = re.compile(rb'(\w+)="([^"]*)"')
+# Text and attribute values never hold a raw "<", so this only matches tags
+_TAG = re.compile(rb"<[^<>]+>")
+_REL_PREFIX = re.compile(rb'xmlns:(\w+)="' + re.escape(OFFICE_RELATIONSHIPS_NS.encode()) + rb'"')
+
+
+def build_date():
+    """UTC datetime of SOURCE_DATE_EPOCH, or None when it is not set"""
+    epoch = os.environ.get("SOURCE_DATE_EPOCH")
+    return datetime.fromtimestamp(int(epoch), timezone.utc) if epoch else None
+
+
+def part_compression(name, sample=b""):
+    """zipfile compression method for a part: stored if it is compressed media
+
+    sample is the start of the part's data; media that deflates well
+    anyway, such as a mostly blank JPEG thumbnail, is deflated.
+    """
+    extension = name.rpartition(".")[2].lower()
+    if extension not in COMPRESSED_EXTENSIONS:
+        return zipfile.ZIP_DEFLATED
+    sample = sample[:STORE_SAMPLE_BYTES]
+    if sample and len(zlib.compress(sample, 1)) < len(sample) * (1 - STORE_SAVING):
+        return zipfile.ZIP_DEFLATED
+    return zipfile.ZIP_STORED
+
+
+def zip_date_time(date=None):
+    """Zip timestamp for a build date; ZIP_EPOCH without one"""
+    if date is not None and date.year >= 1980:
+        return date.timetuple()[:6]
+    return ZIP_EPOCH
+
+
+def zip_info(name, date=None, sample=b"", level=DEFLATE_LEVEL):
+    """ZipInfo for name that does not depend on where it is written
+
+    Its timestamp is date's, or ZIP_EPOCH; see part_compression() for sample.
+    """
+    info = zipfile.ZipInfo(name, zip_date_time(date))
+    info.compress_type = part_compression(name, sample)
+    info._compresslevel = level  # used by ZipFile.open(info, "w"); there is no public setter
+    info.create_system = 3  # Unix, whatever the platform
+    info.external_attr = 0o600 << 16  # zipfile's default for writestr
+    return info
+
+
+def _element(tag):
+    return re.compile(rb"(<" + tag + rb"\b[^>]*>)([^<]*)(</" + tag + rb">)")
+
+
+def normalize_core_properties(xml, date=None):
+    """core.xml with build-independent dates and revision"""
+    created = _element(rb"dcterms:created").search(xml)
+    if date is not None:
+        stamp = date.strftime("%Y-%m-%dT%H:%M:%SZ").encode()
+    elif created:
+        stamp = created.group(2)
+    else:
+        stamp = None
+    if stamp is not None:
+        for tag in (rb"dcterms:created", rb"dcterms:modified"):
+            xml = _element(tag).sub(lambda m: m.group(1) + stamp + m.group(3), xml)
+    xml = _element(rb"cp:revision").sub(lambda m: m.group(1) + b"1" + m.group(3), xml)
+    return re.sub(rb"<cp:lastPrinted\b[^>]*>[^<]*</cp:lastPrinted>", b"", xml)
+
+
+def _source_part(rels_name):
+    """Name of the part a .rels part belongs to ("" for the package)"""
+    directory, _, name = rels_name.rpartition("_rels/")
+    return directory + name[:-len(".rels")]
+
+
+def _parse_relationships(xml):
+    return [dict((k.decode(), v) for k, v in _ATTRIBUTE.findall(match.group(1)))
+            for match in _RELATIONSHIP.finditer(xml)]
+
+
+def _serialize_relationships(relationships):
+    # Attribute values are copied as they were escaped in the source
+    parts = [b"<?xml version='1.0' encoding='UTF-8' standalone='yes'?>\n",
+             f'<Relationships xmlns="{RELATIONSHIPS_NS}">'.encode()]
+    for rel in relationships:
+        attributes = b" ".join(name.encode() + b'="' + value + b'"'
+                               for name, value in rel.items())
+        parts.append(b"<Relationship " + attributes + b"/>")
+    parts.append(b"</Relationships>")
+    return b"".join(parts)
+
+
+def renumber_relationships(rels_xml, source_xml):
+    """(rels_xml, source_xml) with ids renumbered in order of first use
+
+    Relationship ids are only rewritten when they are not already in that
+    order, so most parts come back unchanged.
+    """
+    relationships = _parse_relationships(rels_xml)
+    ids = {rel["Id"] for rel in relationships}
+    used = []
+    prefixes = set(_REL_PREFIX.findall(source_xml)) if source_xml is not None else ()
+    if prefixes:
+        reference = re.compile(rb"\s(?:" + b"|".join(prefixes) + rb"):\w+=\"([^\"]+)\"")
+        for tag in _TAG.finditer(source_xml):
+            for rId in reference.findall(tag.group()):
+                if rId in ids and rId not in used:
+                    used.append(rId)
+    unused = sorted((rel for rel in relationships if rel["Id"] not in used),
+                    key=lambda rel: (rel["Type"], rel["Target"]))
+    order = used + [rel["Id"] for rel in unused]
+    mapping = {old: f"rId{number}".encode() for number, old in enumerate(order, 1)}
+
+    if order == [rel["Id"] for rel in relationships] and all(
+            mapping[rId] == rId for rId in order):
+        return rels_xml, source_xml
+    by_id = {rel["Id"]: rel for rel in relationships}
+    renumbered = [dict(by_id[rId], Id=mapping[rId]) for rId in order]
+    if used:
+        def rewrite(reference_match):
+            rId = reference_match.group(1)
+            return reference_match.group(0).replace(rId, mapping.get(rId, rId))
+        source_xml = _TAG.sub(lambda tag: reference.sub(rewrite, tag.group()), source_xml)
+    return _serialize_relationships(renumbered), source_xml
+
+
+def part_order(names):
+    """Names in the order parts are written to a reproducible package"""
+    first = [name for name in (CONTENT_TYPES, PACKAGE_RELS) if name in names]
+    return first + sorted(name for name in names if name not in first)
+
+
+def core_properties_part(parts):
+    """Name of the core properties part, from the package relationships"""
+    for rel in _parse_relationships(parts.get(PACKAGE_RELS, b"")):
+        if rel["Type"].decode() == CORE_PROPERTIES_TYPE:
+            return rel["Target"].decode().lstrip("/")
+    return None
+
+
+def reproducible_parts(parts, date=None):
+    """{part name: bytes} normalized and in the order of a reproducible package"""
+    parts = dict(parts)
+    for name in [name for name in parts if name.endswith(".rels")]:
+        source_name = _source_part(name)
+        rels, source_xml = renumber_relationships(parts[name], parts.get(source_name))
+        parts[name] = rels
+        if source_xml is not None:
+            parts[source_name] = source_xml
+    core = core_properties_part(parts)
+    if core in parts:
+        parts[core] = normalize_core_properties(parts[core], date)
+    return {name: parts[name] for name in part_order(parts)}
+
+
+def reproducible_package(data, date=None, level=DEFLATE_LEVEL):
+    """Rewrite the bytes of a .docx so they only depend on its content"""
+    date = date or build_date()
+    with zipfile.ZipFile(BytesIO(data)) as source:
+        parts = {info.filename: source.read(info) for info in source.infolist()}
+    return write_package(reproducible_parts(parts, date), level, zip_date_time(date))
+
+
+def docx_parts(document):
+    """{part name: bytes} of a python-docx document, as Document.save() writes them"""
+    from docx.opc.pkgwriter import _ContentTypesItem
+
+    package = document.part.package
+    package_parts = list(package.parts)
+    for part in package_parts:
+        part.before_marshal()
+    parts = {CONTENT_TYPES: _ContentTypesItem.from_parts(package_parts).blob,
+             PACKAGE_RELS: package.rels.xml}
+    for part in package_parts:
+        parts[part.partname[1:]] = part.blob
+        if len(part.rels):
+            parts[part.partname.rels_uri[1:]] = part.rels.xml
+    return parts
+
+
+def _deflate(data, level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)  # raw deflate, as zip stores it
+    return compressor.compress(data) + compressor.flush()
+
+
+def _payloads(parts, level, max_workers=None):
+    """{name: (compression method, payload)} of the entries holding parts"""
+    methods = {name: part_compression(name, data) for name, data in parts.items()}
+    compressed = {}
+    parallel = [name for name in parts
+                if methods[name] == zipfile.ZIP_DEFLATED and len(parts[name]) >= PARALLEL_MIN_BYTES]
+    if len(parallel) > 1:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers or os.cpu_count()) as pool:
+            compressed = dict(zip(parallel, pool.map(lambda name: _deflate(parts[name], level),
+                                                     parallel)))
+    payloads = {}
+    for name, data in parts.items():
+        if methods[name] == zipfile.ZIP_DEFLATED:
+            payloads[name] = (methods[name],
+                              compressed[name] if name in compressed else _deflate(data, level))
+        else:
+            payloads[name] = (methods[name], data)
+    return payloads
+
+
+def _dos_date_time(date_time):
+    return (date_time[3] << 11 | date_time[4] << 5 | date_time[5] // 2,
+            (date_time[0] - 1980) << 9 | date_time[1] << 5 | date_time[2])
+
+
+def _entry_fields(name, data, method, payload, date_time):
+    """Header fields shared by an entry's local header and central directory record"""
+    if max(len(data), len(payload)) >= 0xFFFFFFFF:
+        raise ValueError("package too large for write_package; use the docx-stream format")
+    flags = 0x800 if not name.isascii() else 0  # UTF-8 file name
+    return (20, flags, method, *_dos_date_time(date_time), zlib.crc32(data), len(payload),
+            len(data), len(name.encode("utf-8")))
+
+
+def _write_entry(output, name, fields, payload):
+    """Write a local header and payload; returns the entry's central directory record"""
+    offset = output.tell()
+    if offset >= 0xFFFFFFFF:
+        raise ValueError("package too large for write_package; use the docx-stream format")
+    encoded = name.encode("utf-8")
+    output.write(struct.pack("<4s5H3L2H", b"PK\x03\x04", *fields, 0))
+    output.write(encoded)
+    output.write(payload)
+    return fields, offset, encoded
+
+
+def _write_directory(output, central):
+    """Write the central directory and its end record after the entries"""
+    directory_start = output.tell()
+    for fields, offset, encoded in central:
+        # Made by: Unix (3) with zip 2.0; external attributes as zip_info()
+        output.write(struct.pack("<4s6H3L5H2L", b"PK\x01\x02", 3 << 8 | 20, *fields,
+                                 0, 0, 0, 0, 0o600 << 16, offset))
+        output.write(encoded)
+    directory_size = output.tell() - directory_start
+    output.write(struct.pack("<4s4H2LH", b"PK\x05\x06", 0, 0, len(central), len(central),
+                             directory_size, directory_start, 0))
+
+
+def write_package(parts, level=DEFLATE_LEVEL, date_time=None, max_workers=None):
+    """Zip {part name: bytes} into the bytes of a package, in the given order
+
+    Compressed media is stored and the other parts are deflated at level,
+    the big ones on a thread pool of max_workers threads (default: one
+    per CPU). date_time stamps every entry; it defaults to now.
+    """
+    date_time = date_time or time.localtime()[:6]
+    output = BytesIO()
+    central = []
+    for name, (method, payload) in _payloads(parts, level, max_workers).items():
+        fields = _entry_fields(name, parts[name], method, payload, date_time)
+        central.append(_write_entry(output, name, fields, payload))
+    _write_directory(output, central)
+    return output.getvalue()
+
+
+def part_digests(parts):
+    """{part name: SHA-256} of parts, recorded with a package for update_package()"""
+    return {name: hashlib.sha256(data).hexdigest() for name, data in parts.items()}
+
+
+def _unchanged_entries(path, parts, recorded, digests):
+    """(entry names, {name: ZipInfo} of unchanged entries) of the package at path
+
+    recorded are the part digests of the package at path and digests
+    those of parts; an entry is unchanged when both digests and the size
+    match, so only the central directory is read. None if path is not a
+    package that can be updated: missing, encrypted, a ZIP64 archive, or
+    holding other entries than recorded describes.
+    """
+    try:
+        with zipfile.ZipFile(path) as package:
+            infos = package.infolist()
+    except (OSError, zipfile.BadZipFile):
+        return None
+    if sorted(info.filename for info in infos) != sorted(recorded) or any(
+            info.flag_bits & 0x1
+            or max(info.file_size, info.compress_size, info.header_offset) >= 0xFFFFFFFF
+            for info in infos):
+        return None
+    unchanged = {info.filename: info for info in infos
+                 if info.filename in parts and digests[info.filename] == recorded[info.filename]
+                 and info.file_size == len(parts[info.filename])}
+    # In the order of parts, as the central directory is written
+    unchanged = {name: unchanged[name] for name in parts if name in unchanged}
+    return [info.filename for info in infos], unchanged
+
+
+def clone_file(source, target):
+    """Copy source to target, sharing its blocks where the file system can
+
+    On file systems with reflinks (Btrfs, XFS, bcachefs) the copy is
+    copy-on-write: no data is read or written. Elsewhere the kernel
+    copies it, or the file server on NFS 4.2 and SMB, without it passing
+    through this process.
+    """
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        try:
+            import fcntl
+            fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+            return
+        except (ImportError, OSError):
+            pass
+        try:
+            remaining = os.fstat(src.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+                if not copied:
+                    break
+                remaining -= copied
+            if remaining <= 0:
+                return
+        except (AttributeError, OSError):  # not Linux, or a kernel without it
+            pass
+    shutil.copyfile(source, target)
+
+
+def _info_fields(info, flags):
+    return (info.extract_version, flags, info.compress_type, *_dos_date_time(info.date_time),
+            info.CRC, info.compress_size, info.file_size, len(info.filename.encode("utf-8")))
+
+
+def _raw_payload(f, info):
+    """An entry's payload, still compressed, read from its local header on"""
+    f.seek(info.header_offset)
+    header = f.read(30)
+    if header[:4] != b"PK\x03\x04":
+        raise zipfile.BadZipFile(f"bad local header for {info.filename}")
+    name_length, extra_length = struct.unpack("<2H", header[26:30])
+    f.seek(info.header_offset + 30 + name_length + extra_length)
+    return f.read(info.compress_size)
+
+
+def update_package(path, parts, recorded, level=DEFLATE_LEVEL, date_time=None,
+                   max_workers=None, digests=None):
+    """Update the package at path to hold parts, touching only the changed ones
+
+    recorded are the part digests of the package at path, as returned by
+    part_digests() when it was written or last updated, and digests those
+    of parts (computed when not given). Entries whose digests match stay
+    where they are, and are neither read nor decompressed. The changed
+    and new parts, then a new central directory, are appended after the
+    end of the old package, so a small change costs the compression of
+    what changed and a clone of the file (see clone_file()). The replaced
+    entries and the old directory are left behind as dead space that
+    readers skip. Once that would exceed MAX_DEAD_SHARE of the file, the
+    package is instead rewritten in the order of parts, with the
+    unchanged entries copied compressed, as they are. Either way the
+    result is written next to path and replaces it in one step, so a
+    viewer never sees a partial file. Unchanged entries keep their
+    timestamps, so an updated package is not reproducible; see
+    reproducible_parts().
+
+    Returns (unchanged, written) part counts, or None if path is not a
+    package that can be updated.
+    """
+    date_time = date_time or time.localtime()[:6]
+    digests = digests or part_digests(parts)
+    entries = _unchanged_entries(path, parts, recorded, digests)
+    if entries is None:
+        return None
+    names, unchanged = entries
+    if names == list(unchanged) == list(parts):
+        return len(unchanged), 0
+    changed = {name: data for name, data in parts.items() if name not in unchanged}
+    payloads = _payloads(changed, level, max_workers)
+
+    file_size = os.path.getsize(path)
+    kept_bytes = sum(30 + len(name.encode("utf-8")) + info.compress_size
+                     for name, info in unchanged.items())
+    added_bytes = sum(30 + len(name.encode("utf-8")) + len(payload)
+                      for name, (method, payload) in payloads.items())
+    directory_bytes = sum(46 + len(name.encode("utf-8")) for name in parts) + 22
+    total = file_size + added_bytes + directory_bytes
+    if total - (kept_bytes + added_bytes + directory_bytes) > total * MAX_DEAD_SHARE:
+        output = BytesIO()
+        central = []
+        with open(path, "rb") as f:
+            for name, data in parts.items():
+                if name in unchanged:
+                    info = unchanged[name]
+                    # Drop the data descriptor flag: sizes are in the new header
+                    fields = _info_fields(info, info.flag_bits & ~0x8)
+                    payload = _raw_payload(f, info)
+                else:
+                    method, payload = payloads[name]
+                    fields = _entry_fields(name, data, method, payload, date_time)
+                central.append(_write_entry(output, name, fields, payload))
+        _write_directory(output, central)
+        write_atomic(path, output.getvalue())
+    else:
+        central = {name: (_info_fields(info, info.flag_bits),
+                          info.header_offset, name.encode("utf-8"))
+                   for name, info in unchanged.items()}
+        # Append to a clone, so the package at path stays whole until it is replaced
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        try:
+            clone_file(path, tmp_path)
+            with open(tmp_path, "r+b") as output:
+                output.seek(0, os.SEEK_END)
+                for name, (method, payload) in payloads.items():
+                    fields = _entry_fields(name, changed[name], method, payload, date_time)
+                    central[name] = _write_entry(output, name, fields, payload)
+                _write_directory(output, [central[name] for name in parts])
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    return len(unchanged), len(changed)
@@ -0,0 +1,125 @@
+"""On-disk cache of rendered document sections
+
+A section is rendered into its own throwaway document and its body is
+stored as a fragment: the serialized body elements, the custom styles
+they reference and the bytes of every image they use. Fragments are
+keyed by a hash of everything that affects the section's output (see
+cache_keys), so unchanged sections are appended straight from the cache
+on the next run.
+"""
+import hashlib
+import json
+import os
+import weakref
+
+from docx.image.image import Image as DocxImage
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.oxml import parse_xml
+from docx.oxml.ns import qn
+from lxml import etree
+
+from cache_keys import OutputManifests, write_atomic
+
+
+class FragmentCache(OutputManifests):
+    """Store and reuse rendered section fragments under a cache directory"""
+
+    def __init__(self, cache_dir):
+        super().__init__(cache_dir)
+        self.fragment_dir = os.path.join(cache_dir, "fragments")
+        self.media_dir = os.path.join(cache_dir, "media")
+        # document part -> {media sha: rId} of the images already appended to it
+        self._image_rIds = weakref.WeakKeyDictionary()
+
+    def _fragment_path(self, key):
+        return os.path.join(self.fragment_dir, f"{key}.json")
+
+    def load(self, key):
+        """Return the cached fragment for key, or None on a miss"""
+        path = self._fragment_path(key)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            fragment = json.load(f)
+        for sha in fragment["media"].values():
+            if not os.path.exists(os.path.join(self.media_dir, sha)):
+                return None
+        return fragment
+
+    def store(self, key, doc):
+        """Extract the body of a rendered section document and cache it"""
+        os.makedirs(self.fragment_dir, exist_ok=True)
+        os.makedirs(self.media_dir, exist_ok=True)
+
+        body = doc.element.body
+        media = {}
+        for blip in body.iter(qn("a:blip")):
+            rId = blip.get(qn("r:embed"))
+            blob = doc.part.related_parts[rId].blob
+            sha = hashlib.sha256(blob).hexdigest()
+            media_path = os.path.join(self.media_dir, sha)
+            if not os.path.exists(media_path):
+                write_atomic(media_path, blob)
+            media[rId] = sha
+
+        used_styles = {el.get(qn("w:val"))
+                       for el in body.iter(qn("w:pStyle"), qn("w:rStyle"))}
+        styles = [etree.tostring(style, encoding="unicode")
+                  for style in doc.styles.element.iterchildren(qn("w:style"))
+                  if style.get(qn("w:customStyle")) == "1"
+                  and style.get(qn("w:styleId")) in used_styles]
+
+        fragment = {
+            "xml": [etree.tostring(el, encoding="unicode")
+                    for el in body if el.tag != qn("w:sectPr")],
+            "styles": styles,
+            "media": media,
+        }
+        write_atomic(self._fragment_path(key),
+                     json.dumps(fragment).encode("utf-8"))
+        return fragment
+
+    def append(self, doc, fragment):
+        """Append a fragment to the body of doc, re-linking its images"""
+        styles = doc.styles.element
+        style_ids = {style.get(qn("w:styleId")) for style in styles.iterchildren(qn("w:style"))}
+        for xml in fragment["styles"]:
+            style = parse_xml(xml)
+            if style.get(qn("w:styleId")) not in style_ids:
+                styles.append(style)
+                style_ids.add(style.get(qn("w:styleId")))
+
+        image_rIds = self._image_rIds.setdefault(doc.part, {})
+        rIds = {}
+        for old_rId, sha in fragment["media"].items():
+            if sha not in image_rIds:
+                image_rIds[sha] = self._add_image(doc, sha, len(image_rIds))
+            rIds[old_rId] = image_rIds[sha]
+
+        sectPr = doc.element.body.sectPr
+        for xml in fragment["xml"]:
+            element = parse_xml(xml)
+            for blip in element.iter(qn("a:blip")):
+                blip.set(qn("r:embed"), rIds[blip.get(qn("r:embed"))])
+            sectPr.addprevious(element)
+
+    def _add_image(self, doc, sha, appended):
+        """rId of a new image part for the cached media sha
+
+        doc.part.get_or_add_image() looks for an identical image by hashing
+        every image part in the package, for every image added. The media
+        digests already tell the images apart, so that search only runs if
+        the package has image parts other than the appended ones.
+        """
+        with open(os.path.join(self.media_dir, sha), "rb") as f:
+            image = DocxImage.from_blob(f.read())
+        image_parts = doc.part.package.image_parts
+        image_part = image_parts._get_by_sha1(image.sha1) if len(image_parts) > appended else None
+        if image_part is None:
+            image_part = image_parts._add_image_part(image)
+        return doc.part.relate_to(image_part, RT.IMAGE)
+
+    def finish(self, doc):
+        """Renumber drawing ids, which restart in every fragment"""
+        for shape_id, docPr in enumerate(doc.element.body.iter(qn("wp:docPr")), 1):
+            docPr.set("id", str(shape_id))
@@ -0,0 +1,325 @@
+"""Offline stand-in for the Gemini generateContent API
+
+ChatService posts every query without a hardcoded response to
+{gemini.api.url}?key={gemini.api.key}. Pointing gemini.api.url at this
+server instead, e.g.
+
+    gemini.api.url=http://localhost:8087/v1beta/models/gemini-pro:generateContent
+
+answers those calls from recordings, so examples and load tests run
+without a key or the network, at full speed and reproducibly.
+
+Recordings are one JSON object per line (gzip-compressed when the path
+ends in .gz), keyed by a hash of the model and the canonical request
+body, and loaded into memory at start. A request without a recording is
+answered with a synthesized text ("synthesize"), a 404 ("error"), or,
+with --upstream, forwarded to the real API and recorded for next time.
+Latency is drawn from a distribution (see Latency), and a share of
+requests can fail with the errors the real API returns under load.
+Every exchange can be appended to a JSONL log.
+
+    python gemini_stub.py --latency lognormal:0.8,0.4 --error-rate 0.02 --seed 1
+    python gemini_stub.py --upstream https://generativelanguage.googleapis.com   records misses
+"""
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import math
+import os
+import random
+import socket
+import sys
+import time
+import urllib.error
+import urllib.request
+from urllib.parse import parse_qs, urlsplit
+
+import http_server
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PORT = 8087
+DEFAULT_MODEL = "gemini-pro"
+RECORDINGS_PATH = os.path.join(ROOT, "gemini_recordings.jsonl.gz")
+UPSTREAM_TIMEOUT = 60
+
+# Errors injected by --error-rate, in proportion to these weights
+ERROR_WEIGHTS = {429: 0.6, 503: 0.3, 500: 0.1}
+ERROR_STATUS = {400: "INVALID_ARGUMENT", 404: "NOT_FOUND", 429: "RESOURCE_EXHAUSTED",
+                500: "INTERNAL", 502: "UNAVAILABLE", 503: "UNAVAILABLE",
+                504: "DEADLINE_EXCEEDED"}
+MISS_MODES = ("synthesize", "error")
+
+
+def chat_request(message):
+    """generateContent request body ChatService sends for message"""
+    return {"contents": [{"parts": [{"text": message}]}]}
+
+
+def request_key(model, body):
+    """Hash a recording is stored under: the model and the canonical request body"""
+    canonical = json.dumps(body, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(f"{model}\n{canonical}".encode("utf-8")).hexdigest()[:32]
+
+
+def prompt_text(body):
+    """The text parts of a request's last turn"""
+    contents = body.get("contents") or [{}]
+    return "".join(part.get("text", "") for part in contents[-1].get("parts", ()))
+
+
+def response_text(payload):
+    """The text of a generateContent response's first candidate, as ChatService extracts it"""
+    try:
+        parts = payload["candidates"][0]["content"]["parts"]
+    except (KeyError, IndexError, TypeError):
+        return None
+    return "".join(part.get("text", "") for part in parts)
+
+
+def text_response(text):
+    """A generateContent response with text as its only candidate"""
+    return {"candidates": [{"content": {"parts": [{"text": text}], "role": "model"},
+                            "finishReason": "STOP", "index": 0}]}
+
+
+def error_response(code, message):
+    status = ERROR_STATUS.get(code, "UNKNOWN")
+    return {"error": {"code": code, "message": message, "status": status}}
+
+
+class Latency:
+    """A latency distribution in seconds, from a spec
+
+        0.2 or fixed:0.2        always 0.2
+        uniform:0.1,0.5         uniformly between the two
+        jitter:0.2,0.25         0.2 +/- 25%
+        normal:0.5,0.1          mean and standard deviation, never below 0
+        lognormal:0.8,0.4       median and sigma of the log, a long tail like real calls
+        recorded                the latency measured when the response was recorded
+    """
+
+    def __init__(self, spec="0"):
+        self.spec = str(spec)
+        kind, _, params = self.spec.partition(":")
+        if not params and kind not in ("recorded",):
+            kind, params = "fixed", kind
+        self.kind = kind
+        self.params = [float(value) for value in params.split(",")] if params else []
+        expected = {"fixed": 1, "uniform": 2, "jitter": 2, "normal": 2, "lognormal": 2,
+                    "recorded": 0}
+        if expected.get(kind) != len(self.params):
+            raise ValueError(f"invalid latency spec {self.spec!r}")
+
+    def sample(self, rng, recorded=None):
+        kind, params = self.kind, self.params
+        if kind == "fixed":
+            return params[0]
+        if kind == "uniform":
+            return rng.uniform(*params)
+        if kind == "jitter":
+            return max(0.0, params[0] * (1 + rng.uniform(-params[1], params[1])))
+        if kind == "normal":
+            return max(0.0, rng.gauss(*params))
+        if kind == "lognormal":
+            return params[0] * math.exp(rng.gauss(0, params[1]))
+        return recorded or 0.0
+
+
+class RecordingStore:
+    """Recorded responses by request key, in a JSONL file"""
+
+    def __init__(self, path=RECORDINGS_PATH):
+        self.path = path
+        self.records = {}
+        if path and os.path.exists(path):
+            with self._open("rt") as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        self.records[record["key"]] = record
+
+    def _open(self, mode):
+        if self.path.endswith(".gz"):
+            return gzip.open(self.path, mode, encoding="utf-8")
+        return open(self.path, mode, encoding="utf-8")
+
+    def get(self, key):
+        return self.records.get(key)
+
+    def add(self, record):
+        """Store a record and append it to the file; a gzip file gains a member"""
+        self.records[record["key"]] = record
+        if self.path:
+            with self._open("at") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+class GeminiStub:
+    """Answers generateContent requests from recordings, with injected latency and errors"""
+
+    def __init__(self, store=None, latency=None, error_rate=0.0, miss="synthesize",
+                 upstream=None, api_key=None, seed=None, log_path=None):
+        if miss not in MISS_MODES:
+            raise ValueError(f"miss must be one of {MISS_MODES}")
+        self.store = store if store is not None else RecordingStore(None)
+        self.latency = latency or Latency()
+        self.error_rate = error_rate
+        self.miss = miss
+        self.upstream = upstream.rstrip("/") if upstream else None
+        self.api_key = api_key or os.environ.get("GEMINI_API_KEY")
+        self.rng = random.Random(seed)
+        self.log_path = log_path
+        self.counts = {"replayed": 0, "recorded": 0, "synthesized": 0, "missed": 0,
+                       "injected_errors": 0, "upstream_errors": 0}
+
+    async def generate(self, model, body, api_key=None):
+        """(status, response payload) for a generateContent request"""
+        start = time.perf_counter()
+        if self.error_rate and self.rng.random() < self.error_rate:
+            code = self.rng.choices(list(ERROR_WEIGHTS), list(ERROR_WEIGHTS.values()))[0]
+            self.counts["injected_errors"] += 1
+            await asyncio.sleep(self.latency.sample(self.rng) / 4)
+            status, payload = code, error_response(code, "Injected by gemini_stub")
+        else:
+            status, payload = await self._answer(model, body, api_key)
+        self._log(model, body, status, payload, time.perf_counter() - start)
+        return status, payload
+
+    async def _answer(self, model, body, api_key):
+        key = request_key(model, body)
+        record = self.store.get(key)
+        if record is not None:
+            self.counts["replayed"] += 1
+            await asyncio.sleep(self.latency.sample(self.rng, record.get("latency_ms", 0) / 1000))
+            return record["status"], record["response"]
+        if self.upstream:
+            start = time.perf_counter()
+            status, payload = await asyncio.get_running_loop().run_in_executor(
+                None, self._forward, model, body, api_key or self.api_key)
+            # Errors such as quota or outages are passed on but not replayed later
+            if 200 <= status < 300:
+                self.store.add({"key": key, "model": model, "prompt": prompt_text(body),
+                                "status": status, "response": payload,
+                                "latency_ms": round((time.perf_counter() - start) * 1000)})
+                self.counts["recorded"] += 1
+            else:
+                self.counts["upstream_errors"] += 1
+            return status, payload
+        if self.miss == "synthesize":
+            self.counts["synthesized"] += 1
+            await asyncio.sleep(self.latency.sample(self.rng))
+            return 200, text_response(f"(simulated Gemini answer to: {prompt_text(body)})")
+        self.counts["missed"] += 1
+        return 404, error_response(404, f"No recording for request {key}")
+
+    def _forward(self, model, body, api_key):
+        """(status, payload) of the upstream API; 504 on a timeout, 502 if it
+        cannot be reached or does not answer in JSON"""
+        request = urllib.request.Request(
+            f"{self.upstream}/v1beta/models/{model}:generateContent?key={api_key or ''}",
+            json.dumps(body).encode("utf-8"), {"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=UPSTREAM_TIMEOUT) as response:
+                return response.status, json.load(response)
+        except urllib.error.HTTPError as e:
+            try:
+                return e.code, json.load(e)
+            except ValueError:
+                return e.code, error_response(e.code, e.reason)
+        except (TimeoutError, socket.timeout) as e:
+            return 504, error_response(504, f"Upstream timed out: {e}")
+        except urllib.error.URLError as e:
+            if isinstance(e.reason, (TimeoutError, socket.timeout)):
+                return 504, error_response(504, f"Upstream timed out: {e.reason}")
+            return 502, error_response(502, f"Upstream unreachable: {e.reason}")
+        except (OSError, ValueError) as e:
+            return 502, error_response(502, f"Bad upstream response: {e}")
+
+    def _log(self, model, body, status, payload, seconds):
+        if not self.log_path:
+            return
+        entry = {"time": round(time.time(), 3), "model": model, "prompt": prompt_text(body),
+                 "status": status, "response": response_text(payload),
+                 "latency_ms": round(seconds * 1000, 1)}
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def _model(path):
+    """Model name of a .../models/{model}:generateContent path, or None"""
+    prefix, _, method = path.rpartition(":")
+    if method != "generateContent" or "/models/" not in prefix:
+        return None
+    return prefix.rsplit("/models/", 1)[1]
+
+
+async def _handle(stub, request):
+    method, target, headers, body = request
+    url = urlsplit(target)
+    if url.path == "/stats":
+        return 200, {**stub.counts, "recordings": len(stub.store.records)}
+    model = _model(url.path)
+    if model is None:
+        return 404, error_response(404, f"Unknown path {url.path}")
+    if method != "POST":
+        return 405, error_response(405, "generateContent takes POST")
+    try:
+        request_body = json.loads(body or b"null")
+    except ValueError:
+        request_body = None
+    if not isinstance(request_body, dict) or not isinstance(request_body.get("contents"), list):
+        return 400, error_response(400, "Request must be a JSON object with contents")
+    api_key = (parse_qs(url.query).get("key") or [headers.get("x-goog-api-key")])[0]
+    return await stub.generate(model, request_body, api_key)
+
+
+def serve(stub, host="127.0.0.1", port=DEFAULT_PORT):
+    """Coroutine returning a started asyncio server; port 0 picks a free port"""
+    async def handle(request):
+        status, payload = await _handle(stub, request)
+        return http_server.json_response(status, payload, "application/json; charset=UTF-8",
+                                         ensure_ascii=False)
+
+    return http_server.serve(handle, host, port, backlog=1024)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve recorded Gemini generateContent responses")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--recordings", default=RECORDINGS_PATH,
+                        help="JSONL recordings, .gz for gzip (default: %(default)s)")
+    parser.add_argument("--latency", default="recorded",
+                        help="latency distribution, see gemini_stub.Latency (default: %(default)s)")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="share of requests failed with 429/503/500 (default: %(default)s)")
+    parser.add_argument("--miss", choices=MISS_MODES, default="synthesize",
+                        help="answer to requests without a recording (default: %(default)s)")
+    parser.add_argument("--upstream", help="forward requests without a recording to this API "
+                                           "and record the answers (key: ?key= or GEMINI_API_KEY)")
+    parser.add_argument("--seed", type=int, help="seed latency and errors for repeatable runs")
+    parser.add_argument("--log", help="append every exchange to this JSONL file")
+    args = parser.parse_args(argv)
+
+    stub = GeminiStub(RecordingStore(args.recordings), Latency(args.latency), args.error_rate,
+                      args.miss, args.upstream, seed=args.seed, log_path=args.log)
+
+    async def run():
+        server = await serve(stub, args.host, args.port)
+        port = server.sockets[0].getsockname()[1]
+        print(f"Gemini stub with {len(stub.store.records)} recordings listening on "
+              f"http://{args.host}:{port}/v1beta/models/{DEFAULT_MODEL}:generateContent")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
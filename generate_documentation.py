@@ -1,658 +1,270 @@
-from docx import Document
 from docx.shared import Inches, Pt, RGBColor
 from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
 import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from itertools import repeat
+
+import doc_profile
+from cache_keys import OutputManifests, write_atomic
+from doc_build import (CACHE_DIR, OUTPUT_PATH, create_project_documentation, default_options,
+                       main, section_keys)
+from doc_content import HEADING_COLOR
+from doc_model import (CHAT_SPEAKERS, DEFAULT_THEME, BulletList, ChatTranscript, CodeBlock,
+                       DefinitionList, Heading, Image, PageBreak, Paragraph, Table)
+from doc_template import base_document
+from doc_styles import (add_paragraphs, add_styled_paragraph, add_styled_paragraphs,
+                        add_styled_run, add_styled_runs, add_table_from_rows, chat_bubble_style,
+                        chat_note_style, code_block_style, code_label_style,
+                        code_line_number_style, code_listing_style, code_token_style,
+                        heading_style, named_style)
+from docx_package import (build_date, docx_parts, part_digests, reproducible_parts,
+                          update_package, write_package, zip_date_time)
+from fragment_cache import FragmentCache
+from image_pipeline import prepare_image
+from syntax_highlight import code_language, highlight, highlight_lines
+
+# Stale sections are rendered in worker processes once they have this many
+# blocks between them; for fewer, starting the workers costs more than it saves
+PARALLEL_MIN_BLOCKS = 200
+
+# Code blocks with more lines than this are added a paragraph per line
+LISTING_MIN_LINES = 100
+
+def add_heading_with_color(doc, text, level=1, color=HEADING_COLOR, size=None, theme=DEFAULT_THEME):
+    """Add a heading using the registered style for its level and color"""
+    return add_styled_paragraph(doc, text, heading_style(doc, level, color, size, theme))
+
+def add_code_block(doc, code, language="", theme=DEFAULT_THEME, syntax="", line_numbers=False,
+                   first_line=1):
+    """Add a code block with gray background
+
+    Font, size and shading come from the CodeBlock paragraph style and the
+    label's formatting from the CodeLabel character style. Code in a
+    syntax language is split into runs styled per token class. Blocks with
+    line numbers or more than LISTING_MIN_LINES lines are added as a
+    listing, see add_code_listing().
+    """
+    if line_numbers or code.count("\n") >= LISTING_MIN_LINES:
+        return add_code_listing(doc, code, language, theme, syntax, line_numbers, first_line)
+    paragraph = add_styled_paragraph(doc, style=code_block_style(doc, theme))
 
-def add_heading_with_color(doc, text, level=1, color=(0, 102, 204)):
-    """Add a colored heading to the document"""
-    heading = doc.add_heading(text, level=level)
-    for run in heading.runs:
-        run.font.color.rgb = RGBColor(*color)
-    return heading
-
-def add_code_block(doc, code, language=""):
-    """Add a code block with gray background"""
-    paragraph = doc.add_paragraph()
-    paragraph.style = 'Normal'
-    
     # Add language label if provided
     if language:
-        run = paragraph.add_run(f"{language}\n")
-        run.font.size = Pt(9)
-        run.font.color.rgb = RGBColor(100, 100, 100)
-        run.italic = True
-    
+        add_styled_run(paragraph, f"{language}\n", code_label_style(doc, theme))
+
     # Add code content
-    run = paragraph.add_run(code)
-    run.font.name = 'Courier New'
-    run.font.size = Pt(9)
-    
-    # Set paragraph shading (background color)
-    shading_elm = OxmlElement('w:shd')
-    shading_elm.set(qn('w:fill'), 'F0F0F0')
-    paragraph._element.get_or_add_pPr().append(shading_elm)
-    
+    add_styled_runs(paragraph, [(span, code_token_style(doc, token, theme) if token else None)
+                                for span, token in highlight(code, syntax)])
+
     return paragraph
 
-def create_project_documentation():
-    """Create comprehensive Word document for the Spring Boot Chatbot project"""
-    
-    # Create document
-    doc = Document()
-    
-    # Set document margins
-    sections = doc.sections
-    for section in sections:
-        section.top_margin = Inches(1)
-        section.bottom_margin = Inches(1)
-        section.left_margin = Inches(1)
-        section.right_margin = Inches(1)
-    
-    # ===== TITLE PAGE =====
-    title = doc.add_heading('Spring Boot Chatbot Application', 0)
-    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    for run in title.runs:
-        run.font.color.rgb = RGBColor(0, 102, 204)
-        run.font.size = Pt(28)
-    
-    subtitle = doc.add_paragraph('Web-Based AI Assistant with Gemini API Integration')
-    subtitle.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    subtitle_run = subtitle.runs[0]
-    subtitle_run.font.size = Pt(16)
-    subtitle_run.font.color.rgb = RGBColor(100, 100, 100)
-    
-    doc.add_paragraph()
-    doc.add_paragraph()
-    
-    # Project metadata
-    metadata = doc.add_paragraph()
-    metadata.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    metadata_text = """
-Project Type: Full-Stack Web Application
-Technology Stack: Spring Boot, Java 17, Maven
-API Integration: Google Gemini Pro
-Frontend: HTML5, CSS3, JavaScript
-Deployment: Run with Maven or packaged JAR
-    """
-    metadata.add_run(metadata_text).font.size = Pt(11)
-    
-    doc.add_page_break()
-    
-    # ===== TABLE OF CONTENTS =====
-    add_heading_with_color(doc, 'Table of Contents', 1, (0, 102, 204))
-    toc_items = [
-        "1. Project Overview",
-        "2. Technology Stack",
-        "3. Project Architecture",
-        "4. Key Features",
-        "5. Project Structure",
-        "6. Source Code Explanation",
-        "   6.1 Main Application Class",
-        "   6.2 Controller Layer",
-        "   6.3 Service Layer",
-        "   6.4 Model Classes",
-        "   6.5 Frontend (HTML/CSS/JavaScript)",
-        
-        "8. Application Screenshots",
-        "9. Setup and Installation",
-        "10. Testing the Application",
-        "11. Conclusion"
-    ]
-    for item in toc_items:
-        doc.add_paragraph(item, style='List Bullet')
-    
-    doc.add_page_break()
-    
-    # ===== 1. PROJECT OVERVIEW =====
-    add_heading_with_color(doc, '1. Project Overview', 1, (0, 102, 204))
-    
-    doc.add_paragraph(
-        "This project is a modern, full-stack web-based chatbot application built using Spring Boot framework. "
-        "It demonstrates the integration of a backend REST API with Google's Gemini Pro AI model to create an "
-        "intelligent conversational assistant."
-    )
-    
-    doc.add_paragraph(
-        "The application showcases several important software development concepts:"
-    )
-    
-    features_list = [
-        "RESTful API design and implementation",
-        "Integration with third-party APIs (Google Gemini)",
-        "Layered architecture (Controller → Service → Model)",
-        "Responsive web interface with modern UI/UX",
-        "Runnable as a packaged JAR or via Maven",
-        "Maven-based project management",
-        "Hardcoded fallback responses for offline testing"
-    ]
-    
-    for feature in features_list:
-        doc.add_paragraph(feature, style='List Bullet')
-    
-    # ===== 2. TECHNOLOGY STACK =====
-    add_heading_with_color(doc, '2. Technology Stack', 1, (0, 102, 204))
-    
-    add_heading_with_color(doc, 'Backend Technologies', 2, (0, 153, 76))
-    backend_tech = [
-        "Java 17 - Programming language",
-        "Spring Boot 3.2.0 - Application framework",
-        "Spring Web - RESTful web services",
-        "Spring WebFlux - Reactive HTTP client for API calls",
-        "Thymeleaf - Server-side template engine",
-        "Maven - Build automation and dependency management"
-    ]
-    for tech in backend_tech:
-        doc.add_paragraph(tech, style='List Bullet')
-    
-    add_heading_with_color(doc, 'Frontend Technologies', 2, (0, 153, 76))
-    frontend_tech = [
-        "HTML5 - Structure and markup",
-        "CSS3 - Styling with modern design patterns",
-        "JavaScript (ES6+) - Client-side interactivity",
-        "Font Awesome - Icon library",
-        "Google Fonts (Outfit) - Typography"
-    ]
-    for tech in frontend_tech:
-        doc.add_paragraph(tech, style='List Bullet')
-    
-    add_heading_with_color(doc, 'DevOps & Deployment', 2, (0, 153, 76))
-    devops_tech = [
-        "Maven - Build and lifecycle management",
-        "CI/CD (recommended) - Automated builds and tests",
-        "Health checks - Application monitoring",
-        "Artifact packaging - JAR distribution"
-    ]
-    for tech in devops_tech:
-        doc.add_paragraph(tech, style='List Bullet')
-    
-    doc.add_page_break()
-    
-    # ===== 3. PROJECT ARCHITECTURE =====
-    add_heading_with_color(doc, '3. Project Architecture', 1, (0, 102, 204))
-    
-    doc.add_paragraph(
-        "The application follows a layered architecture pattern, separating concerns into distinct layers:"
-    )
-    
-    add_heading_with_color(doc, 'Architecture Layers', 2, (0, 153, 76))
-    
-    architecture_desc = """
-1. Presentation Layer (Frontend)
-   - HTML/CSS/JavaScript interface
-   - Handles user interactions
-   - Sends AJAX requests to backend API
-   - Displays chat messages dynamically
-
-2. Controller Layer
-   - ChatController.java
-   - Handles HTTP requests (GET, POST)
-   - Routes requests to appropriate services
-   - Returns JSON responses
-
-3. Service Layer
-   - ChatService.java
-   - Contains business logic
-   - Manages API integration with Gemini
-   - Provides hardcoded responses for testing
-   - Handles error scenarios
-
-4. Model Layer
-   - ChatRequest.java - Request data structure
-   - ChatResponse.java - Response data structure
-   - POJOs (Plain Old Java Objects)
-
-5. External Integration
-   - Google Gemini Pro API
-   - WebClient for reactive HTTP calls
-   - JSON request/response handling
+def add_code_listing(doc, code, language="", theme=DEFAULT_THEME, syntax="", line_numbers=True,
+                     first_line=1):
+    """Add a code block as one CodeListing paragraph per line
+
+    A block holding all its lines in one paragraph is slow for Word to lay
+    out and can only break across pages as a whole; a paragraph per line
+    lets Word paginate a listing of thousands of lines like any text. Line
+    numbers start at first_line and are right-aligned in CodeLineNumber
+    runs. Returns the number of paragraphs added.
     """
-    doc.add_paragraph(architecture_desc)
-    
-    doc.add_page_break()
-    
-    # ===== 4. KEY FEATURES =====
-    add_heading_with_color(doc, '4. Key Features', 1, (0, 102, 204))
-    
-    features = {
-        "🤖 AI-Powered Responses": "Integration with Google Gemini Pro for intelligent conversations",
-        "💬 Real-time Chat Interface": "Modern, responsive chat UI with message bubbles and avatars",
-        "🎨 Theme Toggle": "Dark/Light mode support with persistent preferences",
-        "📝 Hardcoded Responses": "Fallback responses for common queries (DevOps, Maven, Spring Boot)",
-        "🔄 Loading Indicators": "Visual feedback during API calls with typing animation",
-        "🗑️ Clear Chat": "Ability to clear conversation history",
-        "⌨️ Keyboard Shortcuts": "Ctrl+K (focus input), Ctrl+L (clear chat), Ctrl+Shift+T (toggle theme)",
-        "📦 Packaging": "Runnable as a packaged JAR and suitable for CI/CD pipelines",
-        "❤️ Health Checks": "Container health monitoring for production deployments",
-        "📱 Responsive Design": "Works seamlessly on desktop and mobile devices"
-    }
-    
-    for feature_name, feature_desc in features.items():
-        p = doc.add_paragraph()
-        p.add_run(f"{feature_name}: ").bold = True
-        p.add_run(feature_desc)
-    
-    doc.add_page_break()
-    
-    # ===== 5. PROJECT STRUCTURE =====
-    add_heading_with_color(doc, '5. Project Structure', 1, (0, 102, 204))
-    
-    project_structure = """
-chatbot/
-├── src/
-│   ├── main/
-│   │   ├── java/com/example/chatbot/
-│   │   │   ├── ChatbotApplication.java      # Main Spring Boot application
-│   │   │   ├── controller/
-│   │   │   │   └── ChatController.java      # REST API endpoints
-│   │   │   ├── service/
-│   │   │   │   └── ChatService.java         # Business logic & API integration
-│   │   │   └── model/
-│   │   │       ├── ChatRequest.java         # Request model
-│   │   │       └── ChatResponse.java        # Response model
-│   │   └── resources/
-│   │       ├── application.properties       # Configuration
-│   │       ├── templates/
-│   │       │   └── index.html              # Main HTML page
-│   │       └── static/
-│   │           └── style.css               # Stylesheet
-│   └── test/                               # Unit tests
-└── pom.xml                                 # Maven dependencies
+    listing = code_listing_style(doc, theme)
+    number_style = code_line_number_style(doc, theme)
+    token_styles = {}
+
+    def token_style(token):
+        if token not in token_styles:
+            token_styles[token] = code_token_style(doc, token, theme) if token else None
+        return token_styles[token]
+
+    lines = highlight_lines(code, syntax)
+    width = len(str(first_line + len(lines) - 1))
+    paragraphs = [[(language, code_label_style(doc, theme))]] if language else []
+    for number, spans in enumerate(lines, first_line):
+        runs = [(f"{number:>{width}}  ", number_style)] if line_numbers else []
+        runs.extend((span, token_style(token)) for span, token in spans)
+        paragraphs.append(runs)
+    return add_styled_paragraphs(doc, paragraphs, listing)
+
+def add_chat_transcript(doc, turns, theme=DEFAULT_THEME):
+    """Add a conversation as chat bubbles
+
+    Each turn is a ChatUser or ChatBot paragraph opened by a ChatNote line
+    with the speaker and the turn's note; the paragraphs are added in
+    batches like listing lines. Returns the number of paragraphs added.
     """
-    add_code_block(doc, project_structure, "Project Directory Structure")
-    
-    doc.add_page_break()
-    
-    # ===== 6. SOURCE CODE EXPLANATION =====
-    add_heading_with_color(doc, '6. Source Code Explanation', 1, (0, 102, 204))
-    
-    # 6.1 Main Application
-    add_heading_with_color(doc, '6.1 Main Application Class', 2, (0, 153, 76))
-    doc.add_paragraph(
-        "The ChatbotApplication.java is the entry point of the Spring Boot application. "
-        "It uses the @SpringBootApplication annotation which combines @Configuration, "
-        "@EnableAutoConfiguration, and @ComponentScan."
-    )
-    
-    main_app_code = """package com.example.chatbot;
-
-import org.springframework.boot.SpringApplication;
-import org.springframework.boot.autoconfigure.SpringBootApplication;
-
-@SpringBootApplication
-public class ChatbotApplication {
-    public static void main(String[] args) {
-        SpringApplication.run(ChatbotApplication.class, args);
-    }
-}"""
-    add_code_block(doc, main_app_code, "ChatbotApplication.java")
-    
-    # 6.2 Controller Layer
-    add_heading_with_color(doc, '6.2 Controller Layer', 2, (0, 153, 76))
-    doc.add_paragraph(
-        "The ChatController handles HTTP requests. It has two main endpoints:"
-    )
-    doc.add_paragraph("• GET / - Serves the main HTML page", style='List Bullet')
-    doc.add_paragraph("• POST /api/chat - Handles chat messages and returns JSON responses", style='List Bullet')
-    
-    controller_code = """@Controller
-public class ChatController {
-    private final ChatService chatService;
-
-    @Autowired
-    public ChatController(ChatService chatService) {
-        this.chatService = chatService;
-    }
-
-    @GetMapping("/")
-    public String index() {
-        return "index";  // Returns index.html template
-    }
-
-    @PostMapping("/api/chat")
-    @ResponseBody
-    public ResponseEntity<ChatResponse> chat(@RequestBody ChatRequest request) {
-        if (request == null || request.getMessage() == null || 
-            request.getMessage().trim().isEmpty()) {
-            return ResponseEntity.badRequest()
-                .body(new ChatResponse("Please provide a valid message."));
-        }
-
-        ChatResponse response = chatService.getChatResponse(request.getMessage());
-        return ResponseEntity.ok(response);
-    }
-}"""
-    add_code_block(doc, controller_code, "ChatController.java (Key Methods)")
-    
-    doc.add_page_break()
-    
-    # 6.3 Service Layer
-    add_heading_with_color(doc, '6.3 Service Layer', 2, (0, 153, 76))
-    doc.add_paragraph(
-        "The ChatService contains the core business logic. It first checks for hardcoded responses "
-        "for common queries (like 'hello', 'what is devops?'), and if no match is found, it calls "
-        "the Gemini API using Spring WebFlux's WebClient."
-    )
-    
-    service_code = """@Service
-public class ChatService {
-    @Value("${gemini.api.key}")
-    private String apiKey;
-
-    @Value("${gemini.api.url}")
-    private String apiUrl;
-
-    private final WebClient webClient;
-
-    public ChatResponse getChatResponse(String message) {
-        try {
-            // Check for hardcoded responses first
-            String response = getHardcodedResponse(message);
-            if (response != null) {
-                return new ChatResponse(response);
-            }
-
-            // Prepare Gemini API request
-            Map<String, Object> requestBody = new HashMap<>();
-            // ... build request structure ...
-
-            // Make API call
-            String fullUrl = apiUrl + "?key=" + apiKey;
-            Map<String, Object> apiResponse = webClient.post()
-                .uri(fullUrl)
-                .bodyValue(requestBody)
-                .retrieve()
-                .bodyToMono(Map.class)
-                .block();
-
-            String responseText = extractResponseText(apiResponse);
-            return new ChatResponse(responseText);
-
-        } catch (Exception e) {
-            return new ChatResponse("Error: " + e.getMessage());
-        }
-    }
-
-    private String getHardcodedResponse(String message) {
-        String lowerMessage = message.toLowerCase().trim();
-        
-        if (lowerMessage.equals("hello") || lowerMessage.equals("hi")) {
-            return "Hello! 👋 Welcome to the Web-Based Chatbot.";
-        }
-        
-        if (lowerMessage.contains("what is devops")) {
-            return "DevOps is a set of practices that combines software " +
-                   "development (Dev) and IT operations (Ops)...";
-        }
-        
-        // ... more hardcoded responses ...
-        return null;  // No match found
-    }
-}"""
-    add_code_block(doc, service_code, "ChatService.java (Simplified)")
-    
-    doc.add_page_break()
-    
-    # 6.4 Model Classes
-    add_heading_with_color(doc, '6.4 Model Classes', 2, (0, 153, 76))
-    doc.add_paragraph("Simple POJOs (Plain Old Java Objects) for request and response data:")
-    
-    model_code = """// ChatRequest.java
-public class ChatRequest {
-    private String message;
-
-    public String getMessage() { return message; }
-    public void setMessage(String message) { this.message = message; }
-}
-
-// ChatResponse.java
-public class ChatResponse {
-    private String response;
-
-    public ChatResponse(String response) {
-        this.response = response;
-    }
-
-    public String getResponse() { return response; }
-    public void setResponse(String response) { this.response = response; }
-}"""
-    add_code_block(doc, model_code, "Model Classes")
-    
-    # 6.5 Frontend
-    add_heading_with_color(doc, '6.5 Frontend (HTML/CSS/JavaScript)', 2, (0, 153, 76))
-    doc.add_paragraph(
-        "The frontend consists of a modern, responsive chat interface with:"
-    )
-    frontend_features = [
-        "Sidebar navigation with logo and user profile",
-        "Chat message area with scrollable message history",
-        "Input field with send button",
-        "Theme toggle (dark/light mode)",
-        "Clear chat functionality",
-        "Loading animations and typing indicators",
-        "Keyboard shortcuts for better UX"
-    ]
-    for feature in frontend_features:
-        doc.add_paragraph(feature, style='List Bullet')
-    
-    frontend_code = """// JavaScript - Sending a chat message
-chatForm.addEventListener('submit', async (e) => {
-    e.preventDefault();
-    
-    const message = messageInput.value.trim();
-    if (!message) return;
-
-    // Add user message to UI
-    addMessage(message, 'user');
-    messageInput.value = '';
-    
-    // Show loading indicator
-    const loadingId = addLoadingBubble();
-
-    try {
-        // Send POST request to backend
-        const response = await fetch('/api/chat', {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ message: message })
-        });
-
-        const data = await response.json();
-        
-        // Remove loading and show bot response
-        document.getElementById(loadingId)?.remove();
-        addMessage(data.response, 'bot');
-    } catch (error) {
-        document.getElementById(loadingId)?.remove();
-        addMessage('Sorry, something went wrong.', 'bot', true);
-    }
-});"""
-    add_code_block(doc, frontend_code, "JavaScript - Chat Functionality")
-    
-    doc.add_page_break()
-    
-    # Docker/containerization content removed — project runs via Maven/JAR
-    doc.add_page_break()
-    
-    # ===== 8. APPLICATION SCREENSHOTS =====
-    add_heading_with_color(doc, '8. Application Screenshots', 1, (0, 102, 204))
-    
-    doc.add_paragraph(
-        "Below are screenshots demonstrating the application in action:"
-    )
-    
-    # Screenshot 1: Initial Page
-    add_heading_with_color(doc, '8.1 Initial Landing Page', 2, (0, 153, 76))
-    doc.add_paragraph(
-        "The chatbot interface when first loaded, showing the welcome message and modern UI design:"
-    )
-    
-    screenshot1_path = r"C:\Users\perfe\.gemini\antigravity\brain\cf9f5b8e-ded6-4744-93b9-01c32dbf4741\initial_page_1765960804340.png"
-    if os.path.exists(screenshot1_path):
-        try:
-            doc.add_picture(screenshot1_path, width=Inches(6))
-            last_paragraph = doc.paragraphs[-1]
-            last_paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        except Exception as e:
-            doc.add_paragraph(f"[Screenshot could not be embedded: {e}]")
-    
-    doc.add_page_break()
-    
-    # Screenshot 2: Hello Response
-    add_heading_with_color(doc, '8.2 Greeting Interaction', 2, (0, 153, 76))
-    doc.add_paragraph(
-        "User sends 'hello' and receives a friendly hardcoded response from the chatbot:"
-    )
-    
-    screenshot2_path = r"C:\Users\perfe\.gemini\antigravity\brain\cf9f5b8e-ded6-4744-93b9-01c32dbf4741\hello_response_1765960825723.png"
-    if os.path.exists(screenshot2_path):
+    note_style = chat_note_style(doc, theme)
+    styles = {role: chat_bubble_style(doc, role, theme) for role in ("user", "bot")}
+    paragraphs = []
+    for role, text, note in turns:
+        speaker = f"{CHAT_SPEAKERS[role]}  {note}".rstrip()
+        paragraphs.append((styles[role], [(speaker, note_style), (f"\n{text}", None)]))
+    return add_paragraphs(doc, paragraphs)
+
+def add_screenshot(doc, path, width_inches=6, options=None):
+    """Add a centered screenshot, downscaled to its display size, if the image file exists"""
+    options = options or default_options()
+    if os.path.exists(path):
         try:
-            doc.add_picture(screenshot2_path, width=Inches(6))
+            image_path = prepare_image(path, os.path.join(options["cache_dir"], "images"),
+                                       width_inches, options["image_dpi"], options["image_format"])
+            doc.add_picture(image_path, width=Inches(width_inches))
             last_paragraph = doc.paragraphs[-1]
             last_paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
         except Exception as e:
             doc.add_paragraph(f"[Screenshot could not be embedded: {e}]")
-    
-    doc.add_page_break()
-    
-    # Screenshot 3: DevOps Question
-    add_heading_with_color(doc, '8.3 Technical Question Response', 2, (0, 153, 76))
-    doc.add_paragraph(
-        "User asks 'what is devops?' and receives a detailed, informative response:"
-    )
-    
-    screenshot3_path = r"C:\Users\perfe\.gemini\antigravity\brain\cf9f5b8e-ded6-4744-93b9-01c32dbf4741\devops_response_1765960846652.png"
-    if os.path.exists(screenshot3_path):
-        try:
-            doc.add_picture(screenshot3_path, width=Inches(6))
-            last_paragraph = doc.paragraphs[-1]
-            last_paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        except Exception as e:
-            doc.add_paragraph(f"[Screenshot could not be embedded: {e}]")
-    
-    # Screenshot 4: Existing screenshot from project
-    doc.add_page_break()
-    add_heading_with_color(doc, '8.4 Additional Application View', 2, (0, 153, 76))
-    doc.add_paragraph(
-        "Another view of the application interface:"
-    )
-    
-    screenshot4_path = r"c:\Users\perfe\Desktop\devops\Screenshot 2025-12-15 124938.png"
-    if os.path.exists(screenshot4_path):
-        try:
-            doc.add_picture(screenshot4_path, width=Inches(6))
-            last_paragraph = doc.paragraphs[-1]
-            last_paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        except Exception as e:
-            doc.add_paragraph(f"[Screenshot could not be embedded: {e}]")
-    
-    doc.add_page_break()
-    
-    # ===== 9. SETUP AND INSTALLATION =====
-    add_heading_with_color(doc, '9. Setup and Installation', 1, (0, 102, 204))
-    
-    add_heading_with_color(doc, '9.1 Prerequisites', 2, (0, 153, 76))
-    prerequisites = [
-        "Java 17 or higher",
-        "Maven 3.6+",
-        "Google Gemini API key (optional, for live API integration)"
-    ]
-    for prereq in prerequisites:
-        doc.add_paragraph(prereq, style='List Bullet')
-    
-    add_heading_with_color(doc, '9.2 Running with Maven', 2, (0, 153, 76))
-    maven_steps = """
-1. Clone or download the project
-2. Navigate to project directory
-3. Configure API key in src/main/resources/application.properties:
-   gemini.api.key=your_api_key_here
-4. Run the application:
-   mvn spring-boot:run
-5. Open browser and navigate to:
-   http://localhost:8085
+
+def add_formatted_paragraph(doc, block):
+    """Add a paragraph made of individually formatted runs"""
+    if block.plain:
+        paragraph = doc.add_paragraph(block.text)
+    else:
+        paragraph = doc.add_paragraph()
+        for run_spec in block.runs:
+            run = paragraph.add_run(run_spec.text)
+            if run_spec.bold:
+                run.bold = True
+            if run_spec.italic:
+                run.italic = True
+            if run_spec.size:
+                run.font.size = Pt(run_spec.size)
+            if run_spec.color:
+                run.font.color.rgb = RGBColor(*run_spec.color)
+    if block.align == "center":
+        paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    return paragraph
+
+def add_table(doc, header, rows, widths=None):
+    """Add a bordered table with a bold header row, repeated on every page"""
+    return add_table_from_rows(doc, rows, header, widths, named_style(doc, 'Table Grid'))
+
+def render_block(doc, block, options):
+    """Render one document model block with python-docx"""
+    if isinstance(block, Heading):
+        heading = add_heading_with_color(doc, block.text, block.level, block.color or HEADING_COLOR,
+                                         block.size)
+        if block.align == "center":
+            heading.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    elif isinstance(block, Paragraph):
+        add_formatted_paragraph(doc, block)
+    elif isinstance(block, BulletList):
+        bullet_style = named_style(doc, 'List Bullet')
+        for item in block.items:
+            add_styled_paragraph(doc, item, bullet_style)
+    elif isinstance(block, DefinitionList):
+        for term, description in block.items:
+            p = doc.add_paragraph()
+            p.add_run(f"{term}: ").bold = True
+            p.add_run(description)
+    elif isinstance(block, Table):
+        add_table(doc, block.header, block.rows, block.widths)
+    elif isinstance(block, CodeBlock):
+        add_code_block(doc, block.code, block.label, syntax=code_language(block),
+                       line_numbers=block.line_numbers, first_line=block.first_line)
+    elif isinstance(block, ChatTranscript):
+        add_chat_transcript(doc, block.turns)
+    elif isinstance(block, Image):
+        add_screenshot(doc, block.path, block.width_inches, options)
+    elif isinstance(block, PageBreak):
+        doc.add_page_break()
+    else:
+        raise TypeError(f"Unsupported block: {block!r}")
+
+def render_section(section, options):
+    """Render one section into its own document"""
+    doc = base_document(options["cache_dir"])
+    for block in section.blocks:
+        render_block(doc, block, options)
+    return doc
+
+def render_fragment(section, key, options):
+    """Render one section and store it as a fragment; runs in worker processes too"""
+    return FragmentCache(options["cache_dir"]).store(key, render_section(section, options))
+
+def section_workers(stale_sections, options):
+    """Number of processes to render the stale sections in"""
+    if (len(stale_sections) < 2
+            or sum(len(section.blocks) for section in stale_sections) < PARALLEL_MIN_BLOCKS):
+        return 1
+    return min(options["section_workers"] or os.cpu_count() or 1, len(stale_sections))
+
+def render_docx(sections, output_path, options):
+    """Render the document model to a .docx, reusing cached section fragments
+
+    Stale sections are rendered into fragments in worker processes when
+    there is enough of them to pay for the workers, and every fragment is
+    appended in document order; FragmentCache.append re-links their images
+    and shares identical ones, so the output is the same as when rendering
+    serially. Returns the names of the sections that had to be rendered.
     """
-    doc.add_paragraph(maven_steps)
-    
-     # Docker run instructions removed; use Maven or JAR run methods above
-     doc.add_page_break()
-    
-    # ===== 10. TESTING THE APPLICATION =====
-    add_heading_with_color(doc, '10. Testing the Application', 1, (0, 102, 204))
-    
-    doc.add_paragraph(
-        "The application includes hardcoded responses for testing without a valid API key. "
-        "Try these test queries:"
-    )
-    
-    test_queries = [
-        "hello / hi / hey - Greeting responses",
-        "what is devops? - Detailed DevOps explanation",
-        "what is maven? - Maven build tool information",
-        "what is spring boot? - Spring Boot framework details",
-        "how are you? - Friendly response",
-        "help - List of available topics",
-        "thank you - Acknowledgment response"
-    ]
-    
-    for query in test_queries:
-        doc.add_paragraph(query, style='List Bullet')
-    
-    doc.add_paragraph()
-    doc.add_paragraph(
-        "For queries not in the hardcoded list, the application will attempt to call the "
-        "Gemini API (if a valid API key is configured) or return a helpful error message."
-    )
-    
-    doc.add_page_break()
-    
-    # ===== 11. CONCLUSION =====
-    add_heading_with_color(doc, '11. Conclusion', 1, (0, 102, 204))
-    
-    conclusion_text = """
-This Spring Boot Chatbot application demonstrates a complete full-stack development workflow,
-from backend API design to frontend user interface, with modern build and packaging practices.
-
-Key Learning Outcomes:
-• Understanding of Spring Boot framework and layered architecture
-• REST API design and implementation
-• Integration with third-party APIs (Google Gemini)
-• Modern web UI development with responsive design
-• Artifact packaging and CI/CD readiness
-• Maven project structure and dependency management
-
-The application serves as an excellent foundation for building more complex chatbot systems
-and can be extended with features like:
-• User authentication and session management
-• Chat history persistence with database integration
-• File upload and processing capabilities
-• Multi-language support
-• Advanced AI features and custom training
-• Real-time notifications with WebSockets
-
-This project showcases industry-standard practices and provides a solid understanding of
-modern web application development and deployment.
+    cache = FragmentCache(options["cache_dir"])
+
+    # Create document from the base template, which has the margins and styles
+    doc = base_document(options["cache_dir"])
+
+    keys = section_keys(sections, options)
+    fragments = [cache.load(key) for key in keys]
+    stale = [(section, key) for section, key, fragment in zip(sections, keys, fragments)
+             if fragment is None]
+    workers = section_workers([section for section, key in stale], options)
+
+    rendered = []
+    with ExitStack() as stack:
+        if workers > 1:
+            pool = stack.enter_context(ProcessPoolExecutor(max_workers=workers))
+            # Fragments come back in submission order, so they are appended
+            # while later sections are still rendering
+            renders = pool.map(render_fragment, *zip(*stale), repeat(options, len(stale)),
+                               chunksize=max(1, len(stale) // (4 * workers)))
+        else:
+            renders = (render_fragment(section, key, options) for section, key in stale)
+        for section, fragment in zip(sections, fragments):
+            with doc_profile.section(section.name, doc):
+                if fragment is None:
+                    fragment = next(renders)
+                    rendered.append(section.name)
+                cache.append(doc, fragment)
+    cache.finish(doc)
+
+    # Reproducible builds are always written whole
+    if options["update"] and not options["reproducible"]:
+        update_docx(doc, output_path, options)
+    else:
+        # Replace the output in one step so an open viewer never sees a partial file
+        write_atomic(output_path, save_docx(doc, options))
+    return rendered
+
+def update_docx(doc, output_path, options):
+    """Patch the .docx at output_path to hold doc, touching only the changed parts
+
+    Parts are compared with the digests recorded when the output was last
+    written here, so the old package is not read. Without them, or when
+    the output cannot be patched, such as one locked by a viewer, it is
+    written whole. Either way the new digests are recorded for the next
+    update.
     """
-    doc.add_paragraph(conclusion_text)
-    
-    # Add footer
-    doc.add_paragraph()
-    doc.add_paragraph()
-    footer = doc.add_paragraph('─' * 80)
-    footer.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    
-    footer_text = doc.add_paragraph('Spring Boot Chatbot Application Documentation')
-    footer_text.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    footer_run = footer_text.runs[0]
-    footer_run.font.size = Pt(10)
-    footer_run.font.color.rgb = RGBColor(100, 100, 100)
-    footer_run.italic = True
-    
-    # Save document
-    output_path = r"c:\Users\perfe\Desktop\devops\Spring_Boot_Chatbot_Documentation.docx"
-    doc.save(output_path)
-    print(f"Documentation created successfully: {output_path}")
-    return output_path
+    parts = docx_parts(doc)
+    digests = part_digests(parts)
+    manifests = OutputManifests(options["cache_dir"])
+    recorded = manifests.part_digests(output_path)
+    try:
+        updated = recorded is not None and update_package(
+            output_path, parts, recorded, options["deflate_level"], digests=digests) is not None
+    except OSError:
+        updated = False
+    if not updated:
+        write_atomic(output_path, write_package(parts, options["deflate_level"]))
+    manifests.write_part_digests(output_path, digests)
+
+def save_docx(doc, options):
+    """Bytes of doc's .docx package, written by docx_package rather than doc.save()"""
+    parts = docx_parts(doc)
+    if not options["reproducible"]:
+        return write_package(parts, options["deflate_level"])
+    date = build_date()
+    return write_package(reproducible_parts(parts, date), options["deflate_level"],
+                         zip_date_time(date))
 
 if __name__ == "__main__":
-    create_project_documentation()
+    main()
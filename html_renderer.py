@@ -0,0 +1,157 @@
+"""HTML renderer for the document model, for publishing on the wiki"""
+import html
+import os
+
+from cache_keys import write_atomic
+from doc_model import (CHAT_SPEAKERS, DEFAULT_THEME, BulletList, ChatTranscript, CodeBlock,
+                       DefinitionList, Heading, Image, PageBreak, Paragraph, Table)
+from image_pipeline import copy_to_media_dir, prepare_image
+from syntax_highlight import code_language, highlight, highlight_lines
+
+STYLESHEET = """
+body { font-family: Calibri, Arial, sans-serif; max-width: 52em; margin: 2em auto; line-height: 1.4; }
+.center { text-align: center; }
+.pre { white-space: pre-line; }
+figure.code { margin: 1em 0; background: #F0F0F0; padding: 0.5em 1em; }
+figure.code figcaption { font-size: 9pt; font-style: italic; color: #646464; }
+figure.code pre { margin: 0; font-family: "Courier New", monospace; font-size: 9pt; }
+figure.code .ln { color: #646464; user-select: none; }
+table { border-collapse: collapse; margin: 1em 0; }
+th, td { border: 1px solid #646464; padding: 0.2em 0.5em; text-align: left; }
+.chat { display: flex; flex-direction: column; gap: 0.4em; margin: 0.5em 0 1em; }
+.bubble { max-width: 75%; padding: 0.4em 0.8em; border-radius: 0.8em; white-space: pre-line; }
+.bubble.user { align-self: flex-end; }
+.bubble.bot { align-self: flex-start; }
+.bubble .speaker { display: block; font-size: 8pt; font-weight: bold; color: #646464; }
+.page-break { page-break-after: always; }
+"""
+
+
+def _color(rgb):
+    return "#%02x%02x%02x" % tuple(rgb)
+
+
+def _syntax_css(theme):
+    rules = []
+    for token, color, bold, italic in theme.syntax:
+        styles = [f"color: {_color(color)}"]
+        if bold:
+            styles.append("font-weight: bold")
+        if italic:
+            styles.append("font-style: italic")
+        rules.append(f"figure.code .tok-{token} {{ {'; '.join(styles)}; }}")
+    return "\n".join(rules) + "\n"
+
+
+def _chat_css(theme):
+    return (f".bubble.user {{ background: #{theme.user_fill}; }}\n"
+            f".bubble.bot {{ background: #{theme.bot_fill}; }}\n")
+
+
+def _spans_html(spans):
+    return "".join(f'<span class="tok-{token}">{html.escape(span)}</span>' if token
+                   else html.escape(span) for span, token in spans)
+
+
+def _code_html(block):
+    language = code_language(block)
+    if not block.line_numbers:
+        return _spans_html(highlight(block.code, language))
+    lines = highlight_lines(block.code, language)
+    width = len(str(block.first_line + len(lines) - 1))
+    return "\n".join(f'<span class="ln">{number:>{width}}  </span>{_spans_html(spans)}'
+                      for number, spans in enumerate(lines, block.first_line))
+
+
+def _run_html(run):
+    styles = []
+    if run.size:
+        styles.append(f"font-size: {run.size}pt")
+    if run.color:
+        styles.append(f"color: {_color(run.color)}")
+    content = html.escape(run.text)
+    if run.bold:
+        content = f"<strong>{content}</strong>"
+    if run.italic:
+        content = f"<em>{content}</em>"
+    if styles:
+        content = f'<span style="{"; ".join(styles)}">{content}</span>'
+    return content
+
+
+def _classes(*names):
+    names = [name for name in names if name]
+    return f' class="{" ".join(names)}"' if names else ""
+
+
+def block_html(block, output_path, options):
+    """HTML for one document model block"""
+    if isinstance(block, Heading):
+        # Title, Heading 1 and Heading 2 map to h1, h2 and h3
+        tag = f"h{block.level + 1}"
+        styles = []
+        if block.color:
+            styles.append(f"color: {_color(block.color)}")
+        if block.size:
+            styles.append(f"font-size: {block.size}pt")
+        style = f' style="{"; ".join(styles)}"' if styles else ""
+        return f"<{tag}{_classes(block.align)}{style}>{html.escape(block.text)}</{tag}>"
+    if isinstance(block, Paragraph):
+        if not block.runs:
+            return "<p>&nbsp;</p>"
+        content = "".join(_run_html(run) for run in block.runs)
+        multiline = "pre" if "\n" in block.text else None
+        return f"<p{_classes(block.align, multiline)}>{content.strip()}</p>"
+    if isinstance(block, BulletList):
+        items = "".join(f"<li>{html.escape(item.strip())}</li>" for item in block.items)
+        return f"<ul>{items}</ul>"
+    if isinstance(block, DefinitionList):
+        return "\n".join(f"<p><strong>{html.escape(term)}:</strong> {html.escape(description)}</p>"
+                         for term, description in block.items)
+    if isinstance(block, Table):
+        header = "".join(f"<th>{html.escape(value)}</th>" for value in block.header)
+        rows = "".join("<tr>" + "".join(f"<td>{html.escape(value)}</td>" for value in row) + "</tr>"
+                       for row in block.rows)
+        return f"<table><thead><tr>{header}</tr></thead><tbody>{rows}</tbody></table>"
+    if isinstance(block, CodeBlock):
+        caption = f"<figcaption>{html.escape(block.label)}</figcaption>" if block.label else ""
+        code = _code_html(block)
+        return f'<figure class="code">{caption}<pre><code>{code}</code></pre></figure>'
+    if isinstance(block, ChatTranscript):
+        bubbles = "".join(
+            f'<div class="bubble {role}"><span class="speaker">'
+            f'{html.escape(f"{CHAT_SPEAKERS[role]}  {note}".rstrip())}</span>'
+            f"{html.escape(text)}</div>" for role, text, note in block.turns)
+        return f'<div class="chat">{bubbles}</div>'
+    if isinstance(block, Image):
+        if not os.path.exists(block.path):
+            return ""
+        image_path = prepare_image(block.path, os.path.join(options["cache_dir"], "images"),
+                                   block.width_inches, options["image_dpi"], options["image_format"])
+        media_dir = f"{os.path.splitext(output_path)[0]}_media"
+        name = copy_to_media_dir(image_path, media_dir)
+        src = f"{os.path.basename(media_dir)}/{name}"
+        return (f'<p class="center"><img src="{html.escape(src)}" alt="" '
+                f'style="width: {block.width_inches}in; max-width: 100%"></p>')
+    if isinstance(block, PageBreak):
+        return '<div class="page-break"></div>'
+    raise TypeError(f"Unsupported block: {block!r}")
+
+
+def render_html(sections, output_path, options):
+    """Render the document model to a standalone HTML page"""
+    title = next((block.text for section in sections for block in section.blocks
+                  if isinstance(block, Heading)), "")
+    parts = [
+        "<!DOCTYPE html>",
+        '<html lang="en">',
+        f'<head><meta charset="utf-8"><title>{html.escape(title)}</title>',
+        f"<style>{STYLESHEET}{_syntax_css(DEFAULT_THEME)}{_chat_css(DEFAULT_THEME)}</style></head>",
+        "<body>",
+    ]
+    for section in sections:
+        parts.append(f'<section id="{section.name}">')
+        parts.extend(block_html(block, output_path, options) for block in section.blocks)
+        parts.append("</section>")
+    parts.append("</body></html>\n")
+    write_atomic(output_path, "\n".join(parts).encode("utf-8"))
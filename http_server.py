@@ -0,0 +1,117 @@
+"""Minimal asyncio HTTP/1.1 server shared by the local services
+
+chat_stub, gemini_stub and doc_daemon each serve a small JSON API on
+asyncio streams. They only need requests with a Content-Length body,
+answered one at a time per connection. Connections are kept alive unless
+the client sends "Connection: close", so load tests measure pooled
+connections the way a real client uses them. A handler maps a request
+to (status, headers, body), with body either bytes or a FileBody
+streamed from disk in chunks.
+"""
+import asyncio
+import json
+import os
+from dataclasses import dataclass
+
+REASONS = {200: "OK", 400: "Bad Request", 403: "Forbidden", 404: "Not Found",
+           405: "Method Not Allowed", 413: "Payload Too Large", 429: "Too Many Requests",
+           500: "Internal Server Error", 502: "Bad Gateway", 503: "Service Unavailable",
+           504: "Gateway Timeout"}
+CHUNK_SIZE = 1 << 16
+
+
+@dataclass(frozen=True)
+class FileBody:
+    """A response body sent from the file at path"""
+    path: str
+
+
+def json_response(status, payload, content_type="application/json", ensure_ascii=True,
+                  headers=None):
+    """(status, headers, body) answering with payload as JSON"""
+    body = json.dumps(payload, ensure_ascii=ensure_ascii).encode("utf-8")
+    return status, {"Content-Type": content_type, **(headers or {})}, body
+
+
+async def read_request(reader, max_body=None):
+    """(method, path, headers, body) of the next request, or None at EOF
+
+    Header names are lowercased. body is None when the request announces
+    more than max_body bytes; it is then left unread.
+    """
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    method, path, _ = request_line.decode("latin-1").split(" ", 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", 0))
+    if max_body is not None and length > max_body:
+        return method, path, headers, None
+    return method, path, headers, await reader.readexactly(length)
+
+
+def _head(status, headers, length, keep_alive):
+    lines = [f"HTTP/1.1 {status} {REASONS.get(status, 'Error')}"]
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    lines.append(f"Content-Length: {length}")
+    lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+async def write_response(writer, status, headers, body, keep_alive=True):
+    """Send one response; a FileBody is read and sent CHUNK_SIZE bytes at a time"""
+    if not isinstance(body, FileBody):
+        writer.write(_head(status, headers, len(body), keep_alive) + body)
+        await writer.drain()
+        return
+    with open(body.path, "rb") as f:
+        writer.write(_head(status, headers, os.fstat(f.fileno()).st_size, keep_alive))
+        while chunk := f.read(CHUNK_SIZE):
+            writer.write(chunk)
+            await writer.drain()
+    await writer.drain()
+
+
+def serve(handle, host="127.0.0.1", port=0, unix_socket=None, max_body=None, backlog=100):
+    """Coroutine returning a started asyncio server; port 0 picks a free port
+
+    handle is a coroutine function taking a (method, path, headers, body)
+    request and returning (status, headers, body). A request with a body
+    over max_body bytes is answered with 413 without calling handle, and
+    its connection is closed. With unix_socket the server listens on that
+    Unix socket instead, replacing a stale one.
+    """
+    async def connection(reader, writer):
+        try:
+            while True:
+                request = await read_request(reader, max_body)
+                if request is None:
+                    break
+                if request[3] is None:
+                    status, headers, body = json_response(413, {"error": "request too large"})
+                    keep_alive = False
+                else:
+                    status, headers, body = await handle(request)
+                    keep_alive = request[2].get("connection", "").lower() != "close"
+                await write_response(writer, status, headers, body, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        except asyncio.CancelledError:
+            # The server is shutting down with this client still connected
+            pass
+        finally:
+            writer.close()
+
+    if unix_socket:
+        if os.path.exists(unix_socket):
+            os.unlink(unix_socket)
+        return asyncio.start_unix_server(connection, unix_socket, backlog=backlog)
+    return asyncio.start_server(connection, host, port, backlog=backlog)
@@ -0,0 +1,110 @@
+"""Screenshot preparation in front of doc.add_picture
+
+Screenshots are downscaled to the pixel size they are actually displayed
+at, optionally re-encoded as JPEG and written without metadata. A
+downscaled PNG is also tried with a 256-color palette, and the smallest
+encoding is kept; when none is smaller than the source, the source is
+embedded as it is, so preparing an image never makes it larger. Results
+are cached on disk keyed by the source image's hash, the target size
+and the encoding settings, so an unchanged screenshot is only processed
+once.
+"""
+import os
+from io import BytesIO
+
+from cache_keys import file_digest, write_atomic
+
+DEFAULT_DPI = 150
+JPEG_QUALITY = 85
+# Bump when the way images are encoded changes, so cached copies are redone
+IMAGE_CACHE_VERSION = 2
+
+# Formats Word renders natively; anything else is re-encoded as PNG
+_EXTENSIONS = {"PNG": "png", "JPEG": "jpg", "GIF": "gif"}
+
+
+def target_width_px(width_inches, dpi=DEFAULT_DPI):
+    """Pixel width needed to display an image at width_inches and dpi"""
+    return round(width_inches * dpi)
+
+
+def prepare_image(path, cache_dir, width_inches=6, dpi=DEFAULT_DPI, fmt=None):
+    """Return the path of a copy of the image sized for its display width
+
+    fmt is None to keep the source format, or "png"/"jpeg" to convert.
+    Images are never upscaled. Unless it is converted, an image keeps its
+    source bytes when no encoding of it is smaller. Without Pillow the
+    source path is returned.
+    """
+    try:
+        from PIL import Image
+    except ImportError:  # Pillow is optional; screenshots are then embedded as-is
+        return path
+
+    target_px = target_width_px(width_inches, dpi)
+    variant = (f"{target_px}px-{dpi}dpi-{(fmt or 'same').lower()}-q{JPEG_QUALITY}"
+               f"-v{IMAGE_CACHE_VERSION}")
+    cached = os.path.join(cache_dir, f"{file_digest(path)}-{variant}")
+    for ext in _EXTENSIONS.values():
+        if os.path.exists(f"{cached}.{ext}"):
+            return f"{cached}.{ext}"
+
+    with Image.open(path) as img:
+        source_format = img.format
+        out_format = (fmt or img.format or "PNG").upper()
+        if out_format == "JPG":
+            out_format = "JPEG"
+        if out_format not in _EXTENSIONS:
+            out_format = "PNG"
+
+        img.load()
+        resized = img.width > target_px
+        if resized:
+            height = max(1, round(img.height * target_px / img.width))
+            img = img.resize((target_px, height), Image.LANCZOS)
+        if out_format == "JPEG" and img.mode not in ("RGB", "L"):
+            background = Image.new("RGB", img.size, (255, 255, 255))
+            background.paste(img, mask=img.convert("RGBA").getchannel("A"))
+            img = background
+
+        # Only the pixels and DPI are written; EXIF, text chunks and ICC
+        # profiles from the source are dropped
+        options = {"dpi": (dpi, dpi), "optimize": True}
+        if out_format == "JPEG":
+            options["quality"] = JPEG_QUALITY
+        buffer = BytesIO()
+        img.save(buffer, format=out_format, **options)
+        candidates = [buffer.getvalue()]
+        if resized and out_format == "PNG" and img.mode in ("RGB", "RGBA"):
+            # Resampling blends the few flat colors of a screenshot into
+            # thousands, which PNG compresses far worse; a palette undoes that.
+            # Fast octree is the built-in quantizer that handles RGBA
+            buffer = BytesIO()
+            img.quantize(256, method=Image.Quantize.FASTOCTREE).save(buffer, format="PNG",
+                                                                      **options)
+            candidates.append(buffer.getvalue())
+
+    data = min(candidates, key=len)
+    if out_format == source_format and len(data) >= os.path.getsize(path):
+        # Re-encoding can defeat palette-optimized PNGs; keep the original
+        with open(path, "rb") as f:
+            data = f.read()
+
+    os.makedirs(cache_dir, exist_ok=True)
+    cached = f"{cached}.{_EXTENSIONS[out_format]}"
+    write_atomic(cached, data)
+    return cached
+
+
+def copy_to_media_dir(image_path, media_dir):
+    """Copy an image into media_dir under a content-addressed file name
+
+    Returns the file name, so identical images are only stored once.
+    """
+    name = f"{file_digest(image_path)[:16]}{os.path.splitext(image_path)[1].lower()}"
+    target = os.path.join(media_dir, name)
+    if not os.path.exists(target):
+        os.makedirs(media_dir, exist_ok=True)
+        with open(image_path, "rb") as f:
+            write_atomic(target, f.read())
+    return name
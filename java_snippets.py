@@ -0,0 +1,296 @@
+"""Code snippets pulled from the real Java sources instead of hand copies
+
+Snippets are referenced by file, class or method:
+
+    ChatbotApplication.java           the whole file
+    ChatController                    a class, with its annotations
+    ChatController#chat               a method (the first overload)
+    model/ChatRequest.java:ChatRequest  a class in a specific file
+
+A persistent index in the build's cache directory records the class,
+method and annotation spans of every source file, keyed by the file's
+mtime, size and hash. A lookup is an index
+hit plus one stat of the file it points at; the tree is only walked when a
+reference is not in the index yet, and only changed files are re-parsed.
+"""
+import bisect
+import hashlib
+import json
+import os
+import re
+import sys
+import textwrap
+
+INDEX_VERSION = 1
+# Cache directory of the index when no build passes one in
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".doc_cache")
+
+_IDENT = r"[A-Za-z_$][\w$]*"
+_TYPE_DECL = re.compile(rf"\b(?:class|interface|enum|record)\s+({_IDENT})")
+_METHOD_DECL = re.compile(
+    rf"({_IDENT})\s*\((?:[^()]|\([^()]*\))*\)\s*(?:throws\s+[\w$.,\s<>]+)?\s*$")
+_ANNOTATION = re.compile(rf"@({_IDENT}(?:\.{_IDENT})*)")
+_STRUCTURE = re.compile(r"[(){};]")
+_NOT_METHODS = {"if", "for", "while", "switch", "catch", "synchronized", "try", "return", "new"}
+
+
+def _blank_comments_and_strings(source):
+    """Replace comments and string/char literals with spaces, keeping newlines
+
+    The result has the same length and line structure as source, so offsets
+    found in it map straight back to the original.
+    """
+    out = []
+    i, n = 0, len(source)
+    while i < n:
+        if source.startswith("//", i):
+            end = source.find("\n", i)
+            end = n if end < 0 else end
+        elif source.startswith("/*", i):
+            end = source.find("*/", i + 2)
+            end = n if end < 0 else end + 2
+        elif source.startswith('"""', i):
+            end = source.find('"""', i + 3)
+            end = n if end < 0 else end + 3
+        elif source[i] in "\"'":
+            quote, end = source[i], i + 1
+            while end < n and source[end] != quote and source[end] != "\n":
+                end += 2 if source[end] == "\\" else 1
+            end = min(end + 1, n)
+        else:
+            end = i
+            while end < n and source[end] not in "/\"'":
+                end += 1
+            if end == i:
+                end = i + 1
+            out.append(source[i:end])
+            i = end
+            continue
+        out.append(re.sub(r"[^\n]", " ", source[i:end]))
+        i = end
+    return "".join(out)
+
+
+def parse_java(source):
+    """Class, method and annotation spans of a Java source file
+
+    Returns {class name: {"span": [first, last], "annotations": [...],
+    "methods": {name: [[first, last, [annotations]], ...]}}} with 1-based
+    inclusive line numbers. Spans start at the declaration's annotations.
+    Nested classes are recorded as "Outer.Inner".
+    """
+    text = _blank_comments_and_strings(source)
+    line_starts = [0] + [m.end() for m in re.finditer("\n", text)]
+
+    def line(offset):
+        return bisect.bisect_right(line_starts, offset)
+
+    classes = {}
+    stack = []  # (kind, name, start offset, annotations)
+    header_start, parens = 0, 0
+    for match in _STRUCTURE.finditer(text):
+        ch, pos = match.group(), match.start()
+        if ch == "(":
+            parens += 1
+        elif ch == ")":
+            parens -= 1
+        elif parens:
+            continue
+        elif ch == ";":
+            header_start = pos + 1
+        elif ch == "{":
+            header = text[header_start:pos]
+            start = header_start + len(header) - len(header.lstrip())
+            parent = stack[-1] if stack else None
+            entry = ("block", None, start, [])
+            type_decl = _TYPE_DECL.search(header)
+            method_decl = _METHOD_DECL.search(header)
+            if type_decl and (parent is None or parent[0] == "class"):
+                name = type_decl.group(1)
+                if parent is not None:
+                    name = f"{parent[1]}.{name}"
+                entry = ("class", name, start, _ANNOTATION.findall(header[:type_decl.start()]))
+            elif (parent is not None and parent[0] == "class" and method_decl
+                  and "=" not in header and method_decl.group(1) not in _NOT_METHODS):
+                entry = ("method", method_decl.group(1), start,
+                         _ANNOTATION.findall(header[:method_decl.start()]))
+            stack.append(entry)
+            header_start = pos + 1
+        elif ch == "}":
+            if not stack:
+                continue
+            kind, name, start, annotations = stack.pop()
+            span = [line(start), line(pos)]
+            if kind == "class":
+                classes.setdefault(name, {"methods": {}})
+                classes[name].update(span=span, annotations=annotations)
+            elif kind == "method":
+                owner = classes.setdefault(stack[-1][1], {"methods": {}})
+                owner["methods"].setdefault(name, []).append(span + [annotations])
+            header_start = pos + 1
+    return classes
+
+
+def _file_digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class JavaSourceIndex:
+    """Persistent, mtime-checked index of the Java files under source_root"""
+
+    def __init__(self, source_root, index_path=None, cache_dir=None):
+        self.source_root = os.path.abspath(source_root)
+        if index_path is None:
+            # One index per source tree, so batch runs over several trees don't thrash
+            root_digest = hashlib.sha256(self.source_root.encode("utf-8")).hexdigest()
+            index_path = os.path.join(cache_dir or CACHE_DIR, "java_index",
+                                      root_digest[:16] + ".json")
+        self.index_path = index_path
+        self.files = {}
+        self._dirty = False
+        if os.path.exists(index_path):
+            with open(index_path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION and data.get("root") == self.source_root:
+                self.files = data["files"]
+        self._build_lookup()
+
+    def _build_lookup(self):
+        self._classes = {}
+        for relpath, entry in self.files.items():
+            for name in entry["classes"]:
+                self._classes.setdefault(name, []).append(relpath)
+                if "." in name:
+                    self._classes.setdefault(name.rsplit(".", 1)[1], []).append(relpath)
+
+    def _entry(self, relpath):
+        """Index entry for a file, re-parsed only if its contents changed"""
+        path = os.path.join(self.source_root, relpath)
+        stat = os.stat(path)
+        entry = self.files.get(relpath)
+        if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            return entry
+
+        with open(path, "rb") as f:
+            data = f.read()
+        digest = _file_digest(data)
+        if not entry or entry["sha256"] != digest:
+            entry = {"sha256": digest,
+                     "classes": parse_java(data.decode("utf-8", errors="replace"))}
+        entry.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+        self.files[relpath] = entry
+        self._dirty = True
+        return entry
+
+    def refresh(self):
+        """Walk the tree, index new and changed files and drop deleted ones"""
+        seen = set()
+        for dirpath, dirnames, filenames in os.walk(self.source_root):
+            for filename in filenames:
+                if filename.endswith(".java"):
+                    relpath = os.path.relpath(os.path.join(dirpath, filename), self.source_root)
+                    relpath = relpath.replace(os.sep, "/")
+                    seen.add(relpath)
+                    self._entry(relpath)
+        for relpath in set(self.files) - seen:
+            del self.files[relpath]
+            self._dirty = True
+        self._build_lookup()
+        self.save()
+
+    def save(self):
+        if not self._dirty:
+            return
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        data = {"version": INDEX_VERSION, "root": self.source_root, "files": self.files}
+        tmp_path = f"{self.index_path}.tmp{os.getpid()}"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.index_path)
+        self._dirty = False
+
+    def _candidates(self, file_part, class_name):
+        if file_part:
+            return [p for p in self.files if p == file_part or p.endswith("/" + file_part)]
+        if class_name:
+            return self._classes.get(class_name, [])
+        return []
+
+    def _resolve(self, reference):
+        file_part, _, rest = reference.rpartition(":") if ":" in reference else ("", "", reference)
+        if rest.endswith(".java"):
+            file_part, rest = rest, ""
+        class_name, _, method = rest.partition("#")
+
+        relpaths = self._candidates(file_part, class_name)
+        if not relpaths:
+            # Not indexed yet: new file, or first run
+            self.refresh()
+            relpaths = self._candidates(file_part, class_name)
+        if not relpaths:
+            raise LookupError(f"No Java source matches {reference!r} under {self.source_root}")
+        if len(relpaths) > 1:
+            raise LookupError(f"{reference!r} is ambiguous: {', '.join(sorted(relpaths))}")
+        relpath = relpaths[0]
+
+        try:
+            entry = self._entry(relpath)
+        except FileNotFoundError:
+            self.refresh()
+            return self._resolve(reference)
+
+        if not class_name:
+            return relpath, None
+        classes = entry["classes"]
+        qualified = class_name if class_name in classes else next(
+            (name for name in classes if name.endswith("." + class_name)), None)
+        if qualified is None:
+            raise LookupError(f"No class {class_name!r} in {relpath}")
+        if not method:
+            return relpath, classes[qualified]["span"]
+        overloads = classes[qualified]["methods"].get(method)
+        if not overloads:
+            raise LookupError(f"No method {method!r} in class {qualified} ({relpath})")
+        return relpath, overloads[0][:2]
+
+    def snippet(self, reference):
+        """Source text for a reference, dedented"""
+        relpath, span = self._resolve(reference)
+        self.save()
+        with open(os.path.join(self.source_root, relpath), encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        if span:
+            lines = lines[span[0] - 1:span[1]]
+        return textwrap.dedent("\n".join(lines)).strip("\n")
+
+
+_indexes = {}
+
+
+def get_index(source_root, index_path=None, cache_dir=None):
+    """Index for source_root, kept loaded for the life of the process"""
+    key = (os.path.abspath(source_root), index_path, cache_dir)
+    if key not in _indexes:
+        _indexes[key] = JavaSourceIndex(source_root, index_path, cache_dir)
+    return _indexes[key]
+
+
+def java_snippet(source_root, references, fallback, index_path=None, cache_dir=None):
+    """Snippet for one reference, or several joined by blank lines
+
+    The index is kept in cache_dir unless index_path is given. Returns
+    fallback when source_root does not exist, so documentation can still
+    be generated without a checkout of the sources.
+    """
+    if not source_root or not os.path.isdir(source_root):
+        return fallback
+    if isinstance(references, str):
+        references = [references]
+    index = get_index(source_root, index_path, cache_dir)
+    return "\n\n".join(index.snippet(reference) for reference in references)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        sys.exit("usage: java_snippets.py SOURCE_ROOT REFERENCE...")
+    print(java_snippet(sys.argv[1], sys.argv[2:], None))
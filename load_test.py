@@ -0,0 +1,233 @@
+"""Load test for the chatbot's POST /api/chat
+
+Concurrent asyncio clients send the documented test queries (answered
+from ChatService's hardcoded list) mixed with queries that are passed
+through to Gemini, over a pool of keep-alive connections. Clients start
+one by one over the ramp period, and throughput and p50/p95/p99 latency
+are reported separately for the two kinds of query. Results are written
+as JSON, which section 11 of the documentation renders as a table.
+
+    python load_test.py --stub                      # bundled stub server, no network
+    python load_test.py --url http://localhost:8085/api/chat --concurrency 64
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import ssl
+import sys
+import time
+from urllib.parse import urlsplit
+
+import chat_stub
+from cache_keys import write_atomic
+from doc_content import PERFORMANCE_RESULTS, test_queries
+
+DEFAULT_URL = f"http://localhost:{chat_stub.DEFAULT_PORT}/api/chat"
+HARDCODED = "Hardcoded responses"
+PASSTHROUGH = "Gemini pass-through"
+
+# Queries with no hardcoded response, so ChatService calls the Gemini API
+PASSTHROUGH_QUERIES = [
+    "what is kubernetes?",
+    "explain continuous integration",
+    "how do I write a unit test in java?",
+    "what is the difference between a jar and a war?",
+    "summarize the twelve-factor app",
+]
+
+
+class ConnectionPool:
+    """Keep-alive HTTP/1.1 connections to one host, at most size of them open"""
+
+    def __init__(self, url, size):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.ssl = ssl.create_default_context() if parts.scheme == "https" else None
+        self.path = parts.path or "/"
+        if parts.query:
+            self.path += f"?{parts.query}"
+        self._idle = []
+        self._slots = asyncio.Semaphore(size)
+
+    async def post_json(self, payload):
+        """(status, decoded JSON body) of a POST to the pool's URL"""
+        body = json.dumps(payload).encode("utf-8")
+        request = (f"POST {self.path} HTTP/1.1\r\n"
+                   f"Host: {self.host}:{self.port}\r\n"
+                   "Content-Type: application/json\r\n"
+                   "Accept: application/json\r\n"
+                   f"Content-Length: {len(body)}\r\n\r\n").encode("latin-1") + body
+        async with self._slots:
+            reader, writer = (self._idle.pop() if self._idle else
+                              await asyncio.open_connection(self.host, self.port, ssl=self.ssl))
+            try:
+                writer.write(request)
+                status, headers, data = await _read_response(reader)
+            except BaseException:
+                writer.close()
+                raise
+            if headers.get("connection", "").lower() == "close":
+                writer.close()
+            else:
+                self._idle.append((reader, writer))
+        return status, json.loads(data) if data else None
+
+    async def close(self):
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            writer.close()
+        await asyncio.gather(*(writer.wait_closed() for _, writer in idle),
+                             return_exceptions=True)
+
+
+async def _read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("connection closed by server")
+    status = int(status_line.split(b" ", 2)[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            chunks.append(await reader.readexactly(size + 2))
+            if size == 0:
+                break
+        return status, headers, b"".join(chunk[:-2] for chunk in chunks)
+    return status, headers, await reader.readexactly(int(headers.get("content-length", 0)))
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(1, math.ceil(len(sorted_values) * fraction)) - 1]
+
+
+def summarize(samples, elapsed):
+    """Throughput and latency percentiles of [(latency_s, ok), ...]"""
+    latencies = sorted(latency for latency, ok in samples if ok)
+    return {
+        "requests": len(samples),
+        "errors": sum(1 for _, ok in samples if not ok),
+        "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+async def run_load(url, concurrency=32, ramp=2.0, duration=10.0, passthrough_ratio=0.2,
+                   queries=None, passthrough_queries=PASSTHROUGH_QUERIES, seed=None):
+    """Drive url with concurrency clients for duration seconds; returns the results dict
+
+    Client i starts at i/concurrency of the ramp period and sends one
+    query at a time until the test ends; a passthrough_ratio share of the
+    queries come from passthrough_queries.
+    """
+    queries = queries or test_queries()
+    rng = random.Random(seed)
+    pool = ConnectionPool(url, concurrency)
+    samples = {HARDCODED: [], PASSTHROUGH: []}
+    start = time.perf_counter()
+    deadline = start + duration
+
+    async def client(index):
+        await asyncio.sleep(ramp * index / concurrency)
+        while time.perf_counter() < deadline:
+            passthrough = rng.random() < passthrough_ratio
+            message = rng.choice(passthrough_queries if passthrough else queries)
+            sent = time.perf_counter()
+            try:
+                status, payload = await pool.post_json({"message": message})
+                ok = status == 200 and isinstance(payload, dict) and "response" in payload
+            except (OSError, ValueError, asyncio.IncompleteReadError):
+                ok = False
+            samples[PASSTHROUGH if passthrough else HARDCODED].append(
+                (time.perf_counter() - sent, ok))
+
+    try:
+        await asyncio.gather(*(client(i) for i in range(concurrency)))
+    finally:
+        await pool.close()
+    elapsed = time.perf_counter() - start
+
+    results = {category: summarize(category_samples, elapsed)
+               for category, category_samples in samples.items()}
+    results["All queries"] = summarize(samples[HARDCODED] + samples[PASSTHROUGH], elapsed)
+    return {
+        "run": {"target": url, "concurrency": concurrency, "ramp_s": ramp,
+                "duration_s": round(elapsed, 3), "passthrough_ratio": passthrough_ratio},
+        "results": results,
+    }
+
+
+def format_results(results):
+    lines = [f"{'':<22} {'requests':>9} {'errors':>7} {'req/s':>9} "
+             f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"]
+    for category, stats in results["results"].items():
+        lines.append(f"{category:<22} {stats['requests']:>9,} {stats['errors']:>7,} "
+                     f"{stats['throughput_rps']:>9.1f} {stats['p50_ms']:>8.1f} "
+                     f"{stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f}")
+    return "\n".join(lines)
+
+
+async def _run(args):
+    if not args.stub:
+        return await run_load(args.url, args.concurrency, args.ramp, args.duration,
+                              args.passthrough_ratio, seed=args.seed)
+    gemini = chat_stub.gemini_stub(args.passthrough_latency, args.gemini_recordings,
+                                   args.gemini_error_rate, args.seed)
+    server = await chat_stub.serve("127.0.0.1", 0, args.passthrough_latency, gemini)
+    url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/api/chat"
+    async with server:
+        results = await run_load(url, args.concurrency, args.ramp, args.duration,
+                                 args.passthrough_ratio, seed=args.seed)
+    results["run"]["target"] = "local stub server (chat_stub.py)"
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test POST /api/chat with the documented "
+                                                 "test queries")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", default=DEFAULT_URL, help="chat endpoint (default: %(default)s)")
+    target.add_argument("--stub", action="store_true",
+                        help="start the bundled stub server and test against it")
+    parser.add_argument("--concurrency", type=int, default=32,
+                        help="concurrent clients and pooled connections (default: %(default)s)")
+    parser.add_argument("--ramp", type=float, default=2.0,
+                        help="seconds over which the clients start (default: %(default)s)")
+    parser.add_argument("--duration", type=float, default=10.0,
+                        help="test length in seconds, including the ramp (default: %(default)s)")
+    parser.add_argument("--passthrough-ratio", type=float, default=0.2,
+                        help="share of queries without a hardcoded response (default: %(default)s)")
+    parser.add_argument("--passthrough-latency", type=float, default=chat_stub.PASSTHROUGH_LATENCY,
+                        help="simulated Gemini latency of the stub in seconds (default: %(default)s)")
+    parser.add_argument("--gemini-recordings",
+                        help="with --stub: replay Gemini responses recorded by gemini_stub.py")
+    parser.add_argument("--gemini-error-rate", type=float, default=0.0,
+                        help="with --stub: share of Gemini calls failed (default: %(default)s)")
+    parser.add_argument("--seed", type=int, help="seed the query mix for repeatable runs")
+    parser.add_argument("--output", default=PERFORMANCE_RESULTS,
+                        help="results JSON, shown in the documentation (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(_run(args))
+    print(format_results(results))
+    write_atomic(args.output, json.dumps(results, indent=2).encode("utf-8"))
+    print(f"Results written to {args.output}")
+    return 0 if results["results"]["All queries"]["requests"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
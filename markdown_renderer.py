@@ -0,0 +1,105 @@
+"""Markdown renderer for the document model, for the repository docs"""
+import os
+import re
+
+from cache_keys import write_atomic
+from doc_model import (CHAT_SPEAKERS, BulletList, ChatTranscript, CodeBlock,
+                       DefinitionList, Heading, Image, PageBreak, Paragraph, Table)
+from image_pipeline import copy_to_media_dir, prepare_image
+from syntax_highlight import code_language
+
+# Characters that would start a Markdown construct at the beginning of a line
+_LINE_START = re.compile(r"([#>+*-]|\d+\.)(?=\s)")
+_INLINE = re.compile(r"([\\`*_\[\]<>|])")
+
+
+def _escape(text):
+    return _INLINE.sub(r"\\\1", text)
+
+
+def _escape_line(line):
+    """Escape a line of prose so it renders literally, keeping its indent"""
+    stripped = line.lstrip(" ")
+    indent = len(line) - len(stripped)
+    match = _LINE_START.match(stripped)
+    if match:
+        marker = match.group(1)
+        escaped = marker[:-1] + "\\." if marker.endswith(".") else "\\" + marker
+        stripped = escaped + stripped[len(marker):]
+    return "&nbsp;" * indent + stripped
+
+
+def _run_md(run):
+    text = _escape(run.text)
+    if not text.strip():
+        return text
+    if run.bold:
+        text = f"**{text}**"
+    if run.italic:
+        text = f"*{text}*"
+    return text
+
+
+def _paragraph_md(block):
+    text = "".join(_run_md(run) for run in block.runs)
+    paragraphs = []
+    for chunk in re.split(r"\n\s*\n", text):
+        lines = [_escape_line(line.rstrip()) for line in chunk.splitlines() if line.strip()]
+        if lines:
+            # Hard line breaks keep the paragraph's own line structure
+            paragraphs.append("  \n".join(lines))
+    return "\n\n".join(paragraphs)
+
+
+def block_md(block, output_path, options):
+    """Markdown for one document model block"""
+    if isinstance(block, Heading):
+        return f"{'#' * (block.level + 1)} {_escape(block.text)}"
+    if isinstance(block, Paragraph):
+        return _paragraph_md(block)
+    if isinstance(block, BulletList):
+        return "\n".join(f"- {_escape_line(_escape(item.strip()))}" for item in block.items)
+    if isinstance(block, DefinitionList):
+        return "\n\n".join(f"**{_escape(term)}:** {_escape(description)}"
+                           for term, description in block.items)
+    if isinstance(block, Table):
+        rows = [" | ".join(_escape(value) for value in row) for row in (block.header, *block.rows)]
+        rows.insert(1, " | ".join("---" for _ in block.header))
+        return "\n".join(f"| {row} |" for row in rows)
+    if isinstance(block, CodeBlock):
+        # No line numbers: fenced code is copied as it is, and a listing's
+        # label already gives its line range
+        fence = "````" if "```" in block.code else "```"
+        label = f"*{_escape(block.label)}*\n\n" if block.label else ""
+        return f"{label}{fence}{code_language(block)}\n{block.code.strip(chr(10))}\n{fence}"
+    if isinstance(block, ChatTranscript):
+        # User turns as quotes, bot turns as plain paragraphs, each under its speaker
+        turns = []
+        for role, text, note in block.turns:
+            speaker = f"**{CHAT_SPEAKERS[role]}**" + (f" *{_escape(note)}*" if note else "")
+            lines = [speaker] + [_escape_line(_escape(line)) for line in text.splitlines()]
+            quote = "> " if role == "user" else ""
+            turns.append("  \n".join(f"{quote}{line}" for line in lines if line.strip()))
+        return "\n\n".join(turns)
+    if isinstance(block, Image):
+        if not os.path.exists(block.path):
+            return ""
+        image_path = prepare_image(block.path, os.path.join(options["cache_dir"], "images"),
+                                   block.width_inches, options["image_dpi"], options["image_format"])
+        media_dir = f"{os.path.splitext(output_path)[0]}_media"
+        name = copy_to_media_dir(image_path, media_dir)
+        return f"![]({os.path.basename(media_dir)}/{name})"
+    if isinstance(block, PageBreak):
+        return ""
+    raise TypeError(f"Unsupported block: {block!r}")
+
+
+def render_markdown(sections, output_path, options):
+    """Render the document model to a Markdown file"""
+    chunks = []
+    for section in sections:
+        for block in section.blocks:
+            chunk = block_md(block, output_path, options)
+            if chunk:
+                chunks.append(chunk)
+    write_atomic(output_path, ("\n\n".join(chunks) + "\n").encode("utf-8"))
@@ -0,0 +1,232 @@
+"""Streaming DOCX backend for very large generated documents
+
+python-docx keeps the whole document tree in memory until save. This
+writer streams word/document.xml into the zip instead: each block is
+rendered with the regular python-docx helpers into an otherwise empty
+document, serialized, written out and removed again, so memory stays flat
+however many blocks are produced. Pictures are referenced by path and
+only copied into the package when the writer is closed.
+
+The package skeleton (styles, numbering, settings, margins) comes from the
+same base template (see doc_template), so the output opens in Word
+exactly like the python-docx backend's. As in docx_package, media is stored and XML
+deflated at the "deflate_level" option, and with the "reproducible"
+option every zip entry gets a fixed timestamp and the core properties are
+normalized; parts are written in a fixed order and relationship ids are
+assigned in order of use, so the output is reproducible without
+rewriting the package afterwards.
+
+    with StreamingDocxWriter("api-reference.docx") as writer:
+        writer.add_blocks(generate_blocks())
+"""
+import os
+import re
+import zipfile
+from datetime import datetime
+from io import BytesIO
+
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.image.image import Image as DocxImage
+from docx.opc.constants import NAMESPACE, RELATIONSHIP_TYPE as RT
+from docx.opc.oxml import serialize_part_xml
+from docx.oxml import parse_xml
+from docx.oxml.ns import qn
+from docx.oxml.shape import CT_Inline
+from docx.shared import Inches
+from lxml import etree
+
+from doc_model import Image
+from doc_styles import add_styled_paragraph
+from doc_template import base_document
+from docx_package import build_date, core_properties_part, normalize_core_properties, zip_info
+from generate_documentation import default_options, render_block
+from image_pipeline import prepare_image
+
+DOCUMENT_PART = "word/document.xml"
+DOCUMENT_RELS = "word/_rels/document.xml.rels"
+CONTENT_TYPES = "[Content_Types].xml"
+
+# Serialized XML is buffered and handed to the compressor in chunks this big
+FLUSH_BYTES = 256 * 1024
+
+_XMLNS = re.compile(r' xmlns:(\w+)="([^"]*)"')
+
+
+class StreamingDocxWriter:
+    """Write a .docx whose body is streamed block by block into the zip"""
+
+    def __init__(self, output_path, options=None):
+        self.options = options or default_options()
+        self._doc = base_document(self.options["cache_dir"])
+
+        # Split the empty skeleton body into the part before and after content
+        skeleton = serialize_part_xml(self._doc.element).decode("utf-8")
+        body_start = skeleton.index("<w:body>") + len("<w:body>")
+        body_end = skeleton.index("<w:sectPr", body_start)
+        self._tail = skeleton[body_end:]
+        self._root_ns = dict(_XMLNS.findall(skeleton[:body_start]))
+
+        # Written next to the output and moved into place by close()
+        self._output_path = output_path
+        self._tmp_path = f"{output_path}.tmp{os.getpid()}"
+        self._zip = zipfile.ZipFile(self._tmp_path, "w", zipfile.ZIP_DEFLATED)
+        self._date = build_date()
+        # Its size is not known up front; zip64 lets it grow past 2 GiB
+        self._stream = self._zip.open(self._entry(DOCUMENT_PART), "w", force_zip64=True)
+        self._buffer = [skeleton[:body_start]]
+        self._buffered = len(self._buffer[0])
+
+        self._images = {}  # sha1 -> (rId, partname, path, content type)
+        self._next_rId = self._first_free_rId()
+        self._shape_id = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._stream.close()
+            self._zip.close()
+            os.remove(self._tmp_path)
+
+    def add(self, block):
+        """Render one document model block and stream it out"""
+        if isinstance(block, Image):
+            self._add_picture(block)
+        else:
+            render_block(self._doc, block, self.options)
+        self._drain_body()
+
+    def add_blocks(self, blocks):
+        """Stream every block of an iterable, such as a generator"""
+        for block in blocks:
+            self.add(block)
+
+    def close(self):
+        """Finish document.xml and write the remaining package parts"""
+        self._write(self._tail)
+        self._flush()
+        self._stream.close()
+
+        skeleton = BytesIO()
+        self._doc.save(skeleton)
+        with zipfile.ZipFile(skeleton) as source:
+            parts = {info.filename: source.read(info) for info in source.infolist()
+                     if info.filename != DOCUMENT_PART}
+        core = core_properties_part(parts)
+        for name, data in parts.items():
+            if name == DOCUMENT_RELS:
+                data = self._add_image_rels(data)
+            elif name == CONTENT_TYPES:
+                data = self._add_image_types(data)
+            elif name == core and self.options["reproducible"]:
+                data = normalize_core_properties(data, self._date)
+            self._zip.writestr(self._entry(name, data), data)
+
+        for rId, partname, path, content_type in self._images.values():
+            # Media is usually compressed already and then stored; copy it in chunks
+            with open(path, "rb") as src:
+                chunk = src.read(1 << 20)
+                entry = self._entry(partname, chunk)
+                # With the size known, zipfile switches to zip64 for media over 2 GiB
+                entry.file_size = os.fstat(src.fileno()).st_size
+                with self._zip.open(entry, "w") as dst:
+                    while chunk:
+                        dst.write(chunk)
+                        chunk = src.read(1 << 20)
+        self._zip.close()
+        os.replace(self._tmp_path, self._output_path)
+
+    def _entry(self, name, sample=b""):
+        """ZipInfo of a part; timestamped with the build date when reproducible"""
+        date = self._date if self.options["reproducible"] else datetime.now()
+        return zip_info(name, date, sample, self.options["deflate_level"])
+
+    def _add_picture(self, block):
+        if not os.path.exists(block.path):
+            return
+        options = self.options
+        path = prepare_image(block.path, os.path.join(options["cache_dir"], "images"),
+                             block.width_inches, options["image_dpi"], options["image_format"])
+        with open(path, "rb") as f:
+            image = DocxImage.from_blob(f.read())
+        if image.sha1 not in self._images:
+            partname = f"word/media/image{len(self._images) + 1}.{image.ext}"
+            self._images[image.sha1] = (f"rId{self._next_rId}", partname, path, image.content_type)
+            self._next_rId += 1
+        rId = self._images[image.sha1][0]
+
+        self._shape_id += 1
+        cx, cy = image.scaled_dimensions(Inches(block.width_inches), None)
+        # python-docx names a picture added from a path after the file
+        inline = CT_Inline.new_pic_inline(self._shape_id, rId, os.path.basename(path), cx, cy)
+        paragraph = add_styled_paragraph(self._doc)
+        paragraph.add_run()._r.add_drawing(inline)
+        paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    def _drain_body(self):
+        body = self._doc.element.body
+        for element in list(body):
+            if element.tag == qn("w:sectPr"):
+                continue
+            self._write(self._serialize(element))
+            body.remove(element)
+
+    def _serialize(self, element):
+        """Serialize a body element without repeating the root's namespaces"""
+        xml = etree.tostring(element, encoding="unicode")
+        start_tag_end = xml.index(">")
+        start_tag = _XMLNS.sub(
+            lambda m: "" if self._root_ns.get(m.group(1)) == m.group(2) else m.group(0),
+            xml[:start_tag_end])
+        return start_tag + xml[start_tag_end:]
+
+    def _write(self, text):
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if self._buffered >= FLUSH_BYTES:
+            self._flush()
+
+    def _flush(self):
+        self._stream.write("".join(self._buffer).encode("utf-8"))
+        self._buffer = []
+        self._buffered = 0
+
+    def _first_free_rId(self):
+        used = [int(rId[3:]) for rId in self._doc.part.rels if rId.startswith("rId")]
+        return max(used, default=0) + 1
+
+    def _add_image_rels(self, data):
+        rels = parse_xml(data)
+        for rId, partname, path, content_type in self._images.values():
+            rel = etree.SubElement(rels, f"{{{NAMESPACE.OPC_RELATIONSHIPS}}}Relationship")
+            rel.set("Id", rId)
+            rel.set("Type", RT.IMAGE)
+            rel.set("Target", partname[len("word/"):])
+        return serialize_part_xml(rels)
+
+    def _add_image_types(self, data):
+        types = parse_xml(data)
+        tag = f"{{{NAMESPACE.OPC_CONTENT_TYPES}}}Default"
+        defaults = {default.get("Extension"): default for default in types.iterchildren(tag)}
+        for rId, partname, path, content_type in self._images.values():
+            ext = partname.rsplit(".", 1)[1]
+            if ext not in defaults:
+                defaults[ext] = etree.Element(tag, Extension=ext, ContentType=content_type)
+        # Keep python-docx's ordering of defaults by extension
+        for ext in sorted(defaults, reverse=True):
+            types.insert(0, defaults[ext])
+        return serialize_part_xml(types)
+
+
+def render_docx_streaming(sections, output_path, options):
+    """Renderer for the "docx-stream" format
+
+    sections, and each section's blocks, may be generators; nothing but
+    the block being rendered is held in memory.
+    """
+    with StreamingDocxWriter(output_path, options) as writer:
+        for section in sections:
+            writer.add_blocks(section.blocks)
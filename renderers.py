@@ -0,0 +1,75 @@
+"""Registry of output renderers and parallel rendering of the document model
+
+A renderer is a function render(sections, output_path, options) that
+writes one output format and returns the names of the sections it had to
+render (or None). Renderers are registered by module and function name so
+that worker processes, and the parent, only import the ones in use, along
+with the file extension of their output.
+"""
+import importlib
+import pickle
+
+from cache_keys import source_digest
+
+RENDERERS = {
+    "docx": ("generate_documentation", "render_docx", "docx"),
+    "docx-stream": ("ooxml_stream", "render_docx_streaming", "docx"),
+    "html": ("html_renderer", "render_html", "html"),
+    "md": ("markdown_renderer", "render_markdown", "md"),
+}
+
+
+def register_renderer(fmt, module, function, extension=None):
+    """Register an output format rendered by module.function"""
+    RENDERERS[fmt] = (module, function, extension or fmt)
+
+
+def extension(fmt):
+    """File extension of a format's output"""
+    return RENDERERS[fmt][2]
+
+
+def renderer_digest(fmt):
+    """Hash of the renderer module's source, so renderer changes invalidate outputs"""
+    module, function, ext = RENDERERS[fmt]
+    return f"{fmt}:{source_digest([module])}"
+
+
+def run_renderer(fmt, sections, output_path, options):
+    """Import and run the renderer registered for fmt"""
+    module, function, ext = RENDERERS[fmt]
+    render = getattr(importlib.import_module(module), function)
+    return render(sections, output_path, options)
+
+
+def _run_in_worker(fmt, sections, output_path, options):
+    """run_renderer() in a worker process, raising only errors that can be sent back"""
+    try:
+        return run_renderer(fmt, sections, output_path, options)
+    except Exception as e:
+        try:
+            pickle.dumps(e)
+        except Exception:
+            # Such as lxml's XMLSyntaxError, whose error log does not pickle;
+            # the parent would only see the TypeError from pickling it
+            raise RuntimeError(f"{fmt} renderer failed: {type(e).__name__}: {e}")
+        raise
+
+
+def render_formats(sections, outputs, options, max_workers=None):
+    """Render the same model to every format in outputs ({fmt: path})
+
+    With more than one format each renderer runs in its own process, so all
+    formats are done in the wall time of the slowest one; max_workers=1
+    renders them one after another in this process. Returns {fmt:
+    result}; a failing renderer raises after the others have finished.
+    """
+    if len(outputs) == 1 or max_workers == 1:
+        return {fmt: run_renderer(fmt, sections, path, options)
+                for fmt, path in outputs.items()}
+
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=max_workers or len(outputs)) as pool:
+        futures = {fmt: pool.submit(_run_in_worker, fmt, sections, path, options)
+                   for fmt, path in outputs.items()}
+        return {fmt: future.result() for fmt, future in futures.items()}
@@ -0,0 +1,330 @@
+"""Catalog of the chatbot's hardcoded responses, compiled to a multi-pattern index
+
+response_catalog.json is the one list of canned answers: the stub server,
+section 10 of the documentation and run.bat are generated from it. Each
+entry has an "id", a "description", "exact" and "contains" patterns,
+optional "examples" (test queries, default: its patterns) and the
+"response". As in ChatService, a message is lowercased and trimmed, and
+answered by the first entry in catalog order that has an exact pattern
+equal to it or a contains pattern inside it.
+
+Checking every pattern in turn costs time proportional to the size of the
+catalog on every message. compile_catalog() instead builds one
+Aho-Corasick automaton over all patterns: exact patterns are added
+between STX and ETX, and messages are scanned between the same markers,
+so a single pass over the message finds every pattern in it, however
+many there are. Each state records the first entry matched there or
+anywhere along its failure links, so the answer is the smallest entry
+number seen on the way.
+
+write_index() serializes the automaton to a data file a service can load
+without the catalog. All integers are big-endian unsigned 32-bit, as
+Java's DataInputStream reads them:
+
+    magic "RCAT", version (16 bits), flags (16 bits), SHA-256 of the catalog
+    states, edges, entries
+    edge_start[states + 1]  edges of state s: edge_start[s] .. edge_start[s + 1] - 1
+    edge_char[edges]        code point of each edge, sorted within a state
+    edge_target[edges]      state each edge leads to
+    fail[states]            failure link of each state
+    first[states]           first entry matched at each state, 0xFFFFFFFF for none
+    text_offsets[2 * entries + 1], then UTF-8 text: entry i's id is text
+                            2i and its response text 2i + 1
+
+    python response_catalog.py compile            write response_catalog.bin, update run.bat
+    python response_catalog.py match "What is Maven?"
+"""
+import argparse
+import hashlib
+import json
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+CATALOG_PATH = os.path.join(ROOT, "response_catalog.json")
+INDEX_PATH = os.path.join(ROOT, "response_catalog.bin")
+RUN_BAT = os.path.join(ROOT, "run.bat")
+
+MAGIC = b"RCAT"
+VERSION = 1
+_HEADER = struct.Struct(">4sHH32s3L")
+
+# Exact patterns are matched between these, which never occur in messages
+START, END = "\x02", "\x03"
+UNMATCHED = 0xFFFFFFFF
+_CHAR_BITS = 21  # enough for any code point
+
+# run.bat lines between these markers list the catalog's test queries
+RUN_BAT_BEGIN = "REM BEGIN RESPONSE CATALOG (generated by response_catalog.py compile)"
+RUN_BAT_END = "REM END RESPONSE CATALOG"
+
+
+def normalize(message):
+    """A message as ChatService compares it"""
+    return message.lower().strip()
+
+
+def entry_patterns(entry):
+    """Patterns of a catalog entry, as they are added to the automaton"""
+    return ([f"{START}{normalize(pattern)}{END}" for pattern in entry.get("exact", ())]
+            + [pattern.lower() for pattern in entry.get("contains", ())])
+
+
+def entry_examples(entry):
+    """Test queries documented for an entry"""
+    return list(entry.get("examples") or [*entry.get("exact", ()), *entry.get("contains", ())])
+
+
+def catalog_digest(path=CATALOG_PATH):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).digest()
+
+
+def load_catalog(path=CATALOG_PATH):
+    """The catalog's entries, checked"""
+    with open(path, encoding="utf-8") as f:
+        entries = json.load(f)["entries"]
+    for entry in entries:
+        patterns = [*entry.get("exact", ()), *entry.get("contains", ())]
+        if not patterns:
+            raise ValueError(f"catalog entry {entry.get('id')!r} has no patterns")
+        if any(not pattern.strip() or START in pattern or END in pattern for pattern in patterns):
+            raise ValueError(f"catalog entry {entry.get('id')!r} has an invalid pattern")
+    return entries
+
+
+def linear_match(entries, message):
+    """Index of the first entry matching message, checking one pattern after another
+
+    The way ChatService's chain of equals() and contains() calls works;
+    the reference compile_catalog() is measured against.
+    """
+    lower = normalize(message)
+    for number, entry in enumerate(entries):
+        if lower in map(normalize, entry.get("exact", ())) or any(pattern.lower() in lower
+                                                  for pattern in entry.get("contains", ())):
+            return number
+    return None
+
+
+class ResponseIndex:
+    """Aho-Corasick automaton over a catalog's patterns, in flat arrays"""
+
+    def __init__(self, edge_start, edge_char, edge_target, fail, first, ids, responses,
+                 digest=b""):
+        self.edge_start = edge_start
+        self.edge_char = edge_char
+        self.edge_target = edge_target
+        self.fail = fail
+        self.first = first
+        self.ids = ids
+        self.responses = responses
+        self.digest = digest
+
+    @property
+    def states(self):
+        return len(self.fail)
+
+    def match(self, message):
+        """Index of the first catalog entry matching message, or None"""
+        edge_start, edge_char, edge_target = self.edge_start, self.edge_char, self.edge_target
+        fail, first = self.fail, self.first
+        best = UNMATCHED
+        state = 0
+        for char in f"{START}{normalize(message)}{END}":
+            code = ord(char)
+            while True:
+                end = edge_start[state + 1]
+                i = bisect_left(edge_char, code, edge_start[state], end)
+                if i < end and edge_char[i] == code:
+                    state = edge_target[i]
+                    break
+                if not state:
+                    break
+                state = fail[state]
+            if first[state] < best:
+                best = first[state]
+        return None if best == UNMATCHED else best
+
+    def response(self, message):
+        """The catalog's response to message, or None"""
+        number = self.match(message)
+        return None if number is None else self.responses[number]
+
+
+def compile_catalog(entries, digest=b""):
+    """Build the ResponseIndex of a catalog's entries"""
+    edges = {}  # state << _CHAR_BITS | code point -> state
+    first = [UNMATCHED]
+    depth = [0]
+    for number, entry in enumerate(entries):
+        for pattern in entry_patterns(entry):
+            state = 0
+            for char in pattern:
+                key = state << _CHAR_BITS | ord(char)
+                target = edges.get(key)
+                if target is None:
+                    target = edges[key] = len(first)
+                    first.append(UNMATCHED)
+                    depth.append(depth[state] + 1)
+                state = target
+            first[state] = min(first[state], number)
+
+    states = len(first)
+    keys = sorted(edges)
+    edge_char = array("I", [key & ((1 << _CHAR_BITS) - 1) for key in keys])
+    edge_target = array("I", [edges[key] for key in keys])
+    edge_start = array("I", [0]) * (states + 1)
+    for key in keys:
+        edge_start[(key >> _CHAR_BITS) + 1] += 1
+    for state in range(states):
+        edge_start[state + 1] += edge_start[state]
+
+    # Failure links in breadth-first order, so a state's link, which is
+    # shallower, is final before the link's matches are merged into it
+    fail = array("I", [0]) * states
+    for state in sorted(range(1, states), key=depth.__getitem__):
+        for i in range(edge_start[state], edge_start[state + 1]):
+            code, child = edge_char[i], edge_target[i]
+            link = fail[state]
+            while True:
+                target = edges.get(link << _CHAR_BITS | code)
+                if target is not None or not link:
+                    break
+                link = fail[link]
+            fail[child] = target or 0
+            first[child] = min(first[child], first[fail[child]])
+
+    return ResponseIndex(edge_start, edge_char, edge_target, fail, array("I", first),
+                         [entry["id"] for entry in entries],
+                         [entry["response"] for entry in entries], digest)
+
+
+def _big_endian(values):
+    values = array("I", values)
+    if sys.byteorder == "little":
+        values.byteswap()
+    return values.tobytes()
+
+
+def write_index(index, path=INDEX_PATH):
+    """Serialize index to the data file described in the module docstring"""
+    from cache_keys import write_atomic
+
+    texts = [text.encode("utf-8") for pair in zip(index.ids, index.responses) for text in pair]
+    offsets = [0]
+    for text in texts:
+        offsets.append(offsets[-1] + len(text))
+    data = [_HEADER.pack(MAGIC, VERSION, 0, index.digest.ljust(32, b"\0"), index.states,
+                         len(index.edge_char), len(index.ids))]
+    for values in (index.edge_start, index.edge_char, index.edge_target, index.fail,
+                   index.first, offsets):
+        data.append(_big_endian(values))
+    data.extend(texts)
+    write_atomic(path, b"".join(data))
+
+
+def read_index(path=INDEX_PATH):
+    """Load a ResponseIndex from its data file"""
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, flags, digest, states, edges, entries = _HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a version {VERSION} response index")
+    position = _HEADER.size
+    arrays = []
+    for count in (states + 1, edges, edges, states, states, 2 * entries + 1):
+        values = array("I")
+        values.frombytes(data[position:position + 4 * count])
+        if sys.byteorder == "little":
+            values.byteswap()
+        arrays.append(values)
+        position += 4 * count
+    *automaton, offsets = arrays
+    texts = [data[position + start:position + end].decode("utf-8")
+             for start, end in zip(offsets, offsets[1:])]
+    return ResponseIndex(*automaton, texts[0::2], texts[1::2], digest)
+
+
+def load_index(catalog_path=CATALOG_PATH, index_path=INDEX_PATH):
+    """The catalog's index: its data file when it was compiled from this
+    catalog, else compiled from the catalog"""
+    digest = catalog_digest(catalog_path)
+    try:
+        index = read_index(index_path)
+    except (OSError, ValueError, struct.error):
+        index = None
+    if index is None or index.digest != digest:
+        index = compile_catalog(load_catalog(catalog_path), digest)
+    return index
+
+
+def catalog_table(entries):
+    """(header, rows) of the catalog for the documentation"""
+    rows = []
+    for entry in entries:
+        match = ("Exact" if entry.get("exact") and not entry.get("contains")
+                 else "Contains" if not entry.get("exact") else "Exact or contains")
+        rows.append((" / ".join(entry_examples(entry)), match, entry["description"]))
+    return ("Test query", "Match", "Response"), tuple(rows)
+
+
+def _batch_echo(text):
+    for char in "^&|<>":
+        text = text.replace(char, "^" + char)
+    return "echo " + text.replace("%", "%%")
+
+
+def update_run_bat(entries, path=RUN_BAT):
+    """Regenerate the test queries run.bat lists; False if it has no catalog block"""
+    from cache_keys import write_atomic
+
+    with open(path, "rb") as f:
+        lines = f.read().decode("utf-8").split("\r\n")
+    try:
+        begin, end = lines.index(RUN_BAT_BEGIN), lines.index(RUN_BAT_END)
+    except ValueError:
+        return False
+    queries = []
+    for entry in entries:
+        examples = " / ".join(f"'{example}'" for example in entry_examples(entry))
+        queries.append(_batch_echo(f"       * {examples} - {entry['description']}"))
+    lines[begin + 1:end] = queries
+    write_atomic(path, "\r\n".join(lines).encode("utf-8"))
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile the hardcoded response catalog")
+    commands = parser.add_subparsers(dest="command", required=True)
+    compile_command = commands.add_parser("compile", help="write the index data file and "
+                                                          "update run.bat")
+    compile_command.add_argument("--catalog", default=CATALOG_PATH)
+    compile_command.add_argument("--output", default=INDEX_PATH)
+    match_command = commands.add_parser("match", help="answer a message from the catalog")
+    match_command.add_argument("message")
+    match_command.add_argument("--catalog", default=CATALOG_PATH)
+    args = parser.parse_args(argv)
+
+    if args.command == "compile":
+        entries = load_catalog(args.catalog)
+        index = compile_catalog(entries, catalog_digest(args.catalog))
+        write_index(index, args.output)
+        print(f"Compiled {len(entries)} entries into {index.states} states: {args.output}")
+        if update_run_bat(entries):
+            print(f"Updated the test queries in {RUN_BAT}")
+    else:
+        index = load_index(args.catalog)
+        number = index.match(args.message)
+        if number is None:
+            print("No hardcoded response; the message would go to Gemini")
+            return 1
+        print(f"[{index.ids[number]}] {index.responses[number]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -38,12 +38,15 @@ echo [INFO] Application started! Open your browser and navigate to:
 echo        http://localhost:8080
 echo.
 echo [TEST] Test the chatbot with these hardcoded responses:
-echo        * 'Hello' or 'Hi' - Greeting responses
-echo        * 'How are you?' - How are you responses
-echo        * 'What is DevOps?' - DevOps explanation
-echo        * 'What is Maven?' - Maven explanation
-echo        * 'What is Spring Boot?' - Spring Boot explanation
-echo        * 'Help' - Show available commands
+REM BEGIN RESPONSE CATALOG (generated by response_catalog.py compile)
+echo        * 'hello' / 'hi' / 'hey' - Greeting responses
+echo        * 'what is devops?' - Detailed DevOps explanation
+echo        * 'what is maven?' - Maven build tool information
+echo        * 'what is spring boot?' - Spring Boot framework details
+echo        * 'how are you?' - Friendly response
+echo        * 'help' - List of available topics
+echo        * 'thank you' - Acknowledgment response
+REM END RESPONSE CATALOG
 echo.
 echo [STOP] Press Ctrl+C to stop the application
 echo ----------------------------------------
@@ -0,0 +1,127 @@
+"""Syntax highlighting for code blocks, shared by every renderer
+
+highlight() splits a snippet into (text, token) spans, where token is one
+of the classes in Theme.syntax or None for plain text. Adjacent spans with
+the same token, and whitespace between tokens, are merged so highlighting
+adds as few runs as possible. Results are memoized by language and snippet
+hash, keeping the MAX_MEMOIZED most recently used so a long-running daemon
+or watch session does not grow without bound. Pygments is imported on the
+first highlighted block; without it, or for languages not listed here,
+code is returned as a single plain span.
+highlight_lines() gives the same spans line by line, for listings with a
+paragraph per line.
+"""
+import hashlib
+import os
+from collections import OrderedDict
+
+# Code block language -> Pygments lexer
+LANGUAGES = {
+    "java": "java",
+    "javascript": "javascript",
+    "xml": "xml",
+    "properties": "properties",
+    "bash": "bash",
+    "batch": "batch",
+}
+
+# Label file extension -> language, for blocks that don't name one
+_EXTENSIONS = {
+    ".java": "java",
+    ".js": "javascript",
+    ".xml": "xml",
+    ".properties": "properties",
+    ".sh": "bash",
+    ".bat": "batch",
+    ".cmd": "batch",
+}
+
+# Pygments token types -> token classes, most specific first
+_TOKEN_CLASSES = (
+    ("Token.Name.Decorator", "annotation"),
+    ("Token.Name.Tag", "tag"),
+    ("Token.Name.Attribute", "attribute"),
+    ("Token.Keyword.Type", "type"),
+    ("Token.Keyword", "keyword"),
+    ("Token.Name.Builtin", "keyword"),
+    ("Token.Literal.String", "string"),
+    ("Token.Literal.Number", "number"),
+    ("Token.Comment", "comment"),
+)
+
+# Highlighted snippets kept, well above the code blocks of one document
+MAX_MEMOIZED = 1024
+
+_highlighted = OrderedDict()  # least recently used first
+_token_classes = {}
+_lexers = {}
+
+
+def code_language(block):
+    """Language of a CodeBlock, from its language or its label's file name"""
+    if block.language:
+        return block.language
+    name = block.label.split()[0] if block.label else ""
+    return _EXTENSIONS.get(os.path.splitext(name)[1].lower(), "")
+
+
+def _token_class(ttype):
+    if ttype not in _token_classes:
+        name = str(ttype)
+        _token_classes[ttype] = next((token for prefix, token in _TOKEN_CLASSES
+                                      if name == prefix or name.startswith(prefix + ".")), None)
+    return _token_classes[ttype]
+
+
+def _lexer(language):
+    if language not in _lexers:
+        try:
+            from pygments.lexers import get_lexer_by_name
+        except ImportError:
+            _lexers[language] = None
+        else:
+            _lexers[language] = get_lexer_by_name(LANGUAGES[language], stripnl=False,
+                                                  ensurenl=False)
+    return _lexers[language]
+
+
+def _tokenize(code, language):
+    lexer = _lexer(language) if language in LANGUAGES else None
+    if lexer is None:
+        return ((code, None),)
+    spans = []
+    for ttype, value in lexer.get_tokens(code):
+        token = _token_class(ttype)
+        if spans and (spans[-1][1] == token or not value.strip()):
+            # Whitespace takes whatever formatting precedes it
+            spans[-1][0] += value
+        elif spans and not spans[-1][0].strip():
+            spans[-1] = [spans[-1][0] + value, token]
+        else:
+            spans.append([value, token])
+    return tuple((value, token) for value, token in spans)
+
+
+def highlight(code, language):
+    """(text, token) spans of code; token is None for plain text"""
+    key = (language, hashlib.sha1(code.encode("utf-8")).hexdigest())
+    if key in _highlighted:
+        _highlighted.move_to_end(key)
+        return _highlighted[key]
+    spans = _highlighted[key] = _tokenize(code, language)
+    if len(_highlighted) > MAX_MEMOIZED:
+        _highlighted.popitem(last=False)
+    return spans
+
+
+def highlight_lines(code, language):
+    """highlight() split at line breaks: one tuple of (text, token) spans per line"""
+    lines = [[]]
+    for span, token in highlight(code, language):
+        for i, part in enumerate(span.split("\n")):
+            if i:
+                lines.append([])
+            if part:
+                lines[-1].append((part, token))
+    return [tuple(line) for line in lines]
+
@@ -0,0 +1,34 @@
+import zipfile
+
+from docx_package import part_digests, update_package, write_package
+
+PARTS = {"[Content_Types].xml": b"<Types/>" * 50,
+         "word/document.xml": b"<w:document>" + b"a" * 100000 + b"</w:document>",
+         "word/media/image1.png": bytes(range(256)) * 2000}
+
+
+def read_parts(path):
+    with zipfile.ZipFile(path) as package:
+        return {name: package.read(name) for name in package.namelist()}
+
+
+def test_update_reads_no_entry_data(tmp_path, monkeypatch):
+    path = tmp_path / "out.docx"
+    path.write_bytes(write_package(PARTS))
+    parts = {**PARTS, "word/document.xml": PARTS["word/document.xml"].replace(b"a", b"b")}
+
+    def no_reads(*args, **kwargs):
+        raise AssertionError("update_package read an entry")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(zipfile.ZipFile, "open", no_reads)
+        assert update_package(str(path), parts, part_digests(PARTS)) == (2, 1)
+    assert read_parts(path) == parts
+
+
+def test_update_refuses_package_other_than_recorded(tmp_path):
+    path = tmp_path / "out.docx"
+    path.write_bytes(write_package(PARTS))
+    recorded = part_digests({"word/document.xml": PARTS["word/document.xml"]})
+    assert update_package(str(path), PARTS, recorded) is None
+    assert read_parts(path) == PARTS
@@ -0,0 +1,51 @@
+import os
+import random
+
+import pytest
+
+from image_pipeline import prepare_image, target_width_px
+
+Image = pytest.importorskip("PIL.Image")
+ImageDraw = pytest.importorskip("PIL.ImageDraw")
+
+REPO_SCREENSHOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                               "Screenshot 2025-12-15 124938.png")
+
+
+def screenshot(path, width=1600, height=1000, mode="RGBA"):
+    """A flat-colored UI-like image, the kind that grows when resampled"""
+    rng = random.Random(42)
+    img = Image.new(mode, (width, height), "white")
+    draw = ImageDraw.Draw(img)
+    for _ in range(300):
+        x, y = rng.randrange(width), rng.randrange(height)
+        color = rng.choice(["#0066cc", "#00994c", "#646464", "#f0f0f0", "black"])
+        draw.rectangle((x, y, x + rng.randrange(5, 200), y + rng.randrange(2, 30)), fill=color)
+        draw.text((x, y), "Hello, chatbot", fill="black")
+    img.save(path, optimize=True)
+    return path
+
+
+def noise(path, width=1600, height=1000):
+    rng = random.Random(7)
+    img = Image.frombytes("RGB", (width, height), rng.randbytes(width * height * 3))
+    img.save(path)
+    return path
+
+
+@pytest.mark.parametrize("make", [screenshot, noise, lambda path: REPO_SCREENSHOT])
+def test_downscaled_image_is_never_larger_than_its_source(tmp_path, make):
+    source = make(str(tmp_path / "source.png"))
+    if not os.path.exists(source):
+        pytest.skip("screenshot not checked out")
+    prepared = prepare_image(source, str(tmp_path / "cache"), width_inches=6, dpi=150)
+    assert os.path.getsize(prepared) <= os.path.getsize(source)
+
+
+def test_repo_screenshot_is_downscaled(tmp_path):
+    if not os.path.exists(REPO_SCREENSHOT):
+        pytest.skip("screenshot not checked out")
+    prepared = prepare_image(REPO_SCREENSHOT, str(tmp_path), width_inches=6, dpi=150)
+    with Image.open(prepared) as img:
+        assert img.width == target_width_px(6, 150)
+    assert os.path.getsize(prepared) < os.path.getsize(REPO_SCREENSHOT)
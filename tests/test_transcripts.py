@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+import doc_content
+from doc_build import default_options
+from doc_model import CodeBlock, Section
+from renderers import run_renderer
+
+pytest.importorskip("docx")
+
+# Valid JSON, but the \u000b, \u0001 and the lone surrogate are not XML characters
+LOG_LINES = [
+    {"conversation_id": "c-\u0001", "timestamp": "2026-01-05T10:00:00Z", "role": "user",
+     "text": "first\u000bline \u0001and \ud800done"},
+    {"conversation_id": "c-\u0001", "timestamp": "2026-01-05T10:00:05Z", "role": "bot",
+     "text": "answer\u001f"},
+]
+
+
+@pytest.fixture
+def sections(tmp_path):
+    log = tmp_path / "chat.jsonl"
+    log.write_text("".join(json.dumps(line) + "\n" for line in LOG_LINES), encoding="utf-8")
+    blocks = doc_content.transcript_blocks({"logs": [str(log)]}, doc_content.CATALOG_PATH)
+    code = CodeBlock("int a;\f\nint b;", "Paged.java", "java")
+    return [Section("transcripts", tuple(blocks) + (code,))]
+
+
+@pytest.mark.parametrize("fmt", ["docx", "docx-stream", "html", "md"])
+def test_control_characters_in_logs_are_dropped(tmp_path, sections, fmt):
+    output = tmp_path / f"out-{fmt}.{'docx' if fmt.startswith('docx') else fmt}"
+    options = default_options(str(tmp_path / "cache"), section_workers=1)
+    run_renderer(fmt, sections, str(output), options)
+
+    if fmt.startswith("docx"):
+        import docx
+        text = "\n".join(p.text for p in docx.Document(str(output)).paragraphs)
+        # XML cannot hold the code block's form feed either
+        assert "int a;\nint b;" in text
+    else:
+        text = output.read_text(encoding="utf-8")
+    assert "firstline and done" in text
+    assert "Conversation c-" in text
+    assert not any(char in text for char in "\u000b\u0001\u001f")
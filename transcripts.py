@@ -0,0 +1,287 @@
+"""Chat transcripts from JSONL conversation logs, read as a stream
+
+Each line of a log is one JSON object, either a single turn
+
+    {"conversation_id": "c-42", "timestamp": "2026-01-05T10:12:03Z",
+     "role": "user", "text": "What is Maven?"}
+
+or an exchange of a message and the answer to it
+
+    {"conversation_id": "c-42", "timestamp": 1767607923, "message": "What is Maven?",
+     "response": "Maven is a build automation tool...", "source": "hardcoded"}
+
+"conversation" or "session_id" may stand for "conversation_id", "time"
+for "timestamp" (ISO 8601 or seconds since the epoch, UTC unless an
+offset is given), "content" or "message" for "text", and "assistant" or
+"model" for the "bot" role. A bot turn is hardcoded when its "source"
+says so or, without a source, when its text is one of the response
+catalog's answers; anything else was answered by the model. Blank lines
+and lines that are not JSON objects are counted and skipped, so a log
+being written can be read. Control characters and lone surrogates, which
+JSON allows but XML does not, are dropped from texts and IDs.
+
+Logs are read a line at a time, gzip-compressed when the name ends in
+.gz, so a log of any size costs the memory of one line plus what is
+kept: the statistics, the IDs of the conversations seen, and the turns
+of at most max_turns turns for the appendix. Filtering by keyword keeps
+whole conversations with a turn containing it, which takes a first pass
+to find them.
+
+    python transcripts.py logs/chat-2026-01.jsonl.gz --since 2026-01-01 --keyword maven
+"""
+import argparse
+import gzip
+import json
+import sys
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+
+from doc_model import xml_text
+from response_catalog import CATALOG_PATH, load_catalog
+
+# Turns kept for the appendix, over all conversations; later turns are
+# only counted, which keeps the document a size Word opens comfortably
+MAX_TURNS = 2000
+# A page of the appendix holds at most this many turns
+TURNS_PER_PAGE = 40
+# Longer turns are cut to this many characters in the appendix
+MAX_TURN_CHARS = 2000
+
+_CONVERSATION_KEYS = ("conversation_id", "conversation", "session_id")
+_TIME_KEYS = ("timestamp", "time")
+_TEXT_KEYS = ("text", "content", "message")
+_ROLES = {"user": "user", "bot": "bot", "assistant": "bot", "model": "bot"}
+
+
+@dataclass(frozen=True)
+class Turn:
+    conversation: str
+    time: datetime  # naive UTC, or None
+    role: str  # "user" or "bot"
+    text: str
+    hardcoded: bool = False  # bot turns: answered from the response catalog
+
+
+def _first(record, keys):
+    for key in keys:
+        if record.get(key) is not None:
+            return record[key]
+    return None
+
+
+def parse_time(value):
+    """A log timestamp as a naive UTC datetime, or None"""
+    try:
+        if isinstance(value, (int, float)):
+            return datetime.fromtimestamp(value, timezone.utc).replace(tzinfo=None)
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError, OverflowError, OSError):
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _open(path):
+    return gzip.open(path, "rb") if path.endswith(".gz") else open(path, "rb")
+
+
+class TranscriptReader:
+    """Turns of JSONL conversation logs, one line at a time"""
+
+    def __init__(self, catalog_path=CATALOG_PATH):
+        self.hardcoded_responses = {entry["response"] for entry in load_catalog(catalog_path)}
+        self.skipped = 0  # lines that are not turns
+
+    def turns(self, paths):
+        for path in paths:
+            with _open(path) as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        record = None
+                    if not isinstance(record, dict):
+                        self.skipped += 1
+                        continue
+                    yield from self._record_turns(record)
+
+    def _record_turns(self, record):
+        conversation = xml_text(str(_first(record, _CONVERSATION_KEYS) or ""))
+        time = parse_time(_first(record, _TIME_KEYS))
+        if "response" in record:
+            pairs = [("user", record.get("message")), ("bot", record["response"])]
+        else:
+            pairs = [(_ROLES.get(str(record.get("role", "")).lower()), _first(record, _TEXT_KEYS))]
+        for role, text in pairs:
+            if role is None or not isinstance(text, str):
+                self.skipped += 1
+                continue
+            source = record.get("source")
+            hardcoded = role == "bot" and (source == "hardcoded" if source
+                                           else text in self.hardcoded_responses)
+            yield Turn(conversation, time, role, xml_text(text), hardcoded)
+
+
+class TranscriptFilter:
+    """Which turns the appendix covers: by date, conversation ID and keyword
+
+    since and until are dates, both included; a turn without a timestamp
+    passes only when neither is set.
+    """
+
+    def __init__(self, since=None, until=None, conversations=None, keyword=None):
+        self.since = since
+        self.until = until
+        self.conversations = set(conversations) if conversations else None
+        self.keyword = keyword.lower() if keyword else None
+        self.matching = None  # conversations containing the keyword, see find_matching()
+
+    def turn_passes(self, turn):
+        """Whether a turn passes the date and conversation filters"""
+        if self.conversations is not None and turn.conversation not in self.conversations:
+            return False
+        if self.since or self.until:
+            if turn.time is None:
+                return False
+            day = turn.time.date()
+            if (self.since and day < self.since) or (self.until and day > self.until):
+                return False
+        return True
+
+    def find_matching(self, turns):
+        """First pass for a keyword: the conversations with a passing turn containing it"""
+        self.matching = {turn.conversation for turn in turns
+                         if self.turn_passes(turn) and self.keyword in turn.text.lower()}
+
+    def __call__(self, turn):
+        return self.turn_passes(turn) and (self.matching is None
+                                           or turn.conversation in self.matching)
+
+
+class TranscriptStats:
+    """Aggregate statistics of a stream of turns"""
+
+    def __init__(self):
+        self.conversations = set()
+        self.user_turns = 0
+        self.bot_turns = 0
+        self.hardcoded = 0
+        self.response_chars = 0
+        self.longest_response = 0
+        self.message_chars = 0
+        self.first = None
+        self.last = None
+
+    def add(self, turn):
+        self.conversations.add(turn.conversation)
+        if turn.role == "user":
+            self.user_turns += 1
+            self.message_chars += len(turn.text)
+        else:
+            self.bot_turns += 1
+            self.hardcoded += turn.hardcoded
+            self.response_chars += len(turn.text)
+            self.longest_response = max(self.longest_response, len(turn.text))
+        if turn.time is not None:
+            self.first = min(self.first or turn.time, turn.time)
+            self.last = max(self.last or turn.time, turn.time)
+
+    def table(self, skipped=0):
+        """(header, rows) for the documentation"""
+        def share(count):
+            return f"{count:,} ({count / self.bot_turns:.0%})" if self.bot_turns else "0"
+
+        rows = [
+            ("Conversations", f"{len(self.conversations):,}"),
+            ("User turns", f"{self.user_turns:,}"),
+            ("Bot turns", f"{self.bot_turns:,}"),
+            ("Hardcoded answers", share(self.hardcoded)),
+            ("Model answers", share(self.bot_turns - self.hardcoded)),
+            ("Mean message length", f"{self.message_chars / max(self.user_turns, 1):,.0f} chars"),
+            ("Mean response length", f"{self.response_chars / max(self.bot_turns, 1):,.0f} chars"),
+            ("Longest response", f"{self.longest_response:,} chars"),
+        ]
+        if self.first:
+            rows.append(("Period",
+                         f"{self.first:%Y-%m-%d %H:%M} to {self.last:%Y-%m-%d %H:%M} UTC"))
+        if skipped:
+            rows.append(("Lines skipped", f"{skipped:,}"))
+        return ("Statistic", "Value"), tuple(rows)
+
+
+def read_transcripts(paths, transcript_filter=None, max_turns=MAX_TURNS,
+                     catalog_path=CATALOG_PATH):
+    """(conversations, stats, skipped lines) of the logs at paths
+
+    conversations maps each conversation ID, in order of first appearance,
+    to its first turns that fit in max_turns over all conversations; the
+    statistics cover every turn passing transcript_filter.
+    """
+    reader = TranscriptReader(catalog_path)
+    transcript_filter = transcript_filter or TranscriptFilter()
+    if transcript_filter.keyword:
+        transcript_filter.find_matching(reader.turns(paths))
+        reader.skipped = 0
+    stats = TranscriptStats()
+    conversations = {}
+    kept = 0
+    for turn in reader.turns(paths):
+        if not transcript_filter(turn):
+            continue
+        stats.add(turn)
+        if kept < max_turns:
+            conversations.setdefault(turn.conversation, []).append(turn)
+            kept += 1
+    return conversations, stats, reader.skipped
+
+
+def transcript_pages(conversations, turns_per_page=TURNS_PER_PAGE, max_chars=MAX_TURN_CHARS):
+    """Split conversations into pages of at most turns_per_page turns
+
+    Yields (conversation ID, part, turns) pieces, turns being
+    (role, text, note) for a ChatTranscript, and None between pages. A
+    conversation starts a new page unless it fits in what is left of the
+    current one; part counts the pieces of a conversation split across
+    pages, from 1.
+    """
+    room = turns_per_page
+    for conversation, turns in conversations.items():
+        if len(turns) > room and room < turns_per_page:
+            yield None
+            room = turns_per_page
+        for part, start in enumerate(range(0, len(turns), turns_per_page), 1):
+            if part > 1:
+                yield None
+                room = turns_per_page
+            piece = turns[start:start + turns_per_page]
+            yield conversation, part, tuple(
+                (turn.role, turn.text if len(turn.text) <= max_chars
+                 else turn.text[:max_chars].rstrip() + " [...]",
+                 f"{turn.time:%Y-%m-%d %H:%M}" if turn.time else "")
+                for turn in piece)
+            room -= len(piece)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize JSONL chat conversation logs")
+    parser.add_argument("logs", nargs="+", help="JSONL logs, .gz for gzip")
+    parser.add_argument("--since", type=date.fromisoformat, help="first day, YYYY-MM-DD")
+    parser.add_argument("--until", type=date.fromisoformat, help="last day, YYYY-MM-DD")
+    parser.add_argument("--conversation", action="append", help="only this conversation ID "
+                                                                 "(repeatable)")
+    parser.add_argument("--keyword", help="only conversations mentioning this")
+    parser.add_argument("--catalog", default=CATALOG_PATH)
+    args = parser.parse_args(argv)
+
+    transcript_filter = TranscriptFilter(args.since, args.until, args.conversation, args.keyword)
+    _, stats, skipped = read_transcripts(args.logs, transcript_filter, 0, args.catalog)
+    for name, value in stats.table(skipped)[1]:
+        print(f"{name + ':':<22} {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())